@@ -0,0 +1,104 @@
+"""
+Compare the throughput of validating many tokens one at a time with
+``AuthStateBuilder.build`` and all at once with ``AuthStateBuilder.build_many``.
+
+The token list contains repeats, as an offline reconciler's list of stored
+actions would. Globus Auth is replaced with an in-process stand-in which sleeps
+for a fixed latency, so no network access is required.
+
+Usage:
+
+    python benchmarks/build_many.py [--tokens N] [--distinct N] [--latency SECONDS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+import typing as t
+
+from globus_action_provider_tools.authentication import AuthStateBuilder
+
+
+class StandInAuthClient:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def oauth2_token_introspect(self, token: str, include: str) -> dict[str, t.Any]:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return {
+            "active": not token.startswith("revoked"),
+            "scope": "expected-scope",
+            "sub": "f7e81526-1610-47e2-a7c5-b071db77ca47",
+            "identity_set": ["f7e81526-1610-47e2-a7c5-b071db77ca47"],
+            "exp": int(time.time()) + 3600,
+        }
+
+
+def make_tokens(count: int, distinct: int) -> list[str]:
+    rng = random.Random(0)
+    # one token in ten has been revoked since its action was stored
+    pool = [
+        f"revoked-token-{i}" if i % 10 == 0 else f"token-{i}" for i in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def run_serial(tokens: list[str], latency: float) -> tuple[int, float]:
+    auth_client = StandInAuthClient(latency)
+    builder = AuthStateBuilder(auth_client, ["expected-scope"])
+    start = time.perf_counter()
+    for token in tokens:
+        try:
+            builder.build(token)
+        except ValueError:
+            pass
+    return auth_client.calls, time.perf_counter() - start
+
+
+def run_batch(
+    tokens: list[str], latency: float, max_concurrency: int
+) -> tuple[int, float]:
+    auth_client = StandInAuthClient(latency)
+    builder = AuthStateBuilder(auth_client, ["expected-scope"])
+    start = time.perf_counter()
+    builder.build_many(tokens, max_concurrency=max_concurrency)
+    return auth_client.calls, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    tokens = make_tokens(args.tokens, args.distinct)
+    print(
+        f"{args.tokens} tokens ({args.distinct} distinct), "
+        f"{args.latency * 1000:.0f}ms introspect latency"
+    )
+    print(f"{'':>20} {'introspects':>12} {'wall':>9} {'tokens/second':>14}")
+
+    def report(label: str, calls: int, elapsed: float) -> None:
+        print(
+            f"{label:>20} {calls:>12} {elapsed:>8.2f}s "
+            f"{len(tokens) / elapsed:>14,.0f}"
+        )
+
+    report("build, serially", *run_serial(tokens, args.latency))
+    for max_concurrency in (1, 8, 32):
+        report(
+            f"build_many({max_concurrency})",
+            *run_batch(tokens, args.latency, max_concurrency),
+        )
+
+
+if __name__ == "__main__":
+    main()
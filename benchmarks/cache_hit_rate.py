@@ -0,0 +1,109 @@
+"""
+Measure the introspection cache hit rate for a range of cache sizes.
+
+Requests are simulated with a synthetic Zipfian distribution of tokens, which
+approximates a provider with a few very active callers and a long tail of
+infrequent ones. Time is simulated, so the benchmark runs quickly regardless
+of the TTL being modeled.
+
+Usage:
+
+    python benchmarks/cache_hit_rate.py [--tokens N] [--requests N] [--rate R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import itertools
+import random
+import typing as t
+
+from globus_action_provider_tools.cache_policy import EvictionPolicy
+from globus_action_provider_tools.utils import TypedTTLCache
+
+
+class SimulatedClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def zipf_sampler(
+    num_tokens: int, exponent: float, rng: random.Random
+) -> t.Callable[[], int]:
+    weights = [1 / (rank**exponent) for rank in range(1, num_tokens + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    total = cumulative[-1]
+
+    def sample() -> int:
+        return bisect.bisect_left(cumulative, rng.random() * total)
+
+    return sample
+
+
+def hit_rate(
+    maxsize: int,
+    ttl: int,
+    eviction: EvictionPolicy,
+    num_tokens: int,
+    num_requests: int,
+    rate: float,
+    exponent: float,
+    seed: int,
+) -> float:
+    rng = random.Random(seed)
+    sample = zipf_sampler(num_tokens, exponent, rng)
+    clock = SimulatedClock()
+    cache: TypedTTLCache[bool] = TypedTTLCache(
+        maxsize=maxsize, ttl=ttl, eviction=eviction, timer=clock
+    )
+
+    hits = 0
+    for _ in range(num_requests):
+        clock.now += rng.expovariate(rate)
+        key = f"token-{sample()}"
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache[key] = True
+    return hits / num_requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--rate", type=float, default=200.0, help="requests/second")
+    parser.add_argument("--exponent", type=float, default=1.1)
+    parser.add_argument("--ttl", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.tokens} distinct tokens, {args.requests} requests at "
+        f"{args.rate}/s, zipf exponent {args.exponent}, ttl {args.ttl}s"
+    )
+    print(f"{'maxsize':>8} {'lru':>8} {'lfu':>8} {'fifo':>8}")
+    evictions: tuple[EvictionPolicy, ...] = ("lru", "lfu", "fifo")
+    for maxsize in (100, 250, 500, 1000, 2500, 5000, 10000):
+        rates = [
+            hit_rate(
+                maxsize,
+                args.ttl,
+                eviction,
+                args.tokens,
+                args.requests,
+                args.rate,
+                args.exponent,
+                args.seed,
+            )
+            for eviction in evictions
+        ]
+        print(f"{maxsize:>8} " + " ".join(f"{rate:>8.1%}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Report the memory held by the introspect and dependent token caches, in bytes
+per cached token, when caching whole SDK response objects and when caching the
+compact records which ``AuthState`` stores.
+
+Responses are built from realistic response bodies and headers, as they would
+be by ``globus_sdk``, so no network access is required. Every token belongs to
+one of a smaller number of users, as in a deployed Action Provider.
+
+Usage:
+
+    python benchmarks/cache_memory.py [--tokens N] [--users N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+import typing as t
+import uuid
+
+import globus_sdk
+import requests
+
+from globus_action_provider_tools.cache_records import (
+    DependentTokensRecord,
+    IntrospectRecord,
+)
+
+GROUPS_SCOPE = globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+
+HEADERS = {
+    "Date": "Fri, 17 Oct 2026 12:00:00 GMT",
+    "Content-Type": "application/json",
+    "Transfer-Encoding": "chunked",
+    "Connection": "keep-alive",
+    "Cache-Control": "no-store",
+    "Pragma": "no-cache",
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+}
+
+
+def make_response(body: t.Any) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(HEADERS)
+    response._content = json.dumps(body).encode("utf-8")
+    response.encoding = "utf-8"
+    return response
+
+
+def introspect_body(user: list[str]) -> dict[str, t.Any]:
+    return {
+        "active": True,
+        "scope": "https://auth.globus.org/scopes/d3a66776/action_all",
+        "sub": user[0],
+        "identity_set": user,
+        "client_id": str(uuid.uuid4()),
+        "username": "user@example.org",
+        "name": "An Example User",
+        "email": "user@example.org",
+        "aud": ["d3a66776-759f-4316-ba55-21725fe37323"],
+        "iss": "https://auth.globus.org",
+        "exp": int(time.time()) + 3600,
+        "iat": int(time.time()),
+        "nbf": int(time.time()),
+        "dependent_tokens_cache_id": uuid.uuid4().hex,
+        "token_type": "Bearer",
+    }
+
+
+def dependent_tokens_body() -> list[dict[str, t.Any]]:
+    return [
+        {
+            "access_token": uuid.uuid4().hex * 2,
+            "expires_in": 172800,
+            "resource_server": "groups.api.globus.org",
+            "scope": GROUPS_SCOPE,
+            "token_type": "Bearer",
+            "refresh_token": None,
+        }
+    ]
+
+
+def measure(build: t.Callable[[], t.Any], tokens: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    held = [build() for _ in range(tokens)]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return (after - before) / tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    users = [[str(uuid.uuid4()) for _ in range(3)] for _ in range(args.users)]
+    client = globus_sdk.ConfidentialAppAuthClient("client-id", "client-secret")
+    counter = iter(range(10**9))
+
+    def user() -> list[str]:
+        # copy the IDs, as decoding each response body would
+        return [str(uuid.UUID(id_)) for id_ in users[next(counter) % len(users)]]
+
+    def sdk_responses() -> tuple[t.Any, t.Any]:
+        return (
+            globus_sdk.GlobusHTTPResponse(
+                make_response(introspect_body(user())), client=client
+            ),
+            globus_sdk.OAuthDependentTokenResponse(
+                make_response(dependent_tokens_body()), client=client
+            ),
+        )
+
+    def records() -> tuple[t.Any, t.Any]:
+        introspect, dependent_tokens = sdk_responses()
+        return (
+            IntrospectRecord.from_data(introspect),
+            DependentTokensRecord.from_response(dependent_tokens),
+        )
+
+    print(f"{args.tokens} tokens, {args.users} users")
+    print(f"{'':>14} {'bytes/token':>12}")
+    sdk = measure(sdk_responses, args.tokens)
+    compact = measure(records, args.tokens)
+    print(f"{'SDK responses':>14} {sdk:>12,.0f}")
+    print(f"{'records':>14} {compact:>12,.0f}")
+    print(f"{'reduction':>14} {sdk / compact:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Stress ``TypedTTLCache`` from many threads at once, reporting throughput for a
+range of thread and shard counts and checking the cache's internal structures
+afterwards.
+
+Each thread performs a mix of reads, writes, and deletes on a shared key space
+which is larger than the cache, so that evictions happen continuously.
+
+Usage:
+
+    python benchmarks/concurrent_cache.py [--operations N] [--maxsize N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+
+from globus_action_provider_tools.cache_policy import EvictionPolicy
+from globus_action_provider_tools.utils import TypedTTLCache
+
+
+def check_integrity(cache: TypedTTLCache[int]) -> None:
+    """
+    Raise ``AssertionError`` if the cache's shards are inconsistent.
+
+    Evicting every entry walks each shard's eviction order, which fails if the
+    order has lost track of any entry.
+    """
+    assert len(cache) <= cache.maxsize + cache.shards
+    for shard in cache._shards:
+        keys = set(shard.entries)
+        assert len(keys) == len(shard.entries) <= shard.entries.maxsize
+        evicted = set()
+        while shard.entries:
+            key, _ = shard.entries.popitem()
+            evicted.add(key)
+        assert evicted == keys, "eviction order does not match the cached keys"
+
+
+def run(
+    threads: int,
+    shards: int,
+    eviction: EvictionPolicy,
+    maxsize: int,
+    operations: int,
+) -> float:
+    cache: TypedTTLCache[int] = TypedTTLCache(
+        maxsize=maxsize, ttl=60, eviction=eviction, shards=shards
+    )
+    keys = [f"token-{i}" for i in range(maxsize * 2)]
+    barrier = threading.Barrier(threads + 1)
+    errors: list[BaseException] = []
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        barrier.wait()
+        try:
+            for _ in range(operations):
+                key = rng.choice(keys)
+                roll = rng.random()
+                if roll < 0.8:
+                    cache.get(key)
+                elif roll < 0.98:
+                    cache[key] = seed
+                else:
+                    try:
+                        del cache[key]
+                    except KeyError:
+                        pass
+        except BaseException as err:
+            errors.append(err)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if errors:
+        raise errors[0]
+    check_integrity(cache)
+    return threads * operations / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--operations", type=int, default=50_000)
+    parser.add_argument("--maxsize", type=int, default=1000)
+    parser.add_argument("--eviction", default="lru", choices=("lru", "lfu", "fifo"))
+    args = parser.parse_args()
+
+    shard_counts = (1, 4, 16)
+    print(f"operations/second, {args.operations} operations per thread")
+    print(f"{'threads':>8}" + "".join(f"{f'{n} shards':>14}" for n in shard_counts))
+    for threads in (1, 2, 4, 8, 16):
+        results = [
+            run(threads, shards, args.eviction, args.maxsize, args.operations)
+            for shards in shard_counts
+        ]
+        print(f"{threads:>8}" + "".join(f"{result:>14,.0f}" for result in results))
+    print("internal structures were consistent after every run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Compare cold group lookups made by Groups clients with their own sessions, as
+``ClientFactory`` built them before it pooled connections, with lookups made by
+clients which share the factory's connection pool.
+
+Each lookup uses a new client, as ``AuthState`` does for each new token.
+Groups is replaced with a local TLS stand-in with a self-signed certificate,
+which counts the TLS handshakes it completes, so no network access is required.
+
+Usage:
+
+    python benchmarks/pooled_connections.py [--lookups N] [--threads N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import datetime
+import http.server
+import ipaddress
+import json
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import time
+import typing as t
+
+import globus_sdk
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from globus_action_provider_tools.client_factory import ClientFactory
+
+
+def write_self_signed_certificate(directory: str) -> tuple[str, str]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+class GroupsStandIn(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    handshakes = 0
+    lock = threading.Lock()
+
+    def setup(self) -> None:
+        super().setup()
+        with self.lock:
+            type(self).handshakes += 1
+
+    def do_GET(self) -> None:
+        body = json.dumps([{"id": "fdb38a24-03c1-11e3-86f7-12313809f035"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: t.Any) -> None:
+        pass
+
+
+class TLSServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, context: ssl.SSLContext) -> None:
+        super().__init__(("127.0.0.1", 0), GroupsStandIn)
+        self.context = context
+
+    def get_request(self) -> tuple[t.Any, t.Any]:
+        sock, address = super().get_request()
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # complete the handshake in the handler's thread
+        return self.context.wrap_socket(sock, server_side=True), address
+
+
+def run(
+    make_client: t.Callable[[], globus_sdk.GroupsClient], lookups: int, threads: int
+) -> tuple[int, float]:
+    GroupsStandIn.handshakes = 0
+
+    def lookup(_: int) -> None:
+        make_client().get_my_groups()
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lookup, range(lookups)))
+    return GroupsStandIn.handshakes, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_certificate(directory)
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert_path, key_path)
+        server = TLSServer(context)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ["GLOBUS_SDK_SERVICE_URL_GROUPS"] = (
+            f"https://127.0.0.1:{server.server_port}/"
+        )
+        os.environ["GLOBUS_SDK_VERIFY_SSL"] = cert_path
+
+        factory = ClientFactory()
+        authorizer = globus_sdk.AccessTokenAuthorizer("groups-token")
+
+        def unpooled_client() -> globus_sdk.GroupsClient:
+            return globus_sdk.GroupsClient(
+                authorizer=authorizer,
+                transport_params=dict(ClientFactory.DEFAULT_GROUPS_TRANSPORT_PARAMS),
+            )
+
+        def pooled_client() -> globus_sdk.GroupsClient:
+            return factory.make_groups_client(authorizer)
+
+        print(f"{args.lookups} lookups, {args.threads} threads, one client each")
+        print(f"{'':>18} {'handshakes':>11} {'wall':>8} {'ms/lookup':>10}")
+        for label, make_client in (
+            ("separate sessions", unpooled_client),
+            ("shared pool", pooled_client),
+        ):
+            handshakes, elapsed = run(make_client, args.lookups, args.threads)
+            print(
+                f"{label:>18} {handshakes:>11} {elapsed:>7.2f}s "
+                f"{elapsed / args.lookups * 1000 * args.threads:>10.2f}"
+            )
+        stats = factory.connection_stats()
+        print(
+            f"shared pool reused a connection for {stats.reuse_ratio:.1%} of requests"
+        )
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Compare cache hit rates for LRU and W-TinyLFU eviction on a request trace in
+which steady callers are interleaved with bursts of one-off tokens, such as
+those sent by a crawler or a misbehaving client.
+
+By default, a synthetic trace is generated: steady callers present tokens with
+a Zipfian distribution, and a single noisy client periodically sends a burst of
+tokens which are each seen only once. A recorded trace may be given instead,
+as a file with one ``client_id,token`` pair per line.
+
+Time is not modeled: entries never expire, so the results reflect eviction
+alone.
+
+Usage:
+
+    python benchmarks/scan_resistance.py [--maxsize N] [--trace FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import collections
+import itertools
+import random
+import typing as t
+
+from globus_action_provider_tools.cache_policy import EvictionPolicy
+from globus_action_provider_tools.utils import TypedTTLCache
+
+NOISY_CLIENT = "noisy-client"
+
+
+def synthetic_trace(
+    num_requests: int,
+    num_tokens: int,
+    num_clients: int,
+    burst_every: int,
+    burst_size: int,
+    seed: int,
+) -> t.Iterator[tuple[str, str]]:
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, num_tokens + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    one_off = itertools.count()
+
+    for request in range(num_requests):
+        if request % burst_every < burst_size:
+            yield NOISY_CLIENT, f"one-off-{next(one_off)}"
+        else:
+            rank = bisect.bisect_left(cumulative, rng.random() * cumulative[-1])
+            yield f"client-{rank % num_clients}", f"token-{rank}"
+
+
+def file_trace(path: str) -> t.Iterator[tuple[str, str]]:
+    with open(path) as trace:
+        for line in trace:
+            if line.strip():
+                client_id, token = line.strip().split(",", 1)
+                yield client_id, token
+
+
+def hit_rates(
+    trace: list[tuple[str, str]],
+    maxsize: int,
+    eviction: EvictionPolicy,
+    tenant_quota: float | None,
+) -> tuple[float, dict[str, float]]:
+    cache: TypedTTLCache[bool] = TypedTTLCache(
+        maxsize=maxsize, ttl=3600, eviction=eviction, tenant_quota=tenant_quota
+    )
+    requests: collections.Counter[str] = collections.Counter()
+    hits: collections.Counter[str] = collections.Counter()
+    for client_id, token in trace:
+        requests[client_id] += 1
+        if cache.get(token) is not None:
+            hits[client_id] += 1
+        else:
+            cache.set(token, True, tenant=client_id)
+
+    total = sum(hits.values()) / len(trace)
+    return total, {
+        client_id: hits[client_id] / requests[client_id] for client_id in requests
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--maxsize", type=int, default=1000)
+    parser.add_argument("--trace", help="a file of client_id,token lines")
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--tokens", type=int, default=5_000)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--burst-every", type=int, default=10_000)
+    parser.add_argument("--burst-size", type=int, default=3_000)
+    parser.add_argument("--tenant-quota", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.trace:
+        trace = list(file_trace(args.trace))
+    else:
+        trace = list(
+            synthetic_trace(
+                args.requests,
+                args.tokens,
+                args.clients,
+                args.burst_every,
+                args.burst_size,
+                args.seed,
+            )
+        )
+
+    noisy_requests = sum(client_id == NOISY_CLIENT for client_id, _ in trace)
+    print(
+        f"{len(trace)} requests ({noisy_requests} from {NOISY_CLIENT}), "
+        f"maxsize {args.maxsize}"
+    )
+    print(f"{'policy':>24} {'overall':>8} {'others':>8}")
+    policies: list[tuple[str, EvictionPolicy, float | None]] = [
+        ("lru", "lru", None),
+        ("tinylfu", "tinylfu", None),
+        (f"tinylfu, quota {args.tenant_quota}", "tinylfu", args.tenant_quota),
+    ]
+    for label, eviction, tenant_quota in policies:
+        total, by_client = hit_rates(trace, args.maxsize, eviction, tenant_quota)
+        others = [
+            rate for client_id, rate in by_client.items() if client_id != NOISY_CLIENT
+        ]
+        print(f"{label:>24} {total:>8.1%} {sum(others) / len(others):>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
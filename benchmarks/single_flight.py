@@ -0,0 +1,146 @@
+"""
+Count the outbound Auth and Groups calls made when many threads build an
+``AuthState`` for the same token at the same moment, with and without
+coalescing of in-flight calls.
+
+The Auth and Groups services are replaced with in-process stand-ins which
+sleep for a fixed latency, so no network access is required.
+
+Usage:
+
+    python benchmarks/single_flight.py [--threads N] [--latency SECONDS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import threading
+import time
+import typing as t
+
+import globus_sdk
+
+from globus_action_provider_tools.authentication import AuthStateBuilder
+from globus_action_provider_tools.client_factory import ClientFactory
+from globus_action_provider_tools.utils import SingleFlight
+
+T = t.TypeVar("T")
+
+GROUPS_SCOPE = globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+
+
+class CallCounter:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.counts: collections.Counter[str] = collections.Counter()
+        self._lock = threading.Lock()
+
+    def call(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+        time.sleep(self.latency)
+
+
+class StandInDependentTokenResponse:
+    def __init__(self) -> None:
+        token_data = {
+            "access_token": "groups-access-token",
+            "scope": GROUPS_SCOPE,
+            "resource_server": "groups.api.globus.org",
+            "expires_at_seconds": int(time.time()) + 3600,
+        }
+        self.by_scopes = {GROUPS_SCOPE: token_data}
+        self.by_resource_server = {"groups.api.globus.org": token_data}
+
+
+class StandInAuthClient:
+    def __init__(self, counter: CallCounter) -> None:
+        self.counter = counter
+
+    def oauth2_token_introspect(self, token: str, include: str) -> dict[str, t.Any]:
+        self.counter.call("introspect")
+        return {
+            "active": True,
+            "scope": "expected-scope",
+            "sub": "f7e81526-1610-47e2-a7c5-b071db77ca47",
+            "identity_set": ["f7e81526-1610-47e2-a7c5-b071db77ca47"],
+            "exp": int(time.time()) + 3600,
+        }
+
+    def oauth2_get_dependent_tokens(self, token: str) -> StandInDependentTokenResponse:
+        self.counter.call("dependent_tokens")
+        return StandInDependentTokenResponse()
+
+
+class StandInGroupsClient:
+    def __init__(self, counter: CallCounter) -> None:
+        self.counter = counter
+
+    def get_my_groups(self) -> list[dict[str, str]]:
+        self.counter.call("my_groups")
+        return [{"id": "606dbaa9-3d57-44b8-a33e-422a9de0c712"}]
+
+
+class StandInClientFactory(ClientFactory):
+    def __init__(self, counter: CallCounter) -> None:
+        super().__init__()
+        self.counter = counter
+
+    def make_groups_client(self, authorizer: t.Any) -> t.Any:
+        return StandInGroupsClient(self.counter)
+
+
+class NoCoalescing(SingleFlight):
+    def do(self, key: str, fn: t.Callable[[], T]) -> T:
+        return fn()
+
+
+def run(threads: int, latency: float, coalesce: bool) -> tuple[CallCounter, float]:
+    counter = CallCounter(latency)
+    builder = AuthStateBuilder(
+        StandInAuthClient(counter),
+        ["expected-scope"],
+        client_factory=StandInClientFactory(counter),
+    )
+    if not coalesce:
+        builder.caches.inflight = NoCoalescing()
+
+    barrier = threading.Barrier(threads)
+
+    def request() -> None:
+        barrier.wait()
+        auth_state = builder.build("the-same-token")
+        auth_state.groups
+
+    workers = [threading.Thread(target=request) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return counter, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, one token, {args.latency * 1000:.0f}ms latency")
+    print(
+        f"{'':>12} {'introspect':>11} {'dep. tokens':>11} {'my_groups':>11} {'wall':>8}"
+    )
+    for coalesce in (False, True):
+        counter, elapsed = run(args.threads, args.latency, coalesce)
+        label = "coalesced" if coalesce else "uncoalesced"
+        print(
+            f"{label:>12} {counter.counts['introspect']:>11} "
+            f"{counter.counts['dependent_tokens']:>11} "
+            f"{counter.counts['my_groups']:>11} {elapsed * 1000:>6.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
-from globus_action_provider_tools.authentication import AuthState, AuthStateBuilder
+from globus_action_provider_tools.authentication import (
+    AuthSnapshot,
+    AuthState,
+    AuthStateBuilder,
+)
 from globus_action_provider_tools.data_types import (
     ActionProviderDescription,
     ActionProviderJsonEncoder,
@@ -8,6 +12,7 @@ from globus_action_provider_tools.data_types import (
 )
 
 __all__ = [
+    "AuthSnapshot",
     "AuthState",
     "AuthStateBuilder",
     "ActionProviderDescription",
@@ -0,0 +1,579 @@
+"""
+asyncio-native counterparts to ``AuthState`` and ``AuthStateBuilder``.
+
+Calls to Globus Auth and Globus Groups are made with an ``httpx.AsyncClient``,
+so that an event loop can serve many requests concurrently without tying up a
+thread per request. Caching and token verification behave as they do for
+``AuthState``, and the caches may be shared with a synchronous builder. Calls
+go through the same circuit breakers, concurrency limits and request deadline
+as those of ``AuthState``, and caches with a backend are read and written in a
+worker thread, so that backend I/O does not block the event loop.
+
+This module requires the ``httpx`` package, which can be installed with the
+``async`` extra::
+
+    pip install globus-action-provider-tools[async]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+import typing as t
+from collections.abc import Iterable
+
+import globus_sdk
+import httpx
+import requests
+from globus_sdk import AccessTokenAuthorizer, ConfidentialAppAuthClient
+
+from .authentication import (
+    AuthStateCaches,
+    GroupMembership,
+    InactiveTokenError,
+    InvalidTokenScopesError,
+    RejectedTokenCache,
+    _AuthStateBase,
+)
+from .cache_backends import CacheBackend
+from .cache_policy import AuthCachePolicy
+from .cache_records import DependentTokensRecord, IntrospectRecord
+from .client_factory import ClientFactory
+from .deadline import check_deadline, remaining_time
+from .errors import CircuitOpenError, DeadlineExceededError
+from .utils import TypedTTLCache
+
+log = logging.getLogger(__name__)
+
+T = t.TypeVar("T")
+
+_DEPENDENT_TOKEN_GRANT_TYPE = "urn:globus:auth:grant_type:dependent_token"
+
+
+class AsyncSingleFlight:
+    """
+    Coalesce concurrent coroutines which share a key.
+
+    While a call for a key is in flight, other callers for the same key await its
+    result (or its exception), rather than making the same call again. Waiting
+    callers give up at their own request deadline, as with ``SingleFlight``.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future[t.Any]] = {}
+
+    async def do(self, key: str, fn: t.Callable[[], t.Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is not None:
+            # shield the shared call, so that a cancelled follower does not cancel
+            # the call for every other caller
+            remaining = remaining_time()
+            if remaining is None:
+                return await asyncio.shield(call)
+            try:
+                return await asyncio.wait_for(asyncio.shield(call), max(remaining, 0))
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError(f"the call for {key!r} finished") from None
+
+        call = self._calls[key] = asyncio.ensure_future(fn())
+        try:
+            return await asyncio.shield(call)
+        finally:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+
+def _to_requests_response(
+    response: httpx.Response, error_class: type[globus_sdk.GlobusAPIError]
+) -> requests.Response:
+    """
+    Convert an ``httpx`` response into a ``requests`` response, which can be wrapped
+    by globus-sdk response objects.
+
+    :raises GlobusAPIError: an instance of ``error_class`` for error responses, as
+        a globus-sdk client would raise
+    """
+    raw_response = requests.Response()
+    raw_response.status_code = response.status_code
+    raw_response.headers.update(response.headers)
+    raw_response._content = response.content
+    raw_response.url = str(response.url)
+    raw_response.request = requests.Request(
+        response.request.method, str(response.request.url)
+    ).prepare()
+    if not 200 <= response.status_code < 300:
+        raise error_class(raw_response)
+    return raw_response
+
+
+def _shorten_timeout(timeout: httpx.Timeout, remaining: float) -> httpx.Timeout:
+    # each of the connect, read, write and pool timeouts ends by the deadline
+    return httpx.Timeout(
+        **{
+            name: remaining if value is None else min(value, remaining)
+            for name, value in timeout.as_dict().items()
+        }
+    )
+
+
+async def _cache_call(
+    cache: TypedTTLCache[t.Any] | RejectedTokenCache,
+    fn: t.Callable[..., T],
+    *args: t.Any,
+) -> T:
+    """
+    Call a method of ``cache``, in a worker thread if the cache has a backend, so
+    that backend I/O does not block the event loop.
+    """
+    if cache.backend is None:
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+class AsyncAuthState(_AuthStateBase):
+    """
+    An asyncio-native ``AuthState``.
+
+    Instances should be created with ``AsyncAuthStateBuilder.build``, which
+    introspects the token before returning. Identity information is available as
+    properties, while operations which may call out to Globus Auth or Globus
+    Groups are coroutines.
+    """
+
+    def __init__(
+        self,
+        builder: AsyncAuthStateBuilder,
+        bearer_token: str,
+        expected_scopes: frozenset[str],
+    ) -> None:
+        self._builder = builder
+        self.auth_client = builder.auth_client
+        self.bearer_token = bearer_token
+        self.sanitized_token = self.bearer_token[-7:]
+        self.expected_scopes = expected_scopes
+
+        caches = builder.caches
+        self.introspect_cache = caches.introspect
+        self.dependent_tokens_cache = caches.dependent_tokens
+        self.group_membership_cache = caches.group_membership
+        self.rejected_tokens_cache = caches.rejected_tokens
+        self.expiry_skew = caches.expiry_skew
+        self._circuit_breakers = caches.circuit_breakers
+        self._inflight = builder.inflight
+
+        self.errors: list[Exception] = []
+
+    async def introspect_token(self) -> globus_sdk.GlobusHTTPResponse:
+        """
+        Introspect the caller's credential, retrieving and returning the
+        introspect API response, as ``AuthState.introspect_token()`` does. The
+        result is cached, and is validated on every call.
+
+        :raises InactiveTokenError: a subtype of ValueError, if the token is invalid
+            per the introspect data
+        :raises InvalidTokenScopesError: a subtype of ValueError, if the token's scopes
+            do not include the scopes expected by this AuthState
+        """
+        await _cache_call(
+            self.rejected_tokens_cache,
+            self.rejected_tokens_cache.check,
+            self._token_hash,
+            self.expected_scopes,
+        )
+        introspect_result = await _cache_call(
+            self.introspect_cache, self.introspect_cache.get, self._token_hash
+        )
+        if introspect_result is None:
+            try:
+                introspect_result = await self._inflight.do(
+                    f"introspect:{self._token_hash}", self._introspect
+                )
+            except Exception as err:
+                stale = self._stale_fallback(
+                    self.introspect_cache, self._token_hash, err, lambda r: r.exp
+                )
+                if stale is None:
+                    raise
+                introspect_result = stale
+        try:
+            self._verify_introspect_result(introspect_result)
+        except (InactiveTokenError, InvalidTokenScopesError) as err:
+            await _cache_call(
+                self.rejected_tokens_cache,
+                self.rejected_tokens_cache.record,
+                self._token_hash,
+                err,
+            )
+            raise
+        self._token_data = introspect_result
+        return introspect_result.to_response(self.auth_client)
+
+    async def _introspect(self) -> IntrospectRecord:
+        log.debug(f"Introspecting token <token_hash={self._token_hash}>")
+        start = time.monotonic()
+        response = await self._call_endpoint(
+            "introspect",
+            "auth",
+            "POST",
+            self._builder.auth_url("v2/oauth2/token/introspect"),
+            data={"token": self.bearer_token, "include": "identity_set"},
+            headers=self._builder.auth_headers(),
+        )
+        introspect_result = IntrospectRecord.from_data(response.json())
+        await _cache_call(
+            self.introspect_cache,
+            functools.partial(
+                self.introspect_cache.set,
+                ttl=self._introspect_result_ttl(introspect_result),
+                tenant=self._introspect_result_tenant(introspect_result),
+                load_time=time.monotonic() - start,
+            ),
+            self._token_hash,
+            introspect_result,
+        )
+        return introspect_result
+
+    async def _call_endpoint(
+        self, endpoint: str, service: str, method: str, url: str, **kwargs: t.Any
+    ) -> requests.Response:
+        """
+        Send a request to ``service`` through the circuit breaker for ``endpoint``,
+        if enabled, unless the request deadline has passed.
+        """
+        check_deadline(f"calling {endpoint!r}")
+        send = functools.partial(self._builder.send, service, method, url, **kwargs)
+        breaker = self._circuit_breakers.get(endpoint)
+        if breaker is None:
+            return await send()
+        return await breaker.call_async(send)
+
+    async def get_groups(self) -> frozenset[str]:
+        """
+        Get the group principals of the caller.
+
+        As with ``AuthState.groups``, failures to get a Groups token or to list
+        groups are logged and produce an empty set, unless a circuit breaker is
+        open. During an outage, recently expired groups are used if the cache
+        keeps them (``stale_if_error``).
+        """
+        membership = await _cache_call(
+            self.group_membership_cache,
+            self._cached_group_membership,
+            self.group_membership_cache,
+        )
+        if membership is None:
+            return await self._inflight.do(
+                f"groups:{self._group_membership_cache_key}:{self._identity_set_digest}",
+                self._fetch_groups,
+            )
+        return membership.principals
+
+    async def _fetch_groups(self) -> frozenset[str]:
+        try:
+            authorizer = await self.get_authorizer_for_scope(
+                globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+            )
+        except (
+            globus_sdk.GlobusAPIError,
+            KeyError,
+            ValueError,
+            CircuitOpenError,
+        ) as err:
+            stale = self._stale_groups(err)
+            if stale is not None:
+                return stale
+            # an open circuit is an outage, not a missing Groups scope
+            if isinstance(err, CircuitOpenError):
+                raise
+            log.error(
+                "Failed to get a Groups token. Falling back to empty-set for groups.",
+                exc_info=True,
+            )
+            return frozenset()
+
+        start = time.monotonic()
+        try:
+            response = await self._call_endpoint(
+                "groups",
+                "groups",
+                "GET",
+                self._builder.groups_url("v2/groups/my_groups"),
+                headers={"Authorization": authorizer.get_authorization_header()},
+            )
+        except Exception as err:
+            stale = self._stale_groups(err)
+            if stale is not None:
+                return stale
+            if not isinstance(err, globus_sdk.GlobusAPIError):
+                raise
+            log.warning("failed to get groups, treating groups as '{}'", exc_info=True)
+            return frozenset()
+
+        membership = GroupMembership(
+            self._identity_set_digest, (g["id"] for g in response.json())
+        )
+        await _cache_call(
+            self.group_membership_cache,
+            functools.partial(
+                self.group_membership_cache.set,
+                tenant=self._tenant,
+                load_time=time.monotonic() - start,
+            ),
+            self._group_membership_cache_key,
+            membership,
+        )
+        return membership.principals
+
+    async def get_principals(self) -> frozenset[str]:
+        return self.identities.union(await self.get_groups())
+
+    async def get_authorizer_for_scope(self, scope: str) -> AccessTokenAuthorizer:
+        """
+        Get dependent tokens for the caller's token, then retrieve token data for the
+        requested scope and attempt to build an authorizer from that data.
+
+        :param scope: The scope for which an authorizer is being requested
+
+        :raises ValueError: If the dependent token data for the caller does not match
+            the requested scope.
+        """
+        dependent_tokens = await _cache_call(
+            self.dependent_tokens_cache,
+            self.dependent_tokens_cache.get,
+            self._dependent_token_cache_key,
+        )
+        retrieved_from_cache = dependent_tokens is not None
+        if dependent_tokens is None:
+            try:
+                dependent_tokens = await self._get_dependent_tokens()
+            except Exception as err:
+                dependent_tokens = self._stale_fallback(
+                    self.dependent_tokens_cache,
+                    self._dependent_token_cache_key,
+                    err,
+                    lambda r: r.expires_at,
+                )
+                if dependent_tokens is None:
+                    raise
+                retrieved_from_cache = True
+
+        access_token = dependent_tokens.access_token(scope)
+
+        if access_token is None:
+            if not retrieved_from_cache:
+                raise ValueError("Dependent tokens do not match request.")
+            # the cached value was bad -- fetch and check again
+            await _cache_call(
+                self.dependent_tokens_cache,
+                self.dependent_tokens_cache.__delitem__,
+                self._dependent_token_cache_key,
+            )
+            dependent_tokens = await self._get_dependent_tokens()
+            access_token = dependent_tokens.access_token(scope)
+            if access_token is None:
+                raise ValueError("Dependent tokens do not match request.")
+
+        return AccessTokenAuthorizer(access_token)
+
+    async def _get_dependent_tokens(self) -> DependentTokensRecord:
+        return await self._inflight.do(
+            self._dependent_token_cache_key, self._grant_dependent_tokens
+        )
+
+    async def _grant_dependent_tokens(self) -> DependentTokensRecord:
+        start = time.monotonic()
+        response = await self._call_endpoint(
+            "dependent_tokens",
+            "auth",
+            "POST",
+            self._builder.auth_url("v2/oauth2/token"),
+            data={
+                "grant_type": _DEPENDENT_TOKEN_GRANT_TYPE,
+                "token": self.bearer_token,
+            },
+            headers=self._builder.auth_headers(),
+        )
+        dependent_tokens = DependentTokensRecord.from_response(
+            globus_sdk.OAuthDependentTokenResponse(response, client=self.auth_client)
+        )
+        await _cache_call(
+            self.dependent_tokens_cache,
+            functools.partial(
+                self.dependent_tokens_cache.set,
+                ttl=self._dependent_tokens_ttl(dependent_tokens),
+                tenant=self._tenant,
+                load_time=time.monotonic() - start,
+            ),
+            self._dependent_token_cache_key,
+            dependent_tokens,
+        )
+        return dependent_tokens
+
+    async def check_authorization(
+        self,
+        allowed_principals: Iterable[str],
+        allow_public: bool = False,
+        allow_all_authenticated_users: bool = False,
+    ) -> bool:
+        """Check whether an incoming request is authorized."""
+        allowed_set = set(allowed_principals)
+        if allow_public and "public" in allowed_set:
+            return True
+
+        all_principals = self.identities
+        if (
+            allow_all_authenticated_users
+            and "all_authenticated_users" in allowed_set
+            and all_principals
+        ):
+            return True
+
+        if self.group_in_principal_list(allowed_set):
+            all_principals |= await self.get_groups()
+
+        return bool(allowed_set & all_principals)
+
+
+class AsyncAuthStateBuilder:
+    """
+    Builds ``AsyncAuthState`` objects.
+
+    :param auth_client: The client whose credentials are used to introspect tokens
+        and get dependent tokens. The client is not used to make requests.
+    :param expected_scopes: The scopes which tokens are expected to have
+    :param http_client: The ``httpx.AsyncClient`` used for calls to Globus Auth and
+        Globus Groups. If omitted, a client is created using the HTTP timeout from
+        ``client_factory``.
+    :param client_factory: The ``ClientFactory`` whose transport settings are used
+        when creating a default ``http_client``
+    :param cache_policy: The size, TTL, and eviction settings for the caches
+        owned by this builder. Defaults to ``AuthCachePolicy()``.
+    :param cache_backend: A shared ``CacheBackend`` used to share cached
+        Auth and Groups results between processes.
+    :param cache_backends: Backends for individual caches, by cache name, which
+        take precedence over ``cache_backend``.
+    :param caches: Caches to use instead of creating new ones, for example to share
+        the caches of a synchronous ``AuthStateBuilder``.
+    """
+
+    def __init__(
+        self,
+        auth_client: ConfidentialAppAuthClient,
+        expected_scopes: Iterable[str],
+        *,
+        http_client: httpx.AsyncClient | None = None,
+        client_factory: ClientFactory | None = None,
+        cache_policy: AuthCachePolicy | None = None,
+        cache_backend: CacheBackend | None = None,
+        cache_backends: t.Mapping[str, CacheBackend | None] | None = None,
+        caches: AuthStateCaches | None = None,
+    ) -> None:
+        self.auth_client = auth_client
+        self.default_expected_scopes = frozenset(expected_scopes)
+        self.client_factory = client_factory or ClientFactory()
+        if http_client is None:
+            transport_params = dict(self.client_factory.DEFAULT_AUTH_TRANSPORT_PARAMS)
+            http_client = httpx.AsyncClient(
+                timeout=transport_params.get("http_timeout", 30)
+            )
+        self.http_client = http_client
+        self.cache_policy = cache_policy or AuthCachePolicy()
+        self.caches = caches or AuthStateCaches.from_policy(
+            self.cache_policy,
+            auth_client,
+            backend=cache_backend,
+            backends=cache_backends,
+        )
+        self.inflight = AsyncSingleFlight()
+
+    def auth_url(self, path: str) -> str:
+        return f"{self.auth_client.base_url.rstrip('/')}/{path}"
+
+    def groups_url(self, path: str) -> str:
+        return f"{globus_sdk.config.get_service_url('groups').rstrip('/')}/{path}"
+
+    async def send(
+        self, service: str, method: str, url: str, **kwargs: t.Any
+    ) -> requests.Response:
+        """
+        Send a request to Globus ``service`` (``"auth"`` or ``"groups"``), within
+        the service's concurrency limit from ``client_factory``, if any, and with
+        timeouts which end by the request deadline.
+
+        :raises GlobusAPIError: the service's error type, for error responses
+        :raises NetworkError: if the request could not be sent or timed out
+        """
+        limiter = self.client_factory.concurrency_limiters.get(service)
+        if limiter is None:
+            return await self._send(service, method, url, **kwargs)
+
+        # callers do not wait for a turn past their deadline
+        started_at = await limiter.acquire_async(
+            timeout=check_deadline(f"calling {service!r}")
+        )
+        failed = True
+        try:
+            response = await self._send(service, method, url, **kwargs)
+            failed = False
+            return response
+        except globus_sdk.GlobusAPIError as err:
+            failed = err.http_status == 429 or err.http_status >= 500
+            raise
+        finally:
+            limiter.release(started_at, failed=failed)
+
+    async def _send(
+        self, service: str, method: str, url: str, **kwargs: t.Any
+    ) -> requests.Response:
+        remaining = check_deadline(f"calling {url}")
+        if remaining is not None:
+            kwargs["timeout"] = _shorten_timeout(self.http_client.timeout, remaining)
+        try:
+            response = await self.http_client.request(method, url, **kwargs)
+        except httpx.TimeoutException as err:
+            raise globus_sdk.GlobusTimeoutError(str(err), err) from err
+        except httpx.TransportError as err:
+            raise globus_sdk.GlobusConnectionError(str(err), err) from err
+        error_class = (
+            globus_sdk.GroupsAPIError
+            if service == "groups"
+            else globus_sdk.AuthAPIError
+        )
+        return _to_requests_response(response, error_class)
+
+    def auth_headers(self) -> dict[str, str]:
+        authorizer = self.auth_client.authorizer
+        if authorizer is None:
+            return {}
+        header = authorizer.get_authorization_header()
+        return {"Authorization": header} if header else {}
+
+    async def build(
+        self, access_token: str, expected_scopes: Iterable[str] | None = None
+    ) -> AsyncAuthState:
+        """
+        Build an ``AsyncAuthState`` and introspect its token.
+
+        :raises InactiveTokenError: if the token is invalid
+        :raises InvalidTokenScopesError: if the token lacks the expected scopes
+        """
+        if expected_scopes is None:
+            expected_scopes = self.default_expected_scopes
+        else:
+            expected_scopes = frozenset(expected_scopes)
+        auth_state = AsyncAuthState(self, access_token, expected_scopes)
+        await auth_state.introspect_token()
+        return auth_state
+
+    async def aclose(self) -> None:
+        """Close the HTTP client used by this builder."""
+        await self.http_client.aclose()
+
+    def invalidate_groups(self, identity_id: str) -> None:
+        """
+        Forget the cached groups of an identity, so that they are fetched again on
+        next use. See ``AuthStateCaches.invalidate_groups``.
+        """
+        self.caches.invalidate_groups(identity_id)
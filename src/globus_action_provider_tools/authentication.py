@@ -1,23 +1,49 @@
 from __future__ import annotations
 
+import collections
+import concurrent.futures
+import dataclasses
 import functools
 import hashlib
+import json
 import logging
+import re
+import sys
+import threading
+import time
+import typing as t
+import uuid
 import warnings
 from collections.abc import Iterable
 
 import globus_sdk
-from globus_sdk import (
-    AccessTokenAuthorizer,
-    ConfidentialAppAuthClient,
-    GlobusHTTPResponse,
-)
+from globus_sdk import AccessTokenAuthorizer, ConfidentialAppAuthClient
 
-from .client_factory import ClientFactory
-from .utils import TypedTTLCache
+from .cache_backends import CACHE_NAMES, CacheBackend
+from .cache_policy import AuthCachePolicy
+from .cache_records import DependentTokensRecord, IntrospectRecord
+from .circuit_breaker import ENDPOINTS, CircuitBreaker, CircuitBreakerStats, is_outage
+from .client_factory import ClientFactory, ClientT
+from .deadline import check_deadline
+from .errors import CircuitOpenError, UnverifiedAuthenticationError
+from .utils import (
+    CacheRefresher,
+    CacheSerializer,
+    CacheStats,
+    Prefetcher,
+    SingleFlight,
+    TypedTTLCache,
+)
 
 log = logging.getLogger(__name__)
 
+T = t.TypeVar("T")
+RecordT = t.TypeVar("RecordT", IntrospectRecord, DependentTokensRecord)
+
+# the factory used by AuthStates which are not given one, so that they share its
+# connection pools and clients
+_DEFAULT_CLIENT_FACTORY = ClientFactory()
+
 
 def _hash_token(token: str) -> str:
     """Return a hash of the token, suitable for use as a cache key"""
@@ -49,154 +75,952 @@ class InactiveTokenError(ValueError):
     """Indicates that the token is not valid (its 'active' field is False)."""
 
 
-class AuthState:
+class TokenPreValidator:
+    """
+    Checks the syntax of an ``Authorization`` header and its bearer token, so that
+    malformed tokens can be rejected without a call to Globus Auth.
+
+    :param min_token_length: The minimum accepted token length
+    :param max_token_length: The maximum accepted token length
+    :param max_header_size: The maximum accepted size of the whole header value
+    :param token_pattern: A regular expression which the whole token must match.
+        Defaults to the ``b64token`` syntax of RFC 6750.
+
+    :ivar rejections: A counter of rejected headers, by reason
+    """
+
+    def __init__(
+        self,
+        *,
+        min_token_length: int = 10,
+        max_token_length: int = 2048,
+        max_header_size: int = 4096,
+        token_pattern: str = r"[A-Za-z0-9\-._~+/]+=*",
+    ) -> None:
+        self.min_token_length = min_token_length
+        self.max_token_length = max_token_length
+        self.max_header_size = max_header_size
+        self.token_pattern = re.compile(token_pattern)
+        self.rejections: collections.Counter[str] = collections.Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def rejected_total(self) -> int:
+        """The number of headers which were rejected without a call to Globus Auth."""
+        return sum(self.rejections.values())
+
+    def validate_authorization_header(self, header: str | None) -> str:
+        """
+        Check an ``Authorization`` header value and return its bearer token.
+
+        :raises UnverifiedAuthenticationError: if the header is missing or malformed
+        """
+        if header is None:
+            self._reject("missing_header", "No Authorization header received")
+        elif len(header) > self.max_header_size:
+            self._reject("header_too_large", "Authorization header is too large")
+        elif not header.startswith("Bearer "):
+            self._reject("not_bearer", "No Bearer token in Authorization header")
+        return self.validate_token(header[len("Bearer ") :].strip())
+
+    def validate_token(self, token: str) -> str:
+        """
+        Check the syntax of a bearer token, and return it.
+
+        :raises UnverifiedAuthenticationError: if the token is malformed
+        """
+        if len(token) < self.min_token_length:
+            self._reject("token_too_short", "Bearer token is too short")
+        if len(token) > self.max_token_length:
+            self._reject("token_too_long", "Bearer token is too long")
+        if not self.token_pattern.fullmatch(token):
+            self._reject("invalid_characters", "Bearer token has invalid characters")
+        return token
+
+    def _reject(self, reason: str, message: str) -> t.NoReturn:
+        with self._lock:
+            self.rejections[reason] += 1
+        raise UnverifiedAuthenticationError(message)
+
+
+class RejectedTokenCache:
+    """
+    A negative cache which remembers why a token was rejected.
+
+    Tokens which were found to be inactive, or to lack the expected scopes, are
+    recorded by token hash. Later requests with the same token are rejected with the
+    same error, without introspecting the token again.
+
+    :ivar hits: The number of times a token was rejected from this cache
+    """
+
+    def __init__(self, cache: TypedTTLCache[tuple[str, tuple[str, ...]]]) -> None:
+        # values are a reason ("inactive" or "scopes") and the token's scopes
+        self._cache = cache
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def check(self, token_hash: str, expected_scopes: frozenset[str]) -> None:
+        """
+        Raise the error recorded for a token, if any.
+
+        A token which was rejected for lacking some scopes is only rejected again if
+        it lacks some of ``expected_scopes``.
+
+        :raises InactiveTokenError: if the token was found to be inactive
+        :raises InvalidTokenScopesError: if the token lacks some expected scopes
+        """
+        rejection = self._cache.get(token_hash)
+        if rejection is None:
+            return
+        reason, token_scopes = rejection
+        if reason == "inactive":
+            self._record_hit()
+            raise InactiveTokenError("The token is invalid.")
+        if not expected_scopes.issubset(token_scopes):
+            self._record_hit()
+            raise InvalidTokenScopesError(expected_scopes, frozenset(token_scopes))
+
+    def record(
+        self, token_hash: str, error: InactiveTokenError | InvalidTokenScopesError
+    ) -> None:
+        """Remember that a token was rejected with ``error``."""
+        if isinstance(error, InactiveTokenError):
+            self._cache[token_hash] = ("inactive", ())
+        else:
+            self._cache[token_hash] = ("scopes", tuple(sorted(error.actual_scopes)))
+
+    def __contains__(self, token_hash: str) -> bool:
+        return token_hash in self._cache
+
+    def peek(self, token_hash: str) -> bool:
+        """
+        Whether a rejection of the token is held in-process, without counting a
+        lookup or reading the backend.
+        """
+        return self._cache.peek(token_hash) is not None
+
+    @property
+    def backend(self) -> CacheBackend | None:
+        return self._cache.backend
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def _record_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+        with self._lock:
+            self.hits = 0
+
+
+class GroupMembership:
+    """
+    The groups of an identity, as stored in the group membership cache.
+
+    Group IDs are stored as packed 16-byte UUIDs, which is several times smaller
+    than a set of principal strings for identities in many groups.
+
+    :param identity_set_digest: A digest of the identity set of the token used to
+        look up the groups. Groups are listed for all of a token's identities, so
+        the membership only applies to tokens with the same identity set.
+    :param group_ids: The IDs of the groups
+    """
+
+    __slots__ = ("identity_set_digest", "_packed_ids", "_principals")
+
+    def __init__(self, identity_set_digest: str, group_ids: Iterable[str]) -> None:
+        self.identity_set_digest = identity_set_digest
+        self._principals: frozenset[str] | None = None
+        self._packed_ids: bytes | tuple[str, ...]
+        group_ids = tuple(group_ids)
+        try:
+            self._packed_ids = b"".join(uuid.UUID(id_).bytes for id_ in group_ids)
+        except ValueError:
+            # group IDs are always UUIDs, but do not fail if one is not
+            self._packed_ids = group_ids
+
+    def __len__(self) -> int:
+        if isinstance(self._packed_ids, tuple):
+            return len(self._packed_ids)
+        return len(self._packed_ids) // 16
+
+    @property
+    def group_ids(self) -> list[str]:
+        packed = self._packed_ids
+        if isinstance(packed, tuple):
+            return list(packed)
+        return [
+            str(uuid.UUID(bytes=packed[offset : offset + 16]))
+            for offset in range(0, len(packed), 16)
+        ]
+
+    @property
+    def principals(self) -> frozenset[str]:
+        # computed once, since a cached membership is read by many requests
+        if self._principals is None:
+            self._principals = frozenset(group_principal(id_) for id_ in self.group_ids)
+        return self._principals
+
+    def __getstate__(self) -> tuple[str, bytes | tuple[str, ...]]:
+        return (self.identity_set_digest, self._packed_ids)
+
+    def __setstate__(self, state: tuple[str, bytes | tuple[str, ...]]) -> None:
+        self.identity_set_digest, self._packed_ids = state
+        self._principals = None
+
+
+@dataclasses.dataclass(frozen=True)
+class AuthSnapshot:
+    """
+    An immutable, picklable record of a validated caller, taken from an
+    ``AuthState`` by ``AuthState.snapshot()``.
+
+    A snapshot offers the same read-only properties as an ``AuthState``, along
+    with ``check_authorization()`` and ``get_authorizer_for_scope()``, without
+    any calls to Globus Auth or Globus Groups. It holds no clients and no copy of
+    the caller's token, so it can be handed to a background thread or process
+    which acts on behalf of the caller.
+
+    :param effective_identity: The principal of the token's effective identity
+    :param identities: The principals of the token's identities
+    :param scopes: The scopes of the token
+    :param expected_scopes: The scopes which the token was validated against
+    :param groups: The caller's group principals, or ``None`` if they were not
+        resolved when the snapshot was taken
+    :param dependent_tokens: ``(scope, access_token, expires_at_seconds)`` for
+        each of the caller's dependent tokens which were resolved when the
+        snapshot was taken
+    :param expires_at: The expiration time of the token, as a Unix timestamp
+    :param sanitized_token: The last few characters of the token, for logging
+    :param expiry_skew: How long before a dependent token expires to stop using
+        it, in seconds, as configured for the ``AuthState``
+    """
+
+    effective_identity: str
+    identities: frozenset[str]
+    scopes: frozenset[str]
+    expected_scopes: frozenset[str]
+    groups: frozenset[str] | None = None
+    dependent_tokens: tuple[tuple[str, str, int | None], ...] = ()
+    expires_at: int | None = None
+    sanitized_token: str = ""
+    expiry_skew: int = AuthCachePolicy.expiry_skew
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= time.time()
+
+    @property
+    def principals(self) -> frozenset[str]:
+        """The identities and groups of the caller. Unresolved groups are omitted."""
+        return self.identities.union(self.groups or ())
+
+    def check_authorization(
+        self,
+        allowed_principals: Iterable[str],
+        allow_public: bool = False,
+        allow_all_authenticated_users: bool = False,
+    ) -> bool:
+        """
+        Check whether the caller is authorized, as ``AuthState.check_authorization``
+        does. If the caller's groups were not resolved, only their identities are
+        considered.
+        """
+        allowed_set = set(allowed_principals)
+        if allow_public and "public" in allowed_set:
+            return True
+        if (
+            allow_all_authenticated_users
+            and "all_authenticated_users" in allowed_set
+            and self.identities
+        ):
+            return True
+        return bool(allowed_set & self.principals)
+
+    def get_authorizer_for_scope(self, scope: str) -> AccessTokenAuthorizer:
+        """
+        Build an authorizer from the caller's dependent token for ``scope``.
+
+        :raises ValueError: If the snapshot has no dependent token for the scope,
+            or if that token has expired.
+        """
+        for token_scope, access_token, expires_at in self.dependent_tokens:
+            if token_scope == scope:
+                if expires_at is not None and expires_at <= time.time():
+                    raise ValueError("The dependent token has expired.")
+                return AccessTokenAuthorizer(access_token)
+        raise ValueError("Dependent tokens do not match request.")
+
+    def dependent_token_expires_at(self, scope: str) -> int | None:
+        """The expiration time of the dependent token for ``scope``, if known."""
+        for token_scope, _, expires_at in self.dependent_tokens:
+            if token_scope == scope:
+                return expires_at
+        return None
+
+    def get_client_for_scope(
+        self, scope: str, client_class: type[ClientT], client_factory: ClientFactory
+    ) -> ClientT:
+        """
+        Get a client of ``client_class`` which uses the dependent token for
+        ``scope``, from ``client_factory``'s cache of clients.
+
+        :raises ValueError: If the snapshot has no dependent token for the scope,
+            or if that token has expired.
+        """
+        return client_factory.get_client_for_scope(self, scope, client_class)
+
+
+class _RecordSerializer(CacheSerializer[RecordT]):
+    """
+    Serialize cache records as JSON, so that they can be stored in a shared
+    ``CacheBackend``.
+    """
+
+    def __init__(self, record_class: type[RecordT]) -> None:
+        self.record_class: type[RecordT] = record_class
+
+    def dumps(self, value: RecordT) -> bytes:
+        return json.dumps(value.data).encode("utf-8")
+
+    def loads(self, data: bytes) -> RecordT:
+        return self.record_class.from_data(json.loads(data))
+
+
+class _GroupMembershipSerializer(CacheSerializer[GroupMembership]):
+    """Serialize group memberships as JSON, for a shared ``CacheBackend``."""
+
+    def dumps(self, value: GroupMembership) -> bytes:
+        data = {
+            "identity_set_digest": value.identity_set_digest,
+            "group_ids": value.group_ids,
+        }
+        return json.dumps(data).encode("utf-8")
+
+    def loads(self, data: bytes) -> GroupMembership:
+        loaded = json.loads(data)
+        return GroupMembership(loaded["identity_set_digest"], loaded["group_ids"])
+
+
+class _RejectionSerializer(CacheSerializer[t.Tuple[str, t.Tuple[str, ...]]]):
+    """Serialize token rejections as JSON, for a shared ``CacheBackend``."""
+
+    def dumps(self, value: tuple[str, tuple[str, ...]]) -> bytes:
+        reason, token_scopes = value
+        return json.dumps([reason, list(token_scopes)]).encode("utf-8")
+
+    def loads(self, data: bytes) -> tuple[str, tuple[str, ...]]:
+        reason, token_scopes = json.loads(data)
+        return (reason, tuple(token_scopes))
+
+
+class AuthStateCaches:
+    """
+    The collection of caches used by ``AuthState`` objects.
+
+    By default, every ``AuthState`` shares a set of caches stored on the class.
+    Each ``AuthStateBuilder`` owns its own ``AuthStateCaches``, sized and tuned by
+    its ``AuthCachePolicy``.
+    """
+
+    def __init__(
+        self,
+        introspect: TypedTTLCache[IntrospectRecord],
+        dependent_tokens: TypedTTLCache[DependentTokensRecord],
+        group_membership: TypedTTLCache[GroupMembership],
+        rejected_tokens: RejectedTokenCache,
+        *,
+        auth_states: TypedTTLCache[AuthState] | None = None,
+        expiry_skew: int = AuthCachePolicy.expiry_skew,
+        refresher: CacheRefresher | None = None,
+        circuit_breakers: t.Mapping[str, CircuitBreaker] | None = None,
+    ) -> None:
+        self.introspect = introspect
+        self.dependent_tokens = dependent_tokens
+        self.group_membership = group_membership
+        self.rejected_tokens = rejected_tokens
+        # fully built AuthStates, reused by an AuthStateBuilder for repeat callers;
+        # these are only held in-process
+        self.auth_states = auth_states
+        self.expiry_skew = expiry_skew
+        # refreshes dependent tokens and group memberships before they expire
+        self.refresher = refresher
+        # guard the calls to Globus Auth and Groups, by endpoint name
+        self.circuit_breakers = dict(circuit_breakers or {})
+        # tracks the Auth and Groups calls which are in flight, so that concurrent
+        # requests for the same token can share them
+        self.inflight = SingleFlight()
+
+    @classmethod
+    def from_policy(
+        cls,
+        policy: AuthCachePolicy,
+        auth_client: ConfidentialAppAuthClient,
+        *,
+        backend: CacheBackend | None = None,
+        backends: t.Mapping[str, CacheBackend | None] | None = None,
+    ) -> AuthStateCaches:
+        """
+        Create a new set of caches, sized and tuned according to ``policy``.
+        If the policy enables ``refresh_ahead``, the caches get a ``CacheRefresher``,
+        and if it sets ``circuit_breaker``, a ``CircuitBreaker`` for each endpoint.
+
+        :param policy: The settings for each cache
+        :param auth_client: The client used to introspect tokens. Cached
+            values do not require it, and it is accepted for compatibility.
+        :param backend: An optional shared cache backend
+        :param backends: Backends for individual caches, by cache name
+            (``"introspect"``, ``"dependent_tokens"``, ``"group_membership"``, or
+            ``"rejected_tokens"``), which take precedence over ``backend``.
+            A cache which is mapped to ``None`` has no backend.
+        """
+        backends = dict(backends or {})
+        unknown_names = backends.keys() - CACHE_NAMES
+        if unknown_names:
+            raise ValueError(f"Unknown cache names: {sorted(unknown_names)}")
+        for name in CACHE_NAMES:
+            backends.setdefault(name, backend)
+
+        return cls(
+            introspect=TypedTTLCache.from_settings(
+                policy.introspect,
+                backend=backends["introspect"],
+                namespace="introspect:",
+                serializer=_RecordSerializer(IntrospectRecord),
+            ),
+            dependent_tokens=TypedTTLCache.from_settings(
+                policy.dependent_tokens,
+                backend=backends["dependent_tokens"],
+                namespace="dependent_tokens:",
+                serializer=_RecordSerializer(DependentTokensRecord),
+            ),
+            group_membership=TypedTTLCache.from_settings(
+                policy.group_membership,
+                backend=backends["group_membership"],
+                namespace="group_membership:",
+                serializer=_GroupMembershipSerializer(),
+            ),
+            rejected_tokens=RejectedTokenCache(
+                TypedTTLCache.from_settings(
+                    policy.rejected_tokens,
+                    backend=backends["rejected_tokens"],
+                    namespace="rejected_tokens:",
+                    serializer=_RejectionSerializer(),
+                )
+            ),
+            auth_states=(
+                TypedTTLCache.from_settings(policy.auth_states)
+                if policy.auth_states is not None
+                else None
+            ),
+            expiry_skew=policy.expiry_skew,
+            refresher=(
+                CacheRefresher(policy.refresh_ahead, max_workers=policy.refresh_workers)
+                if policy.refresh_ahead is not None
+                else None
+            ),
+            circuit_breakers=(
+                {
+                    endpoint: CircuitBreaker(endpoint, policy.circuit_breaker)
+                    for endpoint in ENDPOINTS
+                }
+                if policy.circuit_breaker is not None
+                else None
+            ),
+        )
+
+    def invalidate_groups(self, identity_id: str) -> None:
+        """
+        Forget the cached groups of an identity, for example after it is added to
+        or removed from a group. Its groups are fetched again on next use.
+
+        :param identity_id: The ID of the identity, which must be the effective
+            identity (``sub``) of the tokens presented by the user
+        """
+        try:
+            del self.group_membership[identity_id]
+        except KeyError:
+            pass
+
+    def stats(self) -> dict[str, CacheStats]:
+        """
+        Return the statistics of each cache, by cache name (``"introspect"``,
+        ``"dependent_tokens"``, ``"group_membership"``, ``"rejected_tokens"``, and
+        ``"auth_states"`` if reuse is enabled).
+        """
+        stats = {
+            "introspect": self.introspect.stats(),
+            "dependent_tokens": self.dependent_tokens.stats(),
+            "group_membership": self.group_membership.stats(),
+            "rejected_tokens": self.rejected_tokens.stats(),
+        }
+        if self.auth_states is not None:
+            stats["auth_states"] = self.auth_states.stats()
+        return stats
+
+    def circuit_breaker_stats(self) -> dict[str, CircuitBreakerStats]:
+        """
+        Return the statistics of each circuit breaker, by endpoint name
+        (``"introspect"``, ``"dependent_tokens"``, and ``"groups"``), if they are
+        enabled.
+        """
+        return {
+            endpoint: breaker.stats()
+            for endpoint, breaker in self.circuit_breakers.items()
+        }
+
+    def clear(self) -> None:
+        self.introspect.clear()
+        self.dependent_tokens.clear()
+        self.group_membership.clear()
+        self.rejected_tokens.clear()
+        if self.auth_states is not None:
+            self.auth_states.clear()
+
+
+class _AuthStateBase:
+    """
+    Behaviors shared by ``AuthState`` and ``AsyncAuthState`` which do not require
+    any I/O: handling token hashes, verifying and reading token introspection data,
+    computing cache lifetimes, and falling back to stale values during outages.
+    """
+
+    bearer_token: str
+    expected_scopes: frozenset[str]
+    group_membership_cache: TypedTTLCache[GroupMembership]
+    _token_data: IntrospectRecord
+
+    # Cached values expire this many seconds before the expiration time reported by
+    # Globus Auth
+    expiry_skew: int = AuthCachePolicy.expiry_skew
+
+    @functools.cached_property
+    def _token_hash(self) -> str:
+        return _hash_token(self.bearer_token)
+
+    @property
+    def _group_membership_cache_key(self) -> str:
+        # groups belong to the identity rather than to the token, so that new
+        # tokens for the same user share the cached groups
+        return str(self._token_data["sub"])
+
+    @functools.cached_property
+    def _identity_set_digest(self) -> str:
+        identity_set = sorted(self._token_data.identity_set)
+        return hashlib.sha256(",".join(identity_set).encode("utf-8")).hexdigest()
+
+    def _cached_group_membership(
+        self, cache: TypedTTLCache[GroupMembership]
+    ) -> GroupMembership | None:
+        """Get the cached groups of the caller, if they apply to this token."""
+        membership = cache.get(self._group_membership_cache_key)
+        if membership is None or membership.identity_set_digest != (
+            self._identity_set_digest
+        ):
+            return None
+        return membership
+
+    @functools.cached_property
+    def _dependent_token_cache_key(self) -> str:
+        # Caching is done based on a hash of the token string, **not** the
+        # dependent_tokens_cache_id.
+        # This guarantees that we get a new access token for any upstream service
+        # calls if we get a new token, which is helpful for cache busting.
+        return f"dependent_tokens:{self._token_hash}"
+
+    @staticmethod
+    def _introspect_result_tenant(introspect_result: IntrospectRecord) -> str | None:
+        """
+        The tenant of an introspect response, for per-tenant cache quotas: the
+        client which obtained the token.
+        """
+        return introspect_result.client_id
+
+    @property
+    def _tenant(self) -> str | None:
+        return self._introspect_result_tenant(self._token_data)
+
+    def _introspect_result_ttl(
+        self, introspect_result: IntrospectRecord | t.Mapping[str, t.Any]
+    ) -> float | None:
+        """
+        Compute the cache lifetime of an introspect response, such that it does not
+        outlive the token's expiration time.
+        Returns ``None`` (the cache's default lifetime) if there is no expiration.
+        """
+        expiration = introspect_result.get("exp")
+        if expiration is None:
+            return None
+        return float(expiration) - time.time() - self.expiry_skew
+
+    def _dependent_tokens_ttl(
+        self, dependent_tokens: DependentTokensRecord
+    ) -> float | None:
+        """
+        Compute the cache lifetime of a dependent token response, such that it
+        expires before the first of its tokens expires.
+        Returns ``None`` (the cache's default lifetime) if there are no tokens.
+        """
+        expires_at = dependent_tokens.expires_at
+        if expires_at is None:
+            return None
+        return float(expires_at) - time.time() - self.expiry_skew
+
+    def _verify_introspect_result(self, introspect_result: IntrospectRecord) -> None:
+        """
+        A helper which checks token introspect properties and raises exceptions on failure.
+        """
+
+        if not introspect_result.active:
+            raise InactiveTokenError("The token is invalid.")
+
+        # validate scopes, ensuring that the token provided accords with the service's
+        # notion of what operations exist and are supported
+        scopes = introspect_result.scopes
+        if not scopes.issuperset(self.expected_scopes):
+            raise InvalidTokenScopesError(self.expected_scopes, scopes)
+
+    # identities are computed once per instance, since an AuthState may be read
+    # many times, and reused across requests by an AuthStateBuilder
+
+    @functools.cached_property
+    def effective_identity(self) -> str:
+        effective = sys.intern(identity_principal(self._token_data["sub"]))
+        return effective
+
+    @functools.cached_property
+    def identities(self) -> frozenset[str]:
+        return frozenset(
+            sys.intern(identity_principal(id_)) for id_ in self._token_data.identity_set
+        )
+
+    def _stale_fallback(
+        self,
+        cache: TypedTTLCache[T],
+        key: str,
+        error: Exception,
+        expires_at: t.Callable[[T], int | None],
+    ) -> T | None:
+        """
+        If ``error`` means that Globus Auth or Groups is unavailable, return the
+        recently expired value cached for ``key``, if there is one and the token it
+        describes has not yet expired.
+        """
+        if not is_outage(error):
+            return None
+        value = cache.get_stale(key)
+        if value is None:
+            return None
+        expiration = expires_at(value)
+        if expiration is not None and expiration <= time.time():
+            return None
+        log.warning(f"Using a stale cached value (key={key}) after error: {error}")
+        return value
+
+    def _stale_groups(self, error: Exception) -> frozenset[str] | None:
+        membership = self._stale_fallback(
+            self.group_membership_cache,
+            self._group_membership_cache_key,
+            error,
+            lambda _: None,
+        )
+        if membership is None or membership.identity_set_digest != (
+            self._identity_set_digest
+        ):
+            return None
+        return membership.principals
+
+    @staticmethod
+    def group_in_principal_list(principal_list: Iterable[str]) -> bool:
+        """Check a list of principals to determine if any of them are group-based
+        principals. Determined by looking for the urn:globus:groups:id prefix on any of
+        the values.
+        """
+        return any(
+            principal.startswith("urn:globus:groups:id") for principal in principal_list
+        )
+
+
+class AuthState(_AuthStateBase):
     # Cache for introspection operations, max lifetime: 30 seconds
-    introspect_cache: TypedTTLCache[globus_sdk.GlobusHTTPResponse] = TypedTTLCache(
+    introspect_cache: TypedTTLCache[IntrospectRecord] = TypedTTLCache(
         maxsize=100, ttl=30
     )
 
     # Cache for dependent tokens, max lifetime: 47 hours: a bit less than the 48 hours
     # for which an access token is valid
-    dependent_tokens_cache: TypedTTLCache[globus_sdk.OAuthDependentTokenResponse] = (
-        TypedTTLCache(maxsize=100, ttl=47 * 3600)
+    dependent_tokens_cache: TypedTTLCache[DependentTokensRecord] = TypedTTLCache(
+        maxsize=100, ttl=47 * 3600
     )
 
     # Cache for group lookups, max lifetime: 5 minutes
-    group_membership_cache: TypedTTLCache[frozenset[str]] = TypedTTLCache(
+    group_membership_cache: TypedTTLCache[GroupMembership] = TypedTTLCache(
         maxsize=100, ttl=60 * 5
     )
 
+    # Cache for rejected tokens, max lifetime: 1 minute
+    rejected_tokens_cache: RejectedTokenCache = RejectedTokenCache(
+        TypedTTLCache(maxsize=1000, ttl=60)
+    )
+
+    # Auth and Groups calls which are in flight, shared by concurrent requests
+    _inflight: SingleFlight = SingleFlight()
+
+    # Refreshes entries before they expire; disabled by default
+    _refresher: CacheRefresher | None = None
+
+    # Circuit breakers for calls to Globus Auth and Groups; disabled by default
+    _circuit_breakers: t.Mapping[str, CircuitBreaker] = {}
+
+    # called when a lazy AuthState has introspected its token, set by a builder
+    _on_introspected: t.Callable[[AuthState], None] | None = None
+
     def __init__(
         self,
         auth_client: ConfidentialAppAuthClient,
         bearer_token: str,
         expected_scopes: frozenset[str],
         client_factory: ClientFactory | None = None,
+        caches: AuthStateCaches | None = None,
+        *,
+        lazy: bool = False,
     ) -> None:
+        """
+        :param auth_client: The client used to introspect the token and get
+            dependent tokens
+        :param bearer_token: The token presented by the caller
+        :param expected_scopes: The scopes which the token is expected to have
+        :param client_factory: A customized ``ClientFactory`` used to build
+            Groups clients. Defaults to a factory shared by all ``AuthState``
+            objects which are not given one.
+        :param caches: The caches to use instead of the class-level caches
+        :param lazy: If true, the token is not introspected until its identities,
+            principals, or authorization are first needed. Otherwise, the token
+            is introspected immediately. Either way, an invalid token raises
+            ``InactiveTokenError`` or ``InvalidTokenScopesError`` when it is
+            introspected.
+        """
         self.auth_client = auth_client
         self.bearer_token = bearer_token
         self.sanitized_token = self.bearer_token[-7:]
         self.expected_scopes = expected_scopes
-        self._client_factory = client_factory or ClientFactory()
+        self._client_factory = client_factory or _DEFAULT_CLIENT_FACTORY
+        if caches is not None:
+            # shadow the class-level caches with the provided caches
+            self.introspect_cache = caches.introspect
+            self.dependent_tokens_cache = caches.dependent_tokens
+            self.group_membership_cache = caches.group_membership
+            self.rejected_tokens_cache = caches.rejected_tokens
+            self.expiry_skew = caches.expiry_skew
+            self._inflight = caches.inflight
+            self._refresher = caches.refresher
+            self._circuit_breakers = caches.circuit_breakers
 
         self.errors: list[Exception] = []
 
-        self._token_data = self.introspect_token()
+        # the principals, and the group principals they were computed from
+        self._principals_memo: tuple[frozenset[str], frozenset[str]] | None = None
+        self._introspect_result: IntrospectRecord | None = None
+        if not lazy:
+            self._introspect_result = self._validated_introspect_record()
 
-    @functools.cached_property
-    def _token_hash(self) -> str:
-        return _hash_token(self.bearer_token)
+    @property
+    def _token_data(self) -> IntrospectRecord:
+        # the validated introspection result, fetched on first use in lazy mode
+        if self._introspect_result is None:
+            self._introspect_result = self._validated_introspect_record()
+            if self._on_introspected is not None:
+                self._on_introspected(self)
+        return self._introspect_result
 
-    @functools.cached_property
-    def _dependent_token_cache_key(self) -> str:
-        # Caching is done based on a hash of the token string, **not** the
-        # dependent_tokens_cache_id.
-        # This guarantees that we get a new access token for any upstream service
-        # calls if we get a new token, which is helpful for cache busting.
-        return f"dependent_tokens:{_hash_token(self.bearer_token)}"
+    @_token_data.setter
+    def _token_data(self, value: IntrospectRecord) -> None:
+        self._introspect_result = value
+
+    @property
+    def is_introspected(self) -> bool:
+        """Whether the token has been introspected and found to be valid."""
+        return self._introspect_result is not None
 
-    def _cached_introspect_call(self) -> GlobusHTTPResponse:
-        introspect_result = AuthState.introspect_cache.get(self._token_hash)
-        if introspect_result is not None:
-            log.debug(
-                f"Using cached introspection response for token_hash={self._token_hash}"
+    def _cached_introspect_call(self) -> IntrospectRecord:
+        # concurrent requests with the same token share a single introspect call
+        try:
+            return self.introspect_cache.get_or_compute(
+                self._token_hash,
+                self._introspect,
+                ttl=self._introspect_result_ttl,
+                tenant=self._introspect_result_tenant,
+                inflight=self._inflight,
+            )
+        except Exception as err:
+            stale = self._stale_fallback(
+                self.introspect_cache, self._token_hash, err, lambda r: r.exp
             )
-            return introspect_result
+            if stale is None:
+                raise
+            return stale
 
+    def _introspect(self) -> IntrospectRecord:
         log.debug(f"Introspecting token <token_hash={self._token_hash}>")
-        introspect_result = self.auth_client.oauth2_token_introspect(
-            self.bearer_token, include="identity_set"
+        return IntrospectRecord.from_data(
+            self._call_endpoint(
+                "introspect",
+                functools.partial(
+                    self.auth_client.oauth2_token_introspect,
+                    self.bearer_token,
+                    include="identity_set",
+                ),
+            )
         )
-        self.introspect_cache[self._token_hash] = introspect_result
 
-        return introspect_result
+    def _call_endpoint(self, endpoint: str, fn: t.Callable[[], T]) -> T:
+        """
+        Call ``fn`` through the circuit breaker for ``endpoint``, if enabled, unless
+        the request deadline has passed.
+        """
+        check_deadline(f"calling {endpoint!r}")
+        breaker = self._circuit_breakers.get(endpoint)
+        if breaker is None:
+            return fn()
+        return breaker.call(fn)
 
-    def introspect_token(self) -> GlobusHTTPResponse:
+    def introspect_token(self) -> globus_sdk.GlobusHTTPResponse:
         """
-        Introspect the caller's credential, retrieving and returning an introspect API
-        response.
+        Introspect the caller's credential, retrieving and returning the
+        introspect API response.
 
         The value will be cached, resulting in only one network call even when this
         method is called multiple times on the same credential. However, each time the
         method is called, the token data is validated.
 
+        Tokens which fail validation are remembered for a short time, and are
+        rejected again without another network call.
+
         :raises InactiveTokenError: a subtype of ValueError, if the token is invalid
             per the introspect data
         :raises InvalidTokenScopesError: a subtype of ValueError, if the token's scopes
             do not include the scopes expected by this AuthState
         """
+        return self._validated_introspect_record().to_response(self.auth_client)
+
+    def _validated_introspect_record(self) -> IntrospectRecord:
+        # the cached introspection result, once validated, as used internally
+        self.rejected_tokens_cache.check(self._token_hash, self.expected_scopes)
         introspect_result = self._cached_introspect_call()
-        self._verify_introspect_result(introspect_result)
+        try:
+            self._verify_introspect_result(introspect_result)
+        except (InactiveTokenError, InvalidTokenScopesError) as err:
+            self.rejected_tokens_cache.record(self._token_hash, err)
+            raise
         return introspect_result
 
-    def _verify_introspect_result(self, introspect_result: GlobusHTTPResponse) -> None:
-        """
-        A helper which checks token introspect properties and raises exceptions on failure.
-        """
-
-        if not introspect_result["active"]:
-            raise InactiveTokenError("The token is invalid.")
-
-        # validate scopes, ensuring that the token provided accords with the service's
-        # notion of what operations exist and are supported
-        scopes = frozenset(introspect_result.get("scope", "").split())
-        if not scopes.issuperset(self.expected_scopes):
-            raise InvalidTokenScopesError(self.expected_scopes, scopes)
-
-    @property
-    def effective_identity(self) -> str:
-        effective = identity_principal(self._token_data["sub"])
-        return effective
-
-    @property
-    def identities(self) -> frozenset[str]:
-        return frozenset(map(identity_principal, self._token_data["identity_set"]))
-
     @property
     def principals(self) -> frozenset[str]:
-        return self.identities.union(self.groups)
+        # groups are looked up on each access, so that changes to the cached
+        # groups are seen, but the union is only rebuilt when they change
+        groups = self.groups
+        memo = self._principals_memo
+        if memo is None or memo[0] is not groups:
+            memo = self._principals_memo = (groups, self.identities.union(groups))
+        return memo[1]
 
     @property
     def groups(self) -> frozenset[str]:
-        group_set: frozenset[str] | None = self.group_membership_cache.get(
-            self._token_hash
+        inflight_key = (
+            f"groups:{self._group_membership_cache_key}:{self._identity_set_digest}"
         )
-        if group_set is None:
-            try:
-                groups_client = self._groups_client
-            except (globus_sdk.GlobusAPIError, KeyError, ValueError):
-                # FIXME: currently this is treated as a soft-fail and produces the
-                #        empty set
-                #
-                # this fails to distinguish between a supported case:
-                #   AP does not have a dependent Groups scope
-                #   and has no desire to handle group-auth
-                #
-                # and an error case:
-                #   attempting to get Groups tokens fails
-                #   but the AP actually *does* intend to support group-auth
-                #
-                # this should become an error in a future release
-                log.error(
-                    "Failed to load GroupsClient. Falling back to empty-set for groups.",
-                    exc_info=True,
-                )
-                return frozenset()
-
-            try:
-                group_data = groups_client.get_my_groups()
-            except globus_sdk.GlobusAPIError:
-                # FIXME: this error handler should be removed in a future release
-                #
-                # ignoring Groups API callout failures should not be default-on behavior
-                log.warning(
-                    "failed to get groups, treating groups as '{}'", exc_info=True
-                )
-                return frozenset()
+        membership = self._cached_group_membership(self.group_membership_cache)
+        if membership is None:
+            # concurrent requests for the same identity share a single groups lookup
+            return self._inflight.do(inflight_key, self._fetch_groups)
+
+        self._refresh_ahead(
+            self.group_membership_cache,
+            self._group_membership_cache_key,
+            inflight_key,
+            self._fetch_groups,
+        )
+        return membership.principals
 
-            group_set = frozenset(group_principal(g["id"]) for g in group_data)
-            self.group_membership_cache[self._token_hash] = group_set
-        return group_set
+    def _refresh_ahead(
+        self,
+        cache: TypedTTLCache[t.Any],
+        key: str,
+        inflight_key: str,
+        fetch: t.Callable[[], t.Any],
+    ) -> None:
+        """
+        If refresh-ahead is enabled and the cached entry for ``key`` is close to
+        expiring, fetch it again in the background. The fetch is shared with any
+        concurrent request which misses the cache.
+        """
+        if self._refresher is not None:
+            self._refresher.maybe_refresh(
+                cache, key, functools.partial(self._inflight.do, inflight_key, fetch)
+            )
+
+    def _fetch_groups(self) -> frozenset[str]:
+        try:
+            groups_client = self._groups_client
+        except (
+            globus_sdk.GlobusAPIError,
+            KeyError,
+            ValueError,
+            CircuitOpenError,
+        ) as err:
+            stale = self._stale_groups(err)
+            if stale is not None:
+                return stale
+            # an open circuit is an outage, not a missing Groups scope
+            if isinstance(err, CircuitOpenError):
+                raise
+            # FIXME: currently this is treated as a soft-fail and produces the
+            #        empty set
+            #
+            # this fails to distinguish between a supported case:
+            #   AP does not have a dependent Groups scope
+            #   and has no desire to handle group-auth
+            #
+            # and an error case:
+            #   attempting to get Groups tokens fails
+            #   but the AP actually *does* intend to support group-auth
+            #
+            # this should become an error in a future release
+            log.error(
+                "Failed to load GroupsClient. Falling back to empty-set for groups.",
+                exc_info=True,
+            )
+            return frozenset()
+
+        start = time.monotonic()
+        try:
+            group_data = self._call_endpoint("groups", groups_client.get_my_groups)
+        except Exception as err:
+            stale = self._stale_groups(err)
+            if stale is not None:
+                return stale
+            if not isinstance(err, globus_sdk.GlobusAPIError):
+                raise
+            # FIXME: this error handler should be removed in a future release
+            #
+            # ignoring Groups API callout failures should not be default-on behavior
+            log.warning("failed to get groups, treating groups as '{}'", exc_info=True)
+            return frozenset()
+
+        membership = GroupMembership(
+            self._identity_set_digest, (g["id"] for g in group_data)
+        )
+        self.group_membership_cache.set(
+            self._group_membership_cache_key,
+            membership,
+            tenant=self._tenant,
+            load_time=time.monotonic() - start,
+        )
+        return membership.principals
 
     def get_dependent_tokens(
         self, *, bypass_cache_lookup: bool = False
@@ -214,21 +1038,35 @@ class AuthState:
         )
 
         if not bypass_cache_lookup:
-            resp = self.dependent_tokens_cache.get(self._dependent_token_cache_key)
-            if resp is not None:
+            cached = self.dependent_tokens_cache.get(self._dependent_token_cache_key)
+            if cached is not None:
                 log.info(
                     f"Using cached dependent token response (key={self._dependent_token_cache_key})"
                 )
-                return resp
+                return cached.to_response(self.auth_client)
 
         log.info(f"Doing a dependent token grant for token ***{self.sanitized_token}")
-        resp = self.auth_client.oauth2_get_dependent_tokens(
-            self.bearer_token, additional_params={"access_type": "offline"}
+        start = time.monotonic()
+        resp = self._call_endpoint(
+            "dependent_tokens",
+            functools.partial(
+                self.auth_client.oauth2_get_dependent_tokens,
+                self.bearer_token,
+                additional_params={"access_type": "offline"},
+            ),
         )
+        load_time = time.monotonic() - start
         log.info(
             f"Caching dependent token response for token ***{self.sanitized_token}"
         )
-        self.dependent_tokens_cache[self._dependent_token_cache_key] = resp
+        record = DependentTokensRecord.from_response(resp)
+        self.dependent_tokens_cache.set(
+            self._dependent_token_cache_key,
+            record,
+            ttl=self._dependent_tokens_ttl(record),
+            tenant=self._tenant,
+            load_time=load_time,
+        )
         return resp
 
     def get_authorizer_for_scope(self, scope: str) -> AccessTokenAuthorizer:
@@ -244,11 +1082,14 @@ class AuthState:
         :raises ValueError: If the dependent token data for the caller does not match
             the requested scope.
         """
+        # a lazily constructed AuthState validates the token before using it
+        self._token_data
         retrieved_from_cache, dependent_tokens = self._get_cached_dependent_tokens()
+        access_token = dependent_tokens.access_token(scope)
 
         # if the dependent token data (which could have been cached) failed to meet
         # the scope requirement...
-        if scope not in dependent_tokens.by_scopes:
+        if access_token is None:
             # if there was no cached value, we just got fresh dependent tokens
             # to do this work but the scope was missing
             # there's no reason to expect new tokens would do better
@@ -260,43 +1101,138 @@ class AuthState:
             # by clearing the cache and asking for the same data
             del self.dependent_tokens_cache[self._dependent_token_cache_key]
             _, dependent_tokens = self._get_cached_dependent_tokens()
+            access_token = dependent_tokens.access_token(scope)
 
             # check scope again -- this is guaranteed to be fresh data
-            if scope not in dependent_tokens.by_scopes:
+            if access_token is None:
                 raise ValueError("Dependent tokens do not match request.")
 
-        token_data = dependent_tokens.by_scopes[scope]
-        return AccessTokenAuthorizer(token_data["access_token"])
+        return AccessTokenAuthorizer(access_token)
+
+    def dependent_token_expires_at(self, scope: str) -> int | None:
+        """
+        The expiration time of the caller's cached dependent token for ``scope``,
+        as a Unix timestamp, if known.
+        """
+        dependent_tokens = self.dependent_tokens_cache.get(
+            self._dependent_token_cache_key
+        )
+        if dependent_tokens is None:
+            return None
+        return dependent_tokens.expires_at_for(scope)
+
+    def get_client_for_scope(self, scope: str, client_class: type[ClientT]) -> ClientT:
+        """
+        Get a client of ``client_class`` which acts on behalf of the caller with
+        their dependent token for ``scope``. Clients are cached and shared by
+        ``AuthState`` objects with the same dependent token, until it expires.
+        See ``ClientFactory.get_client_for_scope``.
+
+        :raises ValueError: If the dependent token data for the caller does not match
+            the requested scope.
+        """
+        return self._client_factory.get_client_for_scope(self, scope, client_class)
 
     def _get_cached_dependent_tokens(
         self,
-    ) -> tuple[bool, globus_sdk.OAuthDependentTokenResponse]:
+    ) -> tuple[bool, DependentTokensRecord]:
         """
         Get dependent token data, potentially from cache.
         Return the data paired with a bool indicating whether or not the value was
         cached or a fresh callout.
         """
-        if self._dependent_token_cache_key in self.dependent_tokens_cache:
-            return (True, self.dependent_tokens_cache[self._dependent_token_cache_key])
-        token_response = self.auth_client.oauth2_get_dependent_tokens(self.bearer_token)
-        self.dependent_tokens_cache[self._dependent_token_cache_key] = token_response
+        cached_response = self.dependent_tokens_cache.get(
+            self._dependent_token_cache_key
+        )
+        if cached_response is not None:
+            self._refresh_ahead(
+                self.dependent_tokens_cache,
+                self._dependent_token_cache_key,
+                self._dependent_token_cache_key,
+                self._grant_dependent_tokens,
+            )
+            return (True, cached_response)
+        # concurrent requests with the same token share a single grant
+        # a response shared with a concurrent request is still a fresh callout
+        try:
+            token_response = self._inflight.do(
+                self._dependent_token_cache_key, self._grant_dependent_tokens
+            )
+        except Exception as err:
+            stale = self._stale_fallback(
+                self.dependent_tokens_cache,
+                self._dependent_token_cache_key,
+                err,
+                lambda r: r.expires_at,
+            )
+            if stale is None:
+                raise
+            return (True, stale)
         return (False, token_response)
 
-    @functools.cached_property
-    def _groups_client(self) -> globus_sdk.GroupsClient:
-        authorizer = self.get_authorizer_for_scope(
-            globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+    def _grant_dependent_tokens(self) -> DependentTokensRecord:
+        start = time.monotonic()
+        dependent_tokens = DependentTokensRecord.from_response(
+            self._call_endpoint(
+                "dependent_tokens",
+                functools.partial(
+                    self.auth_client.oauth2_get_dependent_tokens, self.bearer_token
+                ),
+            )
+        )
+        self.dependent_tokens_cache.set(
+            self._dependent_token_cache_key,
+            dependent_tokens,
+            ttl=self._dependent_tokens_ttl(dependent_tokens),
+            tenant=self._tenant,
+            load_time=time.monotonic() - start,
         )
-        return self._client_factory.make_groups_client(authorizer=authorizer)
+        return dependent_tokens
 
-    @staticmethod
-    def group_in_principal_list(principal_list: Iterable[str]) -> bool:
-        """Check a list of principals to determine if any of them are group-based
-        principals. Determined by looking for the urn:globus:groups:id prefix on any of
-        the values.
+    def snapshot(self, *, resolve_groups: bool = False) -> AuthSnapshot:
         """
-        return any(
-            principal.startswith("urn:globus:groups:id") for principal in principal_list
+        Take an ``AuthSnapshot`` of the caller, for use by background work.
+
+        The snapshot includes the caller's groups and dependent tokens if they are
+        cached, so taking it makes no calls to Globus Groups, nor any dependent
+        token grants. Call ``get_authorizer_for_scope()`` first to make sure that
+        the dependent tokens are included.
+
+        :param resolve_groups: If true, fetch the caller's groups if they are not
+            cached, so that they are always included
+        """
+        token_data = self._token_data
+        groups: frozenset[str] | None
+        if resolve_groups:
+            groups = self.groups
+        else:
+            membership = self._cached_group_membership(self.group_membership_cache)
+            groups = membership.principals if membership is not None else None
+
+        dependent_tokens = []
+        record = self.dependent_tokens_cache.get(self._dependent_token_cache_key)
+        if record is not None:
+            for _, scopes, access_token, expires_at, *_ in record.tokens:
+                for scope in scopes.split():
+                    dependent_tokens.append((scope, access_token, expires_at))
+
+        return AuthSnapshot(
+            effective_identity=self.effective_identity,
+            identities=self.identities,
+            scopes=token_data.scopes,
+            expected_scopes=self.expected_scopes,
+            groups=groups,
+            dependent_tokens=tuple(dependent_tokens),
+            expires_at=token_data.exp,
+            sanitized_token=self.sanitized_token,
+            expiry_skew=self.expiry_skew,
+        )
+
+    @functools.cached_property
+    def _groups_client(self) -> globus_sdk.GroupsClient:
+        return self.get_client_for_scope(
+            globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships,
+            globus_sdk.GroupsClient,
         )
 
     def check_authorization(
@@ -327,7 +1263,7 @@ class AuthState:
         # If the action provider's access list includes group principals,
         # an additional call to Globus Auth is needed to get the user's groups.
         if AuthState.group_in_principal_list(allowed_set):
-            all_principals |= self.groups  # I/O call, possibly cached
+            all_principals = self.principals  # I/O call, possibly cached
 
         return bool(allowed_set & all_principals)
 
@@ -339,21 +1275,200 @@ class AuthStateBuilder:
         expected_scopes: Iterable[str],
         *,
         client_factory: ClientFactory | None = None,
+        cache_policy: AuthCachePolicy | None = None,
+        cache_backend: CacheBackend | None = None,
+        cache_backends: t.Mapping[str, CacheBackend | None] | None = None,
+        prefetch_groups: bool = False,
     ) -> None:
+        """
+        :param auth_client: The client used to introspect tokens and get
+            dependent tokens
+        :param expected_scopes: The scopes which tokens are expected to have
+        :param client_factory: A customized ``ClientFactory`` used to build
+            Groups clients
+        :param cache_policy: The size, TTL, and eviction settings for the caches
+            owned by this builder. Defaults to ``AuthCachePolicy()``.
+        :param cache_backend: A shared ``CacheBackend`` used to share cached
+            Auth and Groups results between processes. If omitted, cached values
+            are only held in-process.
+        :param cache_backends: Backends for individual caches, by cache name,
+            which take precedence over ``cache_backend``. For example, dependent
+            tokens may be kept in a durable, encrypted backend.
+        :param prefetch_groups: If true, the groups of each caller are fetched in
+            the background as soon as their token is introspected, so that they
+            are ready (or in flight) by the time they are needed. Enable this when
+            authorization depends on group membership. For an ``AuthState`` built
+            with ``lazy=True``, the prefetch starts when the token is first
+            introspected.
+        """
         self.auth_client = auth_client
         self.default_expected_scopes = frozenset(expected_scopes)
         self.client_factory = client_factory or ClientFactory()
+        self.cache_policy = cache_policy or AuthCachePolicy()
+        self.caches = AuthStateCaches.from_policy(
+            self.cache_policy,
+            auth_client,
+            backend=cache_backend,
+            backends=cache_backends,
+        )
+        self.prefetcher = Prefetcher() if prefetch_groups else None
+
+    def invalidate_groups(self, identity_id: str) -> None:
+        """
+        Forget the cached groups of an identity, so that they are fetched again on
+        next use. See ``AuthStateCaches.invalidate_groups``.
+        """
+        self.caches.invalidate_groups(identity_id)
 
     def build(
-        self, access_token: str, expected_scopes: Iterable[str] | None = None
+        self,
+        access_token: str,
+        expected_scopes: Iterable[str] | None = None,
+        *,
+        lazy: bool = False,
     ) -> AuthState:
+        """
+        Build an ``AuthState`` for ``access_token``.
+
+        :param access_token: The token presented by the caller
+        :param expected_scopes: The scopes which the token is expected to have.
+            Defaults to the builder's expected scopes.
+        :param lazy: Defer introspection of the token until it is first needed
+
+        If the policy's ``auth_states`` cache is enabled, an ``AuthState`` built
+        and introspected recently for the same token and scopes is returned
+        again, with its introspection data, identities, and principals already
+        computed. That object is shared by every request with the token, possibly
+        on other threads at the same time, so callers must not modify it, for
+        example by appending to its ``errors``.
+
+        :raises InactiveTokenError: if the token is invalid (unless ``lazy``)
+        :raises InvalidTokenScopesError: if the token lacks the expected scopes
+            (unless ``lazy``)
+        """
         if expected_scopes is None:
             expected_scopes = self.default_expected_scopes
         else:
             expected_scopes = frozenset(expected_scopes)
+
+        auth_state = self._build_or_reuse(access_token, expected_scopes, lazy)
+        if self.prefetcher is not None:
+            if auth_state.is_introspected:
+                self._prefetch_groups(self.prefetcher, auth_state)
+            else:
+                # a lazy AuthState prefetches once its token is introspected
+                auth_state._on_introspected = functools.partial(
+                    self._prefetch_groups, self.prefetcher
+                )
+        return auth_state
+
+    def build_many(
+        self,
+        access_tokens: Iterable[str],
+        expected_scopes: Iterable[str] | None = None,
+        *,
+        max_concurrency: int = 8,
+    ) -> list[AuthState | Exception]:
+        """
+        Build an ``AuthState`` for each of several tokens, for example to check the
+        authorization of many stored actions at once.
+
+        Each distinct token is only validated once. Tokens whose introspection
+        results (or rejections) are cached in-process are built immediately, and
+        the rest, including those cached in a shared backend, are built
+        concurrently on a thread pool.
+
+        :param access_tokens: The tokens to validate
+        :param expected_scopes: The scopes which the tokens are expected to have.
+            Defaults to the builder's expected scopes.
+        :param max_concurrency: The maximum number of tokens to introspect at once
+
+        :returns: The ``AuthState`` for each token, in the order of
+            ``access_tokens``, or, in place of an ``AuthState``, the exception
+            raised when building it, such as ``InactiveTokenError``
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if expected_scopes is not None:
+            expected_scopes = frozenset(expected_scopes)
+
+        access_tokens = list(access_tokens)
+        results: dict[str, AuthState | Exception] = {}
+        uncached: list[str] = []
+        for access_token in dict.fromkeys(access_tokens):
+            token_hash = _hash_token(access_token)
+            # peek, so that the lookup made by build() is the only one counted
+            if self.caches.introspect.peek(token_hash) is not None or (
+                self.caches.rejected_tokens.peek(token_hash)
+            ):
+                results[access_token] = self._build_or_error(
+                    access_token, expected_scopes
+                )
+            else:
+                uncached.append(access_token)
+
+        if uncached:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(max_concurrency, len(uncached)),
+                thread_name_prefix="globus-apt-build",
+            ) as executor:
+                built = executor.map(
+                    functools.partial(
+                        self._build_or_error, expected_scopes=expected_scopes
+                    ),
+                    uncached,
+                )
+                results.update(zip(uncached, built))
+
+        return [results[access_token] for access_token in access_tokens]
+
+    def _build_or_error(
+        self, access_token: str, expected_scopes: Iterable[str] | None
+    ) -> AuthState | Exception:
+        try:
+            return self.build(access_token, expected_scopes)
+        except Exception as err:
+            return err
+
+    def _prefetch_groups(self, prefetcher: Prefetcher, auth_state: AuthState) -> None:
+        # the dependent token grant and the groups call run in the background,
+        # while the request is parsed and validated
+        # a request which needs the groups before they arrive joins the call
+        if auth_state._cached_group_membership(self.caches.group_membership) is None:
+            prefetcher.submit(
+                f"groups:{auth_state._group_membership_cache_key}",
+                lambda: auth_state.groups,
+            )
+
+    def _build_or_reuse(
+        self, access_token: str, expected_scopes: frozenset[str], lazy: bool
+    ) -> AuthState:
+        auth_states = self.caches.auth_states
+        if auth_states is None:
+            return self._build(access_token, expected_scopes, lazy)
+
+        cache_key = f"{_hash_token(access_token)}:{' '.join(sorted(expected_scopes))}"
+        auth_state = auth_states.get(cache_key)
+        if auth_state is None:
+            auth_state = self._build(access_token, expected_scopes, lazy)
+            # only states whose token has been validated are shared, and no
+            # longer than the token's introspection result is cached
+            if auth_state.is_introspected:
+                auth_states.set(
+                    cache_key,
+                    auth_state,
+                    ttl=auth_state._introspect_result_ttl(auth_state._token_data),
+                )
+        return auth_state
+
+    def _build(
+        self, access_token: str, expected_scopes: frozenset[str], lazy: bool
+    ) -> AuthState:
         return AuthState(
             self.auth_client,
             access_token,
             expected_scopes,
             client_factory=self.client_factory,
+            caches=self.caches,
+            lazy=lazy,
         )
@@ -0,0 +1,268 @@
+"""
+Shared storage backends for the ``AuthState`` caches.
+
+By default, the ``AuthState`` caches live in the memory of a single process.
+When an Action Provider runs under a multi-process server (e.g. gunicorn with
+several workers), each worker will independently introspect the same token,
+perform the same dependent token grant, and fetch the same group memberships.
+
+A ``CacheBackend`` provides a shared, second-tier store behind the in-process
+caches, so that all workers on a node (or in a deployment) can share the results
+of calls to Globus Auth and Globus Groups.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import typing as t
+from abc import ABC, abstractmethod
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+log = logging.getLogger(__name__)
+
+#: The names of the ``AuthState`` caches, which may each be given their own backend
+CACHE_NAMES = frozenset(
+    {"introspect", "dependent_tokens", "group_membership", "rejected_tokens"}
+)
+
+
+class CacheBackend(ABC):
+    """
+    The interface for a shared cache backend.
+
+    Backends store opaque ``bytes`` values under string keys, with a TTL given in
+    seconds. Serialization of values is handled by the caller.
+
+    Implementations must be safe to use from multiple threads.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Return the value stored under ``key``, or ``None`` if absent or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key`` from the backend. Missing keys are ignored."""
+
+    @abstractmethod
+    def clear(self, prefix: str = "") -> None:
+        """Remove all keys which begin with ``prefix``."""
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    A cache backend which stores values in a local SQLite database file.
+
+    This allows all worker processes on a single host to share cached values
+    without running any additional infrastructure. The database is created on
+    first use.
+
+    Expired values are never returned, and are deleted from the database by a
+    write at most once every ``purge_interval`` seconds, or by
+    ``purge_expired()``.
+
+    A new database file is created readable and writable by its owner only,
+    since the cached values include callers' dependent tokens unless they are
+    encrypted with an ``EncryptedCacheBackend``.
+
+    :param path: The path to the SQLite database file.
+    :param timeout: How long (in seconds) to wait on a locked database before
+        raising an error.
+    :param purge_interval: How often (in seconds) expired values are deleted
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        timeout: float = 5.0,
+        purge_interval: float = 60.0,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.timeout = timeout
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._purge_lock = threading.Lock()
+        self._next_purge = 0.0
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared across threads,
+        # so each thread lazily opens its own connection
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.path != ":memory:":
+                # create the file, if it does not exist, with owner-only access
+                os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL"
+                ")"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> bytes | None:
+        row = self._connection.execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        return bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        connection = self._connection
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, now + ttl),
+        )
+        # one write per interval in each process purges expired values
+        with self._purge_lock:
+            purge = now >= self._next_purge
+            if purge:
+                self._next_purge = now + self.purge_interval
+        if purge:
+            self.purge_expired()
+
+    def purge_expired(self) -> None:
+        """Delete the values which have expired."""
+        self._connection.execute(
+            "DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+        )
+
+    def delete(self, key: str) -> None:
+        self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self, prefix: str = "") -> None:
+        # escape LIKE wildcards so that the prefix is matched literally
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        self._connection.execute(
+            "DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",)
+        )
+
+
+class RedisClientProtocol(t.Protocol):
+    """The subset of the ``redis.Redis`` client interface used by the backend."""
+
+    def get(self, name: str) -> bytes | None: ...
+
+    def set(self, name: str, value: bytes, ex: int | None = None) -> t.Any: ...
+
+    def delete(self, *names: str) -> t.Any: ...
+
+    def scan_iter(self, match: str | None = None) -> t.Iterable[t.Any]: ...
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    A cache backend which stores values in Redis, or any server which speaks a
+    Redis-compatible protocol.
+
+    The client object is supplied by the caller, so that this library does not
+    need to depend on any particular Redis client library. Any object providing
+    ``get``, ``set`` (with an ``ex`` parameter), ``delete``, and ``scan_iter``
+    methods compatible with ``redis.Redis`` may be used.
+
+    :param client: The Redis client.
+    :param key_prefix: A prefix applied to all keys, to isolate the keys used by
+        this backend from other users of the same Redis database.
+    """
+
+    def __init__(
+        self, client: RedisClientProtocol, *, key_prefix: str = "globus-apt:"
+    ) -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.key_prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        # Redis expiration times are integers, and must be positive
+        self.client.set(self.key_prefix + key, value, ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.key_prefix + key)
+
+    def clear(self, prefix: str = "") -> None:
+        keys = list(self.client.scan_iter(match=f"{self.key_prefix}{prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class EncryptedCacheBackend(CacheBackend):
+    """
+    A cache backend which encrypts values before storing them in another backend.
+
+    Values are encrypted with Fernet (AES in CBC mode, authenticated with
+    HMAC-SHA256) from the ``cryptography`` package. Values which cannot be
+    decrypted, for example because they were written with a key which is no
+    longer configured, are treated as missing.
+
+    Wrapping a ``SQLiteCacheBackend`` gives a durable store for dependent tokens,
+    which remain valid for much longer than a typical worker process runs:
+
+    .. code-block:: python
+
+        EncryptedCacheBackend(
+            SQLiteCacheBackend("/var/lib/my-provider/tokens.sqlite"),
+            os.environ["TOKEN_CACHE_KEY"],
+        )
+
+    :param backend: The backend in which encrypted values are stored
+    :param keys: A Fernet key, as created by ``generate_key()``, or a sequence of
+        keys. Values are encrypted with the first key, and may be decrypted with
+        any of the keys, so that keys can be rotated by adding a new first key.
+    """
+
+    def __init__(
+        self, backend: CacheBackend, keys: str | bytes | t.Sequence[str | bytes]
+    ) -> None:
+        if isinstance(keys, (str, bytes)):
+            keys = [keys]
+        if not keys:
+            raise ValueError("At least one encryption key is required")
+        self.backend = backend
+        self._fernet = MultiFernet([Fernet(key) for key in keys])
+
+    @staticmethod
+    def generate_key() -> str:
+        """Create a new random encryption key."""
+        return Fernet.generate_key().decode("ascii")
+
+    def get(self, key: str) -> bytes | None:
+        data = self.backend.get(key)
+        if data is None:
+            return None
+        try:
+            return self._fernet.decrypt(data)
+        except InvalidToken:
+            log.warning(f"Unable to decrypt the cached value for {key}; ignoring it")
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.backend.set(key, self._fernet.encrypt(value), ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def clear(self, prefix: str = "") -> None:
+        self.backend.clear(prefix)
@@ -0,0 +1,256 @@
+"""
+A frequency-aware admission and eviction policy for the ``AuthState`` caches.
+
+Least-recently-used eviction admits every new key, so a burst of keys which are
+seen only once (for example, a crawler presenting thousands of distinct tokens)
+evicts the entries of steady, high-volume callers. ``WTinyLFUCache`` implements
+W-TinyLFU: new keys enter a small LRU window, and a key leaving the window only
+displaces an entry in the main cache if it has been seen more often, according
+to a compact count-min sketch of recent access frequencies.
+"""
+
+from __future__ import annotations
+
+import array
+import collections
+import typing as t
+
+import cachetools
+
+_MARKER = object()
+
+
+class CountMinSketch:
+    """
+    Approximate counts of recent accesses to keys, held in a fixed amount of
+    memory.
+
+    Counts are capped at 15, and all counts are halved once ``sample_size``
+    accesses have been recorded, so that the sketch reflects recent frequency.
+    A "doorkeeper" set absorbs the first access to each key, so that keys which
+    are only seen once do not inflate the counts of other keys.
+
+    :param width: The number of counters in each row of the sketch. Rounded up to
+        a power of two.
+    :param sample_size: The number of accesses after which all counts are halved.
+        Defaults to ten times ``width``.
+    """
+
+    _DEPTH = 4
+    _MAX_COUNT = 15
+
+    def __init__(self, width: int, *, sample_size: int | None = None) -> None:
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.sample_size = sample_size or 10 * width
+        self._mask = self.width - 1
+        self._rows = [array.array("B", bytes(self.width)) for _ in range(self._DEPTH)]
+        self._doorkeeper: set[int] = set()
+        self._additions = 0
+
+    def _indexes(self, key_hash: int) -> list[int]:
+        # derive each row's index from two halves of a single hash
+        key_hash &= 0xFFFFFFFFFFFFFFFF
+        low, high = key_hash & 0xFFFFFFFF, (key_hash >> 32) | 1
+        return [(low + i * high) & self._mask for i in range(self._DEPTH)]
+
+    def increment(self, key: t.Hashable) -> None:
+        key_hash = hash(key)
+        if key_hash not in self._doorkeeper:
+            self._doorkeeper.add(key_hash)
+        else:
+            for row, index in zip(self._rows, self._indexes(key_hash)):
+                if row[index] < self._MAX_COUNT:
+                    row[index] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key: t.Hashable) -> int:
+        key_hash = hash(key)
+        count = min(
+            row[index] for row, index in zip(self._rows, self._indexes(key_hash))
+        )
+        return count + (key_hash in self._doorkeeper)
+
+    def _age(self) -> None:
+        self._rows = [
+            array.array("B", (count >> 1 for count in row)) for row in self._rows
+        ]
+        self._doorkeeper.clear()
+        self._additions //= 2
+
+
+class WTinyLFUCache(cachetools.Cache):
+    """
+    A cache with W-TinyLFU admission and eviction.
+
+    New keys are held in an LRU "window" of about 1% of the cache. When the
+    window is full, its least recently used key becomes a candidate for the main
+    cache, a segmented LRU with "probation" and "protected" segments. The
+    candidate is admitted only if it has been accessed more often than the
+    main cache's next victim; otherwise, the candidate is discarded. Keys which
+    are accessed again while on probation are promoted to the protected
+    segment.
+
+    Optionally, the keys of any one tenant may be limited to a fraction of the
+    cache. When a tenant reaches its quota, each new key for that tenant
+    replaces that tenant's least recently used key, rather than displacing the
+    keys of other tenants.
+
+    :param maxsize: The maximum number of entries
+    :param window: The fraction of ``maxsize`` used for the admission window
+    :param protected: The fraction of the main cache used for protected entries
+    :param tenant_quota: The fraction of ``maxsize`` which may be held by any
+        one tenant, or ``None`` for no limit
+    :param get_tenant: Returns the tenant of a cached value, or ``None`` if the
+        value does not belong to a tenant
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        *,
+        window: float = 0.01,
+        protected: float = 0.8,
+        tenant_quota: float | None = None,
+        get_tenant: t.Callable[[t.Any], str | None] | None = None,
+    ) -> None:
+        if tenant_quota is not None and not 0 < tenant_quota <= 1:
+            raise ValueError("tenant_quota must be greater than 0 and at most 1")
+        super().__init__(maxsize)
+        self._window_maxsize = max(1, int(maxsize * window))
+        self._main_maxsize = max(0, maxsize - self._window_maxsize)
+        self._protected_maxsize = int(self._main_maxsize * protected)
+        self._window: collections.OrderedDict[t.Hashable, None] = (
+            collections.OrderedDict()
+        )
+        self._probation: collections.OrderedDict[t.Hashable, None] = (
+            collections.OrderedDict()
+        )
+        self._protected: collections.OrderedDict[t.Hashable, None] = (
+            collections.OrderedDict()
+        )
+        self._sketch = CountMinSketch(maxsize)
+
+        self.tenant_quota = tenant_quota
+        self._get_tenant = get_tenant
+        self._tenant_maxsize = (
+            max(1, int(maxsize * tenant_quota)) if tenant_quota is not None else 0
+        )
+        self._key_tenants: dict[t.Hashable, str] = {}
+        self._tenant_keys: dict[str, collections.OrderedDict[t.Hashable, None]] = {}
+
+    def __getitem__(self, key: t.Hashable) -> t.Any:
+        value = super().__getitem__(key)
+        self._sketch.increment(key)
+        self._touch(key)
+        return value
+
+    def __setitem__(self, key: t.Hashable, value: t.Any) -> None:
+        self._sketch.increment(key)
+        tenant = self._get_tenant(value) if self._get_tenant is not None else None
+
+        if key in self:
+            self._untrack_tenant(key)
+            self._touch(key)
+        else:
+            if self._tenant_maxsize and tenant is not None:
+                tenant_keys = self._tenant_keys.get(tenant)
+                if tenant_keys is not None and len(tenant_keys) >= self._tenant_maxsize:
+                    # the tenant is at its quota, and replaces its own oldest entry
+                    self._discard(next(iter(tenant_keys)))
+            self._window[key] = None
+            if len(self._window) > self._window_maxsize:
+                candidate, _ = self._window.popitem(last=False)
+                self._admit(candidate)
+
+        super().__setitem__(key, value)
+        if tenant is not None and self._tenant_maxsize:
+            self._key_tenants[key] = tenant
+            self._tenant_keys.setdefault(tenant, collections.OrderedDict())[key] = None
+
+    def __delitem__(self, key: t.Hashable) -> None:
+        super().__delitem__(key)
+        self._untrack(key)
+
+    def pop(self, key: t.Hashable, default: t.Any = _MARKER) -> t.Any:
+        # unlike a lookup, removing a key is not an access
+        if key in self:
+            value = super().__getitem__(key)
+            del self[key]
+            return value
+        if default is _MARKER:
+            raise KeyError(key)
+        return default
+
+    def popitem(self) -> tuple[t.Hashable, t.Any]:
+        """Remove and return the entry which would be evicted next."""
+        for segment in (self._probation, self._window, self._protected):
+            if segment:
+                key = next(iter(segment))
+                return (key, self.pop(key))
+        raise KeyError(f"{type(self).__name__} is empty")
+
+    def clear(self) -> None:
+        for segment in (self._window, self._probation, self._protected):
+            for key in list(segment):
+                super().__delitem__(key)
+            segment.clear()
+        self._key_tenants.clear()
+        self._tenant_keys.clear()
+
+    def _admit(self, candidate: t.Hashable) -> None:
+        """Move ``candidate`` from the window into the main cache, if it is worthy."""
+        if len(self._probation) + len(self._protected) < self._main_maxsize:
+            self._probation[candidate] = None
+            return
+
+        main_segment = self._probation or self._protected
+        if not main_segment:
+            self._evict(candidate)
+            return
+        victim = next(iter(main_segment))
+        if self._sketch.estimate(candidate) > self._sketch.estimate(victim):
+            self._discard(victim)
+            self._probation[candidate] = None
+        else:
+            self._evict(candidate)
+
+    def _touch(self, key: t.Hashable) -> None:
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self._protected_maxsize:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        tenant = self._key_tenants.get(key)
+        if tenant is not None:
+            self._tenant_keys[tenant].move_to_end(key)
+
+    def _discard(self, key: t.Hashable) -> None:
+        """Remove a key which is tracked by the segments and stored in the cache."""
+        super().__delitem__(key)
+        self._untrack(key)
+
+    def _evict(self, key: t.Hashable) -> None:
+        """Remove a key which has already been removed from the segments."""
+        super().__delitem__(key)
+        self._untrack_tenant(key)
+
+    def _untrack(self, key: t.Hashable) -> None:
+        for segment in (self._window, self._probation, self._protected):
+            if segment.pop(key, _MARKER) is not _MARKER:
+                break
+        self._untrack_tenant(key)
+
+    def _untrack_tenant(self, key: t.Hashable) -> None:
+        tenant = self._key_tenants.pop(key, None)
+        if tenant is not None:
+            tenant_keys = self._tenant_keys[tenant]
+            del tenant_keys[key]
+            if not tenant_keys:
+                del self._tenant_keys[tenant]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import dataclasses
+import typing as t
+
+EvictionPolicy = t.Literal["lru", "lfu", "fifo", "tinylfu"]
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheSettings:
+    """
+    The sizing and expiration settings for a single cache.
+
+    :param maxsize: The maximum number of entries held in the cache
+    :param ttl: The maximum lifetime of an entry, in seconds
+    :param eviction: The strategy used to choose an entry to evict when the cache
+        is full: least-recently-used (``"lru"``), least-frequently-used
+        (``"lfu"``), first-in-first-out (``"fifo"``), or W-TinyLFU
+        (``"tinylfu"``), which only admits new entries which are accessed more
+        often than the entries they would replace
+    :param jitter: The fraction, between 0 and 1, by which each entry's lifetime
+        may be randomly shortened, so that entries cached together do not all
+        expire together
+    :param early_expiration: How eagerly entries are recomputed before they
+        expire, as the ``beta`` parameter of probabilistic early expiration.
+        ``0`` disables early expiration.
+    :param shards: The number of independently locked segments the cache is
+        split into. More shards reduce contention between threads, at the cost of
+        applying eviction to each shard separately.
+    :param tenant_quota: The fraction of the cache which may be held by the
+        entries of any one tenant (the client which obtained the token), so that
+        one client cannot evict the entries of all others. Requires
+        ``"tinylfu"`` eviction.
+    :param stale_if_error: For how many seconds after an entry expires it may
+        still be used if fetching a new value fails because Globus Auth or Groups
+        is unavailable. ``0`` disables stale values.
+    """
+
+    maxsize: int
+    ttl: int
+    eviction: EvictionPolicy = "lru"
+    jitter: float = 0.0
+    early_expiration: float = 0.0
+    shards: int = 1
+    tenant_quota: float | None = None
+    stale_if_error: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class CircuitBreakerSettings:
+    """
+    The thresholds of the circuit breakers which guard calls to Globus Auth and
+    Globus Groups.
+
+    A breaker opens when at least ``failure_rate`` of the last ``window`` calls
+    (and at least ``minimum_calls`` calls) failed or were slow. While it is open,
+    calls fail immediately. After ``open_duration`` seconds, it lets up to
+    ``half_open_calls`` calls through to probe the service, and closes if they
+    all succeed, or opens again if any fails.
+
+    :param failure_rate: The fraction of failed or slow calls which opens the
+        breaker
+    :param window: The number of recent calls considered
+    :param minimum_calls: The number of calls needed before the breaker may open
+    :param slow_call_duration: Calls which take at least this many seconds count as
+        failures. ``None`` disables the latency threshold.
+    :param open_duration: How long the breaker stays open before probing, in
+        seconds
+    :param half_open_calls: The number of probe calls
+    """
+
+    failure_rate: float = 0.5
+    window: int = 20
+    minimum_calls: int = 5
+    slow_call_duration: float | None = 5.0
+    open_duration: float = 30.0
+    half_open_calls: int = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class ConcurrencyLimitSettings:
+    """
+    The bounds and thresholds of the adaptive limits on concurrent calls to
+    Globus Auth and Globus Groups.
+
+    :param initial_limit: The number of concurrent calls allowed at first
+    :param min_limit: The lowest the limit may fall
+    :param max_limit: The highest the limit may rise
+    :param backoff_ratio: The factor by which a failed, rate limited, or slow call
+        lowers the limit
+    :param slow_call_duration: Calls which take at least this many seconds lower
+        the limit
+    :param queue_timeout: How long a caller waits for a call to finish before
+        giving up, in seconds
+    """
+
+    initial_limit: int = 20
+    min_limit: int = 1
+    max_limit: int = 200
+    backoff_ratio: float = 0.9
+    slow_call_duration: float = 2.0
+    queue_timeout: float = 10.0
+
+
+@dataclasses.dataclass(frozen=True)
+class AuthCachePolicy:
+    """
+    The settings for each of the caches used by ``AuthState`` objects.
+
+    The defaults match the caches which ``AuthState`` uses when it is constructed
+    directly, without an ``AuthStateBuilder``.
+    """
+
+    # Cache for introspection operations, max lifetime: 30 seconds
+    introspect: CacheSettings = CacheSettings(maxsize=100, ttl=30)
+    # Cache for dependent tokens, max lifetime: 47 hours: a bit less than the 48
+    # hours for which an access token is valid
+    dependent_tokens: CacheSettings = CacheSettings(maxsize=100, ttl=47 * 3600)
+    # Cache for group lookups, max lifetime: 5 minutes
+    group_membership: CacheSettings = CacheSettings(maxsize=100, ttl=60 * 5)
+    # Cache for tokens which were rejected as inactive or lacking the expected
+    # scopes, max lifetime: 1 minute
+    rejected_tokens: CacheSettings = CacheSettings(maxsize=1000, ttl=60)
+    # Cache for fully built AuthStates, which an AuthStateBuilder reuses for
+    # repeated requests with the same token, for example
+    # ``CacheSettings(maxsize=100, ttl=10)``. A reused AuthState is shared by
+    # concurrent requests. ``None`` (the default) disables reuse
+    auth_states: CacheSettings | None = None
+    # Introspection results and dependent tokens are never cached beyond the
+    # expiration time reported by Globus Auth, less this many seconds
+    expiry_skew: int = 30
+    # If set, dependent tokens and group memberships which are still in use are
+    # fetched again in the background once no more than this fraction of their
+    # lifetime remains, so that requests do not wait for them to be fetched
+    refresh_ahead: float | None = None
+    # The number of threads used for background refreshes
+    refresh_workers: int = 4
+    # If set, calls to introspect tokens, get dependent tokens, and list groups
+    # each go through a circuit breaker, which fails them fast while the service
+    # is failing or slow
+    circuit_breaker: CircuitBreakerSettings | None = None
@@ -0,0 +1,318 @@
+"""
+Compact records of Globus Auth responses, as stored in the ``AuthState`` caches.
+
+An SDK response object keeps the underlying HTTP response alive, including its
+headers and raw body. These records hold only the response data, in
+``__slots__``, with repeated strings interned, so that a full cache takes a
+small fraction of the memory.
+
+The records are internal to the caches: ``to_response()`` rebuilds the SDK
+response which ``AuthState`` returns from its public methods.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import typing as t
+
+import globus_sdk
+import requests
+
+ResponseT = t.TypeVar("ResponseT", bound=globus_sdk.GlobusHTTPResponse)
+
+
+def _intern(value: str | None) -> str | None:
+    return sys.intern(value) if value is not None else None
+
+
+def _to_response(
+    data: t.Any,
+    response_class: type[ResponseT],
+    client: globus_sdk.BaseClient,
+) -> ResponseT:
+    # a successful JSON response with the given data, as returned by the SDK
+    raw = requests.Response()
+    raw.status_code = 200
+    raw.headers["Content-Type"] = "application/json"
+    raw._content = json.dumps(data).encode()
+    return response_class(raw, client=client)
+
+
+_INTROSPECT_FIELDS = frozenset(
+    ("active", "scope", "sub", "identity_set", "exp", "client_id")
+)
+
+
+class IntrospectRecord:
+    """
+    The parts of a token introspection response used by ``AuthState``.
+
+    :param active: Whether the token is active
+    :param scopes: The scopes of the token
+    :param sub: The ID of the token's effective identity
+    :param identity_set: The IDs of the token's identities
+    :param exp: The expiration time of the token, as a Unix timestamp
+    :param client_id: The ID of the client which obtained the token
+    :param extra: The other fields of the response, as ``(name, value)`` pairs
+    """
+
+    __slots__ = (
+        "active",
+        "scopes",
+        "sub",
+        "identity_set",
+        "exp",
+        "client_id",
+        "extra",
+    )
+
+    def __init__(
+        self,
+        active: bool,
+        scopes: t.Iterable[str] = (),
+        sub: str | None = None,
+        identity_set: t.Iterable[str] = (),
+        exp: int | None = None,
+        client_id: str | None = None,
+        extra: t.Iterable[tuple[str, t.Any]] = (),
+    ) -> None:
+        self.active = active
+        self.scopes = frozenset(map(sys.intern, scopes))
+        self.sub = _intern(sub)
+        self.identity_set = tuple(map(sys.intern, identity_set))
+        self.exp = exp
+        self.client_id = _intern(client_id)
+        self.extra = tuple(
+            (sys.intern(name), _intern(value) if isinstance(value, str) else value)
+            for name, value in extra
+        )
+
+    @classmethod
+    def from_data(
+        cls, data: t.Mapping[str, t.Any] | globus_sdk.GlobusHTTPResponse
+    ) -> IntrospectRecord:
+        """Build a record from the data of an introspection response."""
+        if isinstance(data, globus_sdk.GlobusHTTPResponse):
+            data = t.cast(t.Mapping[str, t.Any], data.data)
+        return cls(
+            active=bool(data.get("active")),
+            scopes=(data.get("scope") or "").split(),
+            sub=data.get("sub"),
+            identity_set=data.get("identity_set") or (),
+            exp=data.get("exp"),
+            client_id=data.get("client_id"),
+            extra=(
+                (name, value)
+                for name, value in data.items()
+                if name not in _INTROSPECT_FIELDS
+            ),
+        )
+
+    @property
+    def data(self) -> dict[str, t.Any]:
+        """The record as introspection response data, omitting missing fields."""
+        data: dict[str, t.Any] = {"active": self.active}
+        if self.scopes:
+            data["scope"] = " ".join(sorted(self.scopes))
+        if self.sub is not None:
+            data["sub"] = self.sub
+        if self.identity_set:
+            data["identity_set"] = list(self.identity_set)
+        if self.exp is not None:
+            data["exp"] = self.exp
+        if self.client_id is not None:
+            data["client_id"] = self.client_id
+        data.update(self.extra)
+        return data
+
+    def to_response(
+        self, client: globus_sdk.BaseClient
+    ) -> globus_sdk.GlobusHTTPResponse:
+        """The record as an introspection response, as returned by ``client``."""
+        return _to_response(self.data, globus_sdk.GlobusHTTPResponse, client)
+
+    def __getitem__(self, key: str) -> t.Any:
+        if key == "scope":
+            value: t.Any = " ".join(sorted(self.scopes)) if self.scopes else None
+        elif key == "identity_set":
+            value = list(self.identity_set) if self.identity_set else None
+        elif key in ("active", "sub", "exp", "client_id"):
+            value = getattr(self, key)
+        else:
+            value = dict(self.extra).get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: t.Any = None) -> t.Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntrospectRecord):
+            return NotImplemented
+        return self.data == other.data
+
+    def __repr__(self) -> str:
+        return f"IntrospectRecord(active={self.active!r}, sub={self.sub!r})"
+
+    def __getstate__(self) -> tuple[t.Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple[t.Any, ...]) -> None:
+        # strings are interned again when a record is loaded
+        IntrospectRecord.__init__(self, *state)
+
+
+_Token = t.Tuple[str, str, str, t.Optional[int], t.Optional[str], t.Optional[str]]
+
+
+class DependentTokensRecord:
+    """
+    The tokens of a dependent token response.
+
+    :param tokens: ``(resource_server, scope, access_token, expires_at_seconds,
+        refresh_token, token_type)`` for each token, where ``scope`` is a
+        space-separated string of scopes
+    """
+
+    __slots__ = ("tokens",)
+
+    def __init__(self, tokens: t.Iterable[_Token] = ()) -> None:
+        self.tokens = tuple(
+            (
+                sys.intern(resource_server),
+                sys.intern(scope),
+                access_token,
+                expires_at,
+                refresh_token,
+                _intern(token_type),
+            )
+            for (
+                resource_server,
+                scope,
+                access_token,
+                expires_at,
+                refresh_token,
+                token_type,
+            ) in tokens
+        )
+
+    @classmethod
+    def from_response(
+        cls, response: globus_sdk.OAuthDependentTokenResponse
+    ) -> DependentTokensRecord:
+        """Build a record from a dependent token response."""
+        return cls.from_data(response.by_resource_server.values())
+
+    @classmethod
+    def from_data(
+        cls, data: t.Iterable[t.Mapping[str, t.Any]]
+    ) -> DependentTokensRecord:
+        """Build a record from token data, as found in ``by_resource_server``."""
+        return cls(
+            (
+                token["resource_server"],
+                token["scope"],
+                token["access_token"],
+                token.get("expires_at_seconds"),
+                token.get("refresh_token"),
+                token.get("token_type"),
+            )
+            for token in data
+        )
+
+    @property
+    def data(self) -> list[dict[str, t.Any]]:
+        """The token data of the record, as found in ``by_resource_server``."""
+        return list(self.by_resource_server.values())
+
+    def to_response(
+        self, client: globus_sdk.BaseClient
+    ) -> globus_sdk.OAuthDependentTokenResponse:
+        """
+        The record as a dependent token response, as returned by ``client``,
+        whose tokens expire at the times recorded.
+        """
+        now = time.time()
+        data = []
+        for token_data in self.by_resource_server.values():
+            token_data = dict(token_data)
+            expires_at = token_data.pop("expires_at_seconds")
+            if expires_at is not None:
+                token_data["expires_in"] = max(int(expires_at - now), 0)
+            data.append(token_data)
+        return _to_response(data, globus_sdk.OAuthDependentTokenResponse, client)
+
+    def _token(self, scope: str) -> _Token | None:
+        for token in self.tokens:
+            if scope in token[1].split():
+                return token
+        return None
+
+    def access_token(self, scope: str) -> str | None:
+        """The access token for ``scope``, or ``None`` if there is none."""
+        token = self._token(scope)
+        return token[2] if token is not None else None
+
+    def expires_at_for(self, scope: str) -> int | None:
+        """The expiration time of the access token for ``scope``, if known."""
+        token = self._token(scope)
+        return token[3] if token is not None else None
+
+    @property
+    def expires_at(self) -> int | None:
+        """The expiration time of the first token to expire, if any."""
+        expirations = [token[3] for token in self.tokens if token[3] is not None]
+        return min(expirations) if expirations else None
+
+    @property
+    def by_resource_server(self) -> dict[str, dict[str, t.Any]]:
+        return {
+            resource_server: {
+                "scope": scope,
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "token_type": token_type,
+                "expires_at_seconds": expires_at,
+                "resource_server": resource_server,
+            }
+            for (
+                resource_server,
+                scope,
+                access_token,
+                expires_at,
+                refresh_token,
+                token_type,
+            ) in self.tokens
+        }
+
+    @property
+    def by_scopes(self) -> dict[str, dict[str, t.Any]]:
+        return {
+            scope: token_data
+            for token_data in self.by_resource_server.values()
+            for scope in token_data["scope"].split()
+        }
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DependentTokensRecord):
+            return NotImplemented
+        return self.tokens == other.tokens
+
+    def __repr__(self) -> str:
+        resource_servers = [token[0] for token in self.tokens]
+        return f"DependentTokensRecord(resource_servers={resource_servers!r})"
+
+    def __getstate__(self) -> tuple[_Token, ...]:
+        return self.tokens
+
+    def __setstate__(self, state: tuple[_Token, ...]) -> None:
+        DependentTokensRecord.__init__(self, state)
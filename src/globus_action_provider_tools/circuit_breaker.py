@@ -0,0 +1,227 @@
+"""
+Circuit breakers which fail calls to Globus Auth and Globus Groups fast while
+those services are failing or slow, rather than holding every request for the
+full HTTP timeout.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import logging
+import threading
+import time
+import typing as t
+
+import globus_sdk
+
+from .cache_policy import CircuitBreakerSettings
+from .errors import CircuitOpenError, ConcurrencyLimitError
+
+log = logging.getLogger(__name__)
+
+T = t.TypeVar("T")
+
+CircuitState = t.Literal["closed", "open", "half_open"]
+
+# the calls which are guarded by a circuit breaker, when breakers are enabled
+ENDPOINTS = ("introspect", "dependent_tokens", "groups")
+
+
+def is_outage(error: BaseException) -> bool:
+    """
+    Whether an error indicates that a service is unavailable, rather than that
+    the request was rejected.
+    """
+    if isinstance(
+        error, (globus_sdk.NetworkError, CircuitOpenError, ConcurrencyLimitError)
+    ):
+        return True
+    if isinstance(error, globus_sdk.GlobusAPIError):
+        return error.http_status >= 500 or error.http_status == 429
+    return False
+
+
+@dataclasses.dataclass(frozen=True)
+class CircuitBreakerStats:
+    """
+    Counters describing the use of a ``CircuitBreaker``, since it was created.
+
+    :param state: The current state of the breaker
+    :param calls: Calls which were made
+    :param failures: Calls which failed because the service was unavailable
+    :param slow_calls: Calls which took at least ``slow_call_duration``
+    :param rejected: Calls which were not made, because the breaker was open
+    :param opened: Times the breaker opened
+    :param half_opened: Times the breaker began probing
+    :param closed: Times the breaker closed after probing
+    """
+
+    state: CircuitState = "closed"
+    calls: int = 0
+    failures: int = 0
+    slow_calls: int = 0
+    rejected: int = 0
+    opened: int = 0
+    half_opened: int = 0
+    closed: int = 0
+
+    def since(self, earlier: CircuitBreakerStats) -> CircuitBreakerStats:
+        """
+        The counters accumulated since ``earlier`` stats were taken from the same
+        breaker. ``state`` is that of these stats.
+        """
+        return dataclasses.replace(
+            self,
+            **{
+                field.name: getattr(self, field.name) - getattr(earlier, field.name)
+                for field in dataclasses.fields(self)
+                if field.name != "state"
+            },
+        )
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker for one kind of call, which is shared by every thread.
+
+    :param name: The name of the call, used in errors and logs
+    :param settings: The breaker's thresholds
+    :param timer: The clock used to time calls and the open state
+    """
+
+    def __init__(
+        self,
+        name: str,
+        settings: CircuitBreakerSettings,
+        *,
+        timer: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.settings = settings
+        self.timer = timer
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        # whether each of the recent calls failed, while closed
+        self._outcomes: collections.deque[bool] = collections.deque(
+            maxlen=settings.window
+        )
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._stats = CircuitBreakerStats()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+
+    def stats(self) -> CircuitBreakerStats:
+        with self._lock:
+            return dataclasses.replace(self._stats, state=self._state)
+
+    def call(self, fn: t.Callable[[], T]) -> T:
+        """
+        Call ``fn`` through the breaker.
+
+        :raises CircuitOpenError: if the breaker is open, or is half-open and
+            already probing
+        """
+        probe = self._admit()
+        start = self.timer()
+        try:
+            result = fn()
+        except BaseException as err:
+            self._record(probe, is_outage(err), self.timer() - start)
+            raise
+        self._record(probe, False, self.timer() - start)
+        return result
+
+    async def call_async(self, fn: t.Callable[[], t.Awaitable[T]]) -> T:
+        """
+        Await ``fn()`` through the breaker.
+
+        :raises CircuitOpenError: if the breaker is open, or is half-open and
+            already probing
+        """
+        probe = self._admit()
+        start = self.timer()
+        try:
+            result = await fn()
+        except BaseException as err:
+            self._record(probe, is_outage(err), self.timer() - start)
+            raise
+        self._record(probe, False, self.timer() - start)
+        return result
+
+    def _admit(self) -> bool:
+        """Admit a call, returning whether it is a probe."""
+        with self._lock:
+            if self._state == "open":
+                retry_after = (
+                    self._opened_at + self.settings.open_duration - self.timer()
+                )
+                if retry_after > 0:
+                    self._count(rejected=1)
+                    raise CircuitOpenError(self.name, retry_after)
+                self._transition("half_open")
+            if self._state == "half_open":
+                if self._probes >= self.settings.half_open_calls:
+                    self._count(rejected=1)
+                    raise CircuitOpenError(self.name, 0)
+                self._probes += 1
+                return True
+            return False
+
+    def _record(self, probe: bool, failed: bool, duration: float) -> None:
+        slow = (
+            self.settings.slow_call_duration is not None
+            and duration >= self.settings.slow_call_duration
+        )
+        with self._lock:
+            self._count(calls=1, failures=int(failed), slow_calls=int(slow))
+            failed = failed or slow
+            if probe:
+                self._probes -= 1
+                if self._state != "half_open":
+                    return
+                if failed:
+                    self._transition("open")
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.settings.half_open_calls:
+                        self._transition("closed")
+            elif self._state == "closed":
+                self._outcomes.append(failed)
+                if (
+                    len(self._outcomes) >= self.settings.minimum_calls
+                    and sum(self._outcomes) / len(self._outcomes)
+                    >= self.settings.failure_rate
+                ):
+                    self._transition("open")
+
+    def _transition(self, state: CircuitState) -> None:
+        # called with the lock held
+        self._state = state
+        if state == "open":
+            self._opened_at = self.timer()
+            self._count(opened=1)
+            log.warning(
+                f"Circuit breaker for {self.name!r} opened; failing calls for "
+                f"{self.settings.open_duration} seconds"
+            )
+        elif state == "half_open":
+            self._probes = 0
+            self._probe_successes = 0
+            self._count(half_opened=1)
+            log.info(f"Circuit breaker for {self.name!r} is probing")
+        else:
+            self._outcomes.clear()
+            self._count(closed=1)
+            log.info(f"Circuit breaker for {self.name!r} closed")
+
+    def _count(self, **counts: int) -> None:
+        self._stats = dataclasses.replace(
+            self._stats,
+            **{name: getattr(self._stats, name) + n for name, n in counts.items()},
+        )
@@ -1,9 +1,237 @@
 from __future__ import annotations
 
+import dataclasses
+import functools
+import hashlib
+import threading
+import time
 import typing as t
 import uuid
 
 import globus_sdk
+import globus_sdk.transport
+import requests.adapters
+import urllib3
+import urllib3.connection
+
+from .cache_policy import CacheSettings, ConcurrencyLimitSettings
+from .concurrency_limiter import ConcurrencyLimiter, ConcurrencyLimiterStats
+from .deadline import check_deadline, remaining_time
+from .utils import TypedTTLCache
+
+if t.TYPE_CHECKING:
+    from .authentication import AuthSnapshot, AuthState
+
+ClientT = t.TypeVar("ClientT", bound=globus_sdk.BaseClient)
+T = t.TypeVar("T")
+
+# guards the creation of the shared state of every ClientFactory
+_SHARED_STATE_LOCK = threading.Lock()
+
+# transport parameters which configure the shared connection pools, rather than
+# the SDK transport
+_POOL_PARAMS: dict[str, t.Any] = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "pool_block": False,
+    "keep_alive": True,
+}
+
+# the services whose concurrent calls are limited, by SDK service name
+_LIMITED_SERVICES = ("auth", "groups")
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectionPoolStats:
+    """
+    Counters describing the use of a ``ClientFactory``'s connection pools.
+
+    :param requests: The number of requests sent
+    :param connections: The number of connections opened
+    """
+
+    requests: int = 0
+    connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        """The number of requests sent on a connection which was already open."""
+        return max(self.requests - self.connections, 0)
+
+    @property
+    def reuse_ratio(self) -> float:
+        """The fraction of requests sent on a connection which was already open."""
+        return self.reused / self.requests if self.requests else 0.0
+
+
+class _CountingHTTPConnection(urllib3.connection.HTTPConnection):
+    on_connect: t.Callable[[], None] | None = None
+
+    def connect(self) -> None:
+        super().connect()
+        if self.on_connect is not None:
+            self.on_connect()
+
+
+class _CountingHTTPSConnection(urllib3.connection.HTTPSConnection):
+    on_connect: t.Callable[[], None] | None = None
+
+    def connect(self) -> None:
+        super().connect()
+        if self.on_connect is not None:
+            self.on_connect()
+
+
+class _CountingHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+    on_connect: t.Callable[[], None] | None = None
+
+    def _new_conn(self) -> t.Any:
+        conn = super()._new_conn()
+        conn.on_connect = self.on_connect  # type: ignore[attr-defined]
+        return conn
+
+
+class _CountingHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+    on_connect: t.Callable[[], None] | None = None
+
+    def _new_conn(self) -> t.Any:
+        conn = super()._new_conn()
+        conn.on_connect = self.on_connect  # type: ignore[attr-defined]
+        return conn
+
+
+class _CountingPoolManager(urllib3.PoolManager):
+    """A ``PoolManager`` which calls ``on_connect`` whenever it opens a connection."""
+
+    def __init__(
+        self, *args: t.Any, on_connect: t.Callable[[], None], **kwargs: t.Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.on_connect = on_connect
+        self.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, *args: t.Any, **kwargs: t.Any) -> urllib3.HTTPConnectionPool:
+        pool = super()._new_pool(*args, **kwargs)
+        pool.on_connect = self.on_connect  # type: ignore[attr-defined]
+        return pool
+
+
+class SharedHTTPAdapter(requests.adapters.HTTPAdapter):
+    """
+    An ``HTTPAdapter`` whose connection pools are shared by the sessions of many
+    clients, and which counts the requests sent and connections opened through
+    them.
+
+    Closing a session which uses the adapter does not close the adapter, so that
+    other sessions may keep using it. ``close_pools()`` closes its connections.
+
+    Within a request deadline, requests are not sent once it has passed, and are
+    given no more than the remaining time.
+    """
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._connections = 0
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(
+        self,
+        connections: int,
+        maxsize: int,
+        block: bool = requests.adapters.DEFAULT_POOLBLOCK,
+        **pool_kwargs: t.Any,
+    ) -> None:
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            on_connect=self._count_connection,
+            **pool_kwargs,
+        )
+
+    def _count_connection(self) -> None:
+        with self._stats_lock:
+            self._connections += 1
+
+    def send(
+        self, request: requests.PreparedRequest, *args: t.Any, **kwargs: t.Any
+    ) -> requests.Response:
+        remaining = check_deadline(f"calling {request.url}")
+        if remaining is not None:
+            kwargs["timeout"] = _shorten_timeout(kwargs.get("timeout"), remaining)
+        with self._stats_lock:
+            self._requests += 1
+        return super().send(request, *args, **kwargs)
+
+    def stats(self) -> ConnectionPoolStats:
+        with self._stats_lock:
+            return ConnectionPoolStats(
+                requests=self._requests, connections=self._connections
+            )
+
+    def close(self) -> None:
+        # sessions close their adapters, but this one is still in use by others
+        pass
+
+    def close_pools(self) -> None:
+        super().close()
+
+
+def _shorten_timeout(timeout: t.Any, remaining: float) -> t.Any:
+    # requests accepts a single timeout, or a (connect, read) pair
+    if isinstance(timeout, tuple):
+        return tuple(_shorten_timeout(part, remaining) for part in timeout)
+    if timeout is None:
+        return remaining
+    return min(timeout, remaining)
+
+
+def _limit_transport(
+    transport: globus_sdk.transport.RequestsTransport, limiter: ConcurrencyLimiter
+) -> None:
+    """
+    Make each call through ``transport`` take a turn from ``limiter``, held for
+    the call and any retries of it.
+    """
+    request = transport.request
+
+    @functools.wraps(request)
+    def limited_request(*args: t.Any, **kwargs: t.Any) -> requests.Response:
+        # callers do not wait for a turn past their deadline
+        started_at = limiter.acquire(
+            timeout=check_deadline(f"calling {limiter.name!r}")
+        )
+        failed = True
+        try:
+            response = request(*args, **kwargs)
+            failed = response.status_code == 429 or response.status_code >= 500
+            return response
+        finally:
+            limiter.release(started_at, failed=failed)
+
+    transport.request = limited_request  # type: ignore[method-assign]
+
+
+def _check_retry_deadline(
+    transport: globus_sdk.transport.RequestsTransport,
+    ctx: globus_sdk.transport.RetryContext,
+) -> globus_sdk.transport.RetryCheckResult:
+    """Do not retry if the request deadline would pass while sleeping."""
+    remaining = remaining_time()
+    if remaining is not None and remaining <= min(
+        transport.retry_backoff(ctx), transport.max_sleep
+    ):
+        return globus_sdk.transport.RetryCheckResult.do_not_retry
+    return globus_sdk.transport.RetryCheckResult.no_decision
 
 
 class ClientFactory:
@@ -12,6 +240,25 @@ class ClientFactory:
     in an ActionProviderBlueprint and other contexts.
 
     The default implementation sets transport parameters on initialization.
+    Every client built by a factory sends its requests through a pool of
+    connections owned by the factory, so that a new client does not need to
+    open new connections to a service which other clients have already used.
+
+    Besides the SDK's transport parameters, ``DEFAULT_*_TRANSPORT_PARAMS`` may
+    include the connection pool settings ``pool_connections`` (the number of
+    hosts for which connections are kept), ``pool_maxsize`` (the number of
+    connections kept for each host), ``pool_block`` (whether to wait for a free
+    connection when ``pool_maxsize`` connections to a host are in use), and
+    ``keep_alive`` (whether to keep connections open between requests).
+    Clients with the same pool settings share a pool.
+
+    ``get_client_for_scope`` caches the clients it builds for callers' dependent
+    tokens, according to ``CLIENT_CACHE_SETTINGS``.
+
+    The number of concurrent calls to Globus Auth and to Globus Groups made by
+    the clients of a factory is limited according to
+    ``CONCURRENCY_LIMIT_SETTINGS``, if it is set, with a limit which adapts to
+    the latency and errors of each service. A call and its retries take one turn.
 
     The client factory can be modified or replaced on an ActionProviderBlueprint
     in order to customize client construction.
@@ -27,14 +274,66 @@ class ClientFactory:
         ("max_retries", 1),
         ("max_sleep", 5),
     )
+    # used for clients of other services, built by get_client_for_scope
+    DEFAULT_TRANSPORT_PARAMS: tuple[tuple[str, t.Any], ...] = (
+        ("http_timeout", 30),
+        ("max_retries", 1),
+        ("max_sleep", 5),
+    )
+    # clients are cached no longer than their dependent tokens
+    CLIENT_CACHE_SETTINGS: CacheSettings = CacheSettings(maxsize=500, ttl=47 * 3600)
+    CONCURRENCY_LIMIT_SETTINGS: ConcurrencyLimitSettings | None = None
+
+    @property
+    def scoped_clients(self) -> TypedTTLCache[globus_sdk.BaseClient]:
+        """The clients built by ``get_client_for_scope``, by dependent token."""
+        return self._shared_state(
+            "_scoped_clients",
+            lambda: TypedTTLCache.from_settings(self.CLIENT_CACHE_SETTINGS),
+        )
+
+    @property
+    def concurrency_limiters(self) -> dict[str, ConcurrencyLimiter]:
+        """The limits on concurrent calls, by service name, if enabled."""
+
+        def make_limiters() -> dict[str, ConcurrencyLimiter]:
+            if self.CONCURRENCY_LIMIT_SETTINGS is None:
+                return {}
+            return {
+                service: ConcurrencyLimiter(service, self.CONCURRENCY_LIMIT_SETTINGS)
+                for service in _LIMITED_SERVICES
+            }
+
+        return self._shared_state("_concurrency_limiters", make_limiters)
+
+    @property
+    def _adapters(self) -> dict[tuple[int, int, bool], SharedHTTPAdapter]:
+        return self._shared_state("_shared_adapters", dict)
+
+    @property
+    def _adapters_lock(self) -> threading.Lock:
+        return self._shared_state("_shared_adapters_lock", threading.Lock)
+
+    def _shared_state(self, name: str, create: t.Callable[[], T]) -> T:
+        # the state shared by the clients of a factory is created on first use,
+        # so that subclasses need not call ClientFactory.__init__
+        try:
+            return t.cast(T, self.__dict__[name])
+        except KeyError:
+            pass
+        with _SHARED_STATE_LOCK:
+            if name not in self.__dict__:
+                self.__dict__[name] = create()
+            return t.cast(T, self.__dict__[name])
 
     def make_confidential_app_auth_client(
         self, client_id: str | uuid.UUID, client_secret: str
     ) -> globus_sdk.ConfidentialAppAuthClient:
-        return globus_sdk.ConfidentialAppAuthClient(
+        return self._make_client(
+            globus_sdk.ConfidentialAppAuthClient,
+            self.DEFAULT_AUTH_TRANSPORT_PARAMS,
             client_id=client_id,
             client_secret=client_secret,
-            transport_params=dict(self.DEFAULT_AUTH_TRANSPORT_PARAMS),
         )
 
     def make_groups_client(
@@ -43,7 +342,129 @@ class ClientFactory:
             globus_sdk.AccessTokenAuthorizer | globus_sdk.RefreshTokenAuthorizer | None
         ),
     ) -> globus_sdk.GroupsClient:
-        return globus_sdk.GroupsClient(
+        return self._make_client(
+            globus_sdk.GroupsClient,
+            self.DEFAULT_GROUPS_TRANSPORT_PARAMS,
             authorizer=authorizer,
-            transport_params=dict(self.DEFAULT_GROUPS_TRANSPORT_PARAMS),
         )
+
+    def get_client_for_scope(
+        self,
+        auth_state: AuthState | AuthSnapshot,
+        scope: str,
+        client_class: type[ClientT],
+    ) -> ClientT:
+        """
+        Get a client of ``client_class`` which acts on behalf of a caller with their
+        dependent token for ``scope``.
+
+        Clients are cached by dependent token, scope, and client class, and shared
+        by every request with the same dependent token, until shortly before the
+        token expires. Groups clients are built with ``make_groups_client``, and
+        other clients with ``DEFAULT_TRANSPORT_PARAMS``.
+
+        :param auth_state: The ``AuthState`` or ``AuthSnapshot`` of the caller
+        :param scope: The scope of the dependent token to use
+        :param client_class: The SDK client class to build
+
+        :raises ValueError: If the dependent token data for the caller does not match
+            the requested scope.
+        """
+        authorizer = auth_state.get_authorizer_for_scope(scope)
+        token_hash = hashlib.sha256(authorizer.access_token.encode("utf-8"))
+        key = (
+            f"{token_hash.hexdigest()}:{scope}:"
+            f"{client_class.__module__}.{client_class.__qualname__}"
+        )
+
+        def make_client() -> globus_sdk.BaseClient:
+            if issubclass(client_class, globus_sdk.GroupsClient):
+                return self.make_groups_client(authorizer)
+            return self._make_client(
+                client_class, self.DEFAULT_TRANSPORT_PARAMS, authorizer=authorizer
+            )
+
+        def client_ttl(_: globus_sdk.BaseClient) -> float | None:
+            expires_at = auth_state.dependent_token_expires_at(scope)
+            if expires_at is None:
+                return None
+            return expires_at - time.time() - auth_state.expiry_skew
+
+        client = self.scoped_clients.get_or_compute(key, make_client, ttl=client_ttl)
+        return t.cast(ClientT, client)
+
+    def connection_stats(self) -> ConnectionPoolStats:
+        """
+        Return the number of requests sent and connections opened by the clients
+        built by this factory.
+        """
+        with self._adapters_lock:
+            adapters = list(self._adapters.values())
+        stats = [adapter.stats() for adapter in adapters]
+        return ConnectionPoolStats(
+            requests=sum(s.requests for s in stats),
+            connections=sum(s.connections for s in stats),
+        )
+
+    def concurrency_stats(self) -> dict[str, ConcurrencyLimiterStats]:
+        """
+        Return the current limit, the calls in flight and queued, and the counters
+        of the concurrency limiter of each service (``"auth"`` and ``"groups"``),
+        if they are enabled.
+        """
+        return {
+            service: limiter.stats()
+            for service, limiter in self.concurrency_limiters.items()
+        }
+
+    def close(self) -> None:
+        """Close the pooled connections of the clients built by this factory."""
+        with self._adapters_lock:
+            adapters = list(self._adapters.values())
+            self._adapters.clear()
+        for adapter in adapters:
+            adapter.close_pools()
+
+    def _make_client(
+        self,
+        client_class: type[ClientT],
+        transport_params: t.Iterable[tuple[str, t.Any]],
+        **kwargs: t.Any,
+    ) -> ClientT:
+        params = dict(transport_params)
+        pool_params = {
+            name: params.pop(name, default) for name, default in _POOL_PARAMS.items()
+        }
+        client = client_class(transport_params=params, **kwargs)
+        limiter = self.concurrency_limiters.get(client.service_name or "")
+        if limiter is not None:
+            _limit_transport(client.transport, limiter)
+        session = client.transport.session
+        adapter = self._shared_adapter(
+            pool_params["pool_connections"],
+            pool_params["pool_maxsize"],
+            pool_params["pool_block"],
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not pool_params["keep_alive"]:
+            client.transport.headers["Connection"] = "close"
+        # the check must run before the default checks, which may retry
+        client.transport.retry_checks.insert(
+            0, functools.partial(_check_retry_deadline, client.transport)
+        )
+        return client
+
+    def _shared_adapter(
+        self, pool_connections: int, pool_maxsize: int, pool_block: bool
+    ) -> SharedHTTPAdapter:
+        key = (pool_connections, pool_maxsize, pool_block)
+        with self._adapters_lock:
+            adapter = self._adapters.get(key)
+            if adapter is None:
+                adapter = self._adapters[key] = SharedHTTPAdapter(
+                    pool_connections=pool_connections,
+                    pool_maxsize=pool_maxsize,
+                    pool_block=pool_block,
+                )
+        return adapter
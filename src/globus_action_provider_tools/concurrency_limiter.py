@@ -0,0 +1,254 @@
+"""
+Adaptive limits on the number of concurrent calls to Globus Auth and Globus
+Groups, so that a burst of requests, such as those received with a cold cache,
+does not overwhelm a service and trigger its rate limits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import dataclasses
+import logging
+import math
+import threading
+import time
+import typing as t
+
+from .cache_policy import ConcurrencyLimitSettings
+from .errors import ConcurrencyLimitError
+
+log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class ConcurrencyLimiterStats:
+    """
+    The state of a ``ConcurrencyLimiter``, and counters describing its use since
+    it was created.
+
+    :param limit: The current number of calls which may be in flight at once
+    :param in_flight: The number of calls in flight
+    :param queued: The number of callers waiting for a call to finish
+    :param calls: Calls which were made
+    :param dropped: Calls which failed, were rate limited, or were slow, each of
+        which lowered the limit
+    :param rejected: Calls which were not made, because the caller waited longer
+        than ``queue_timeout``
+    """
+
+    limit: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    calls: int = 0
+    dropped: int = 0
+    rejected: int = 0
+
+    def since(self, earlier: ConcurrencyLimiterStats) -> ConcurrencyLimiterStats:
+        """
+        The counters accumulated since ``earlier`` stats were taken from the same
+        limiter. ``limit``, ``in_flight`` and ``queued`` are those of these stats.
+        """
+        return dataclasses.replace(
+            self,
+            calls=self.calls - earlier.calls,
+            dropped=self.dropped - earlier.dropped,
+            rejected=self.rejected - earlier.rejected,
+        )
+
+
+class ConcurrencyLimiter:
+    """
+    An additive-increase, multiplicative-decrease (AIMD) limit on the number of
+    calls to one service which are in flight at once, shared by every thread.
+
+    Each call which completes quickly raises the limit by about one call per
+    ``limit`` calls, and each call which fails, is rate limited, or takes at
+    least ``slow_call_duration`` multiplies it by ``backoff_ratio``. Callers
+    beyond the limit wait, in no particular order, for up to ``queue_timeout``
+    seconds.
+
+    :param name: The name of the service, used in errors and logs
+    :param settings: The limiter's bounds and thresholds
+    :param timer: The clock used to time calls and waits
+    """
+
+    def __init__(
+        self,
+        name: str,
+        settings: ConcurrencyLimitSettings,
+        *,
+        timer: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 1 <= settings.min_limit <= settings.initial_limit <= settings.max_limit:
+            raise ValueError(
+                "concurrency limits must satisfy "
+                "1 <= min_limit <= initial_limit <= max_limit"
+            )
+        if not 0 < settings.backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        self.name = name
+        self.settings = settings
+        self.timer = timer
+        self._condition = threading.Condition()
+        self._limit = float(settings.initial_limit)
+        self._in_flight = 0
+        self._queued = 0
+        # coroutines waiting for a turn, each with the event loop it runs on
+        self._async_waiters: collections.deque[
+            tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]
+        ] = collections.deque()
+        self._calls = 0
+        self._dropped = 0
+        self._rejected = 0
+
+    @property
+    def limit(self) -> int:
+        with self._condition:
+            return int(self._limit)
+
+    def stats(self) -> ConcurrencyLimiterStats:
+        with self._condition:
+            return ConcurrencyLimiterStats(
+                limit=int(self._limit),
+                in_flight=self._in_flight,
+                queued=self._queued,
+                calls=self._calls,
+                dropped=self._dropped,
+                rejected=self._rejected,
+            )
+
+    def acquire(self, timeout: float | None = None) -> float:
+        """
+        Wait until a call may be made, and return the time at which it started,
+        to be passed to ``release()`` when it completes.
+
+        :param timeout: The longest to wait, if less than ``queue_timeout``
+        :raises ConcurrencyLimitError: if no call completed within the timeout
+        """
+        queue_timeout = self.settings.queue_timeout
+        if timeout is not None:
+            queue_timeout = min(queue_timeout, timeout)
+        with self._condition:
+            if self._in_flight >= int(self._limit):
+                deadline = self.timer() + queue_timeout
+                self._queued += 1
+                try:
+                    while self._in_flight >= int(self._limit):
+                        remaining = deadline - self.timer()
+                        if remaining <= 0:
+                            self._rejected += 1
+                            raise ConcurrencyLimitError(
+                                self.name, int(self._limit), self._queued
+                            )
+                        self._condition.wait(remaining)
+                finally:
+                    self._queued -= 1
+            self._start_call()
+        return self.timer()
+
+    async def acquire_async(self, timeout: float | None = None) -> float:
+        """
+        As ``acquire()``, for a coroutine. A caller which must wait does so on the
+        event loop, without tying up a thread, and is woken by ``release()``.
+
+        :param timeout: The longest to wait, if less than ``queue_timeout``
+        :raises ConcurrencyLimitError: if no call completed within the timeout
+        """
+        queue_timeout = self.settings.queue_timeout
+        if timeout is not None:
+            queue_timeout = min(queue_timeout, timeout)
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if self._in_flight < int(self._limit):
+                self._start_call()
+                return self.timer()
+            deadline = self.timer() + queue_timeout
+            self._queued += 1
+        try:
+            while True:
+                waiter = loop.create_future()
+                with self._condition:
+                    if self._in_flight < int(self._limit):
+                        self._start_call()
+                        break
+                    remaining = deadline - self.timer()
+                    if remaining <= 0:
+                        self._rejected += 1
+                        raise ConcurrencyLimitError(
+                            self.name, int(self._limit), self._queued
+                        )
+                    self._async_waiters.append((loop, waiter))
+                try:
+                    await asyncio.wait_for(waiter, remaining)
+                except asyncio.TimeoutError:
+                    # rejected on the next pass, unless a turn is now free
+                    self._forget_waiter(loop, waiter)
+                    deadline = -math.inf
+                except asyncio.CancelledError:
+                    self._forget_waiter(loop, waiter)
+                    raise
+        finally:
+            with self._condition:
+                self._queued -= 1
+        return self.timer()
+
+    def _forget_waiter(
+        self, loop: asyncio.AbstractEventLoop, waiter: asyncio.Future[None]
+    ) -> None:
+        with self._condition:
+            try:
+                self._async_waiters.remove((loop, waiter))
+            except ValueError:
+                # the waiter was woken but will not take the turn, so pass it on
+                self._wake_async_waiters(1)
+
+    def _wake_async_waiters(self, count: int) -> None:
+        # called with the lock held
+        while count > 0 and self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # the waiter's event loop is closed
+                continue
+            count -= 1
+
+    def _start_call(self) -> None:
+        # called with the lock held
+        self._in_flight += 1
+        self._calls += 1
+
+    def release(self, started_at: float, *, failed: bool = False) -> None:
+        """
+        Record the completion of a call, adjusting the limit.
+
+        :param started_at: The time returned by ``acquire()`` for the call
+        :param failed: Whether the call failed or was rate limited
+        """
+        slow = self.timer() - started_at >= self.settings.slow_call_duration
+        with self._condition:
+            self._in_flight -= 1
+            previous = int(self._limit)
+            if failed or slow:
+                self._dropped += 1
+                self._limit = max(
+                    self._limit * self.settings.backoff_ratio, self.settings.min_limit
+                )
+            else:
+                self._limit = min(
+                    self._limit + 1 / self._limit, self.settings.max_limit
+                )
+            if int(self._limit) != previous:
+                log.debug(
+                    f"Concurrency limit for {self.name!r} changed from "
+                    f"{previous} to {int(self._limit)}"
+                )
+            wakeups = max(int(self._limit) - self._in_flight, 1)
+            self._condition.notify(wakeups)
+            self._wake_async_waiters(wakeups)
+
+
+def _wake(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,81 @@
+"""
+A deadline for the work done on behalf of one request, which bounds the time
+spent calling Globus Auth and Globus Groups.
+
+The deadline is held in a context variable, so it applies to the calls made by
+the thread (or task) handling the request, and not to background work such as
+refreshing cached values.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import time
+import typing as t
+
+from .errors import DeadlineExceededError
+
+# the time.monotonic() value by which the current request must be handled
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "globus_action_provider_tools_deadline", default=None
+)
+
+
+def set_deadline(seconds: float | None) -> contextvars.Token[float | None]:
+    """
+    Set the deadline of the current context to ``seconds`` from now, unless it
+    already has an earlier one. Pass the returned token to ``reset_deadline()``
+    when the work is done.
+
+    :param seconds: The time budget, or ``None`` to keep the current deadline
+    """
+    current = _deadline.get()
+    if seconds is not None:
+        deadline = time.monotonic() + seconds
+        if current is None or deadline < current:
+            current = deadline
+    return _deadline.set(current)
+
+
+def reset_deadline(token: contextvars.Token[float | None]) -> None:
+    """Restore the deadline which was replaced by ``set_deadline()``."""
+    _deadline.reset(token)
+
+
+@contextlib.contextmanager
+def deadline(seconds: float | None) -> t.Iterator[None]:
+    """
+    Bound the calls to Globus Auth and Groups made within the block to
+    ``seconds`` from now, or to the current deadline, if it is earlier.
+    """
+    token = set_deadline(seconds)
+    try:
+        yield
+    finally:
+        reset_deadline(token)
+
+
+def remaining_time() -> float | None:
+    """
+    Return the number of seconds left before the current deadline, which may be
+    negative, or ``None`` if there is no deadline.
+    """
+    current = _deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def check_deadline(operation: str) -> float | None:
+    """
+    Return the number of seconds left before the current deadline, or ``None`` if
+    there is no deadline.
+
+    :param operation: A description of the work about to be done, used in errors
+    :raises DeadlineExceededError: if the deadline has passed
+    """
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededError(operation)
+    return remaining
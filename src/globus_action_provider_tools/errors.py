@@ -18,3 +18,56 @@ class UnverifiedAuthenticationError(AuthenticationError):
     or if the header value is malformed (such as missing the ``"Bearer "`` prefix),
     or if the token does not meet known token length requirements.
     """
+
+
+class CircuitOpenError(ActionProviderToolsError):
+    """
+    Indicates that a call to Globus Auth or Globus Groups was not made, because
+    the circuit breaker for that call is open after recent failures or slow calls.
+
+    :ivar endpoint: The name of the call, such as ``"introspect"``
+    :ivar retry_after: The number of seconds until the breaker probes the service
+        again
+    """
+
+    def __init__(self, endpoint: str, retry_after: float) -> None:
+        super().__init__(
+            f"The circuit breaker for {endpoint!r} is open; "
+            f"retry in {retry_after:.0f} seconds."
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimitError(ActionProviderToolsError):
+    """
+    Indicates that a call to Globus Auth or Globus Groups was not made, because
+    too many calls to that service were already in flight, and none finished
+    before the caller's queue timeout.
+
+    :ivar service: The name of the service, such as ``"auth"``
+    :ivar limit: The concurrency limit at the time
+    :ivar queued: The number of callers which were waiting
+    """
+
+    def __init__(self, service: str, limit: int, queued: int) -> None:
+        super().__init__(
+            f"Too many concurrent calls to {service!r} "
+            f"(limit={limit}, queued={queued})."
+        )
+        self.service = service
+        self.limit = limit
+        self.queued = queued
+
+
+class DeadlineExceededError(ActionProviderToolsError):
+    """
+    Indicates that a call to Globus Auth or Globus Groups was not made, or not
+    retried, because the deadline of the request it was made for had passed.
+
+    :ivar operation: The call which was not made
+    """
+
+    def __init__(self, operation: str) -> None:
+        super().__init__(f"The request deadline passed before {operation}.")
+        self.operation = operation
@@ -5,6 +5,7 @@ from flask import Blueprint, blueprints, current_app, g, jsonify, request
 from pydantic import ValidationError
 from werkzeug.exceptions import BadRequest as WerkzeugBadRequest
 
+from globus_action_provider_tools.authentication import AuthState
 from globus_action_provider_tools.authorization import (
     authorize_action_access_or_404,
     authorize_action_management_or_404,
@@ -14,6 +15,7 @@ from globus_action_provider_tools.data_types import (
     ActionStatus,
     ActionStatusValue,
 )
+from globus_action_provider_tools.deadline import reset_deadline, set_deadline
 from globus_action_provider_tools.flask.config import (
     DEFAULT_CONFIG,
     ActionProviderConfig,
@@ -91,6 +93,8 @@ class ActionProviderBlueprint(Blueprint):
         self.config = config
 
         assign_json_provider(self)
+        self.before_request(self._set_request_deadline)
+        self.teardown_request(self._reset_request_deadline)
         self.before_request(self._check_token)
         self.register_error_handler(Exception, blueprint_error_handler)
         self.record_once(self._create_state_builder)
@@ -166,6 +170,23 @@ class ActionProviderBlueprint(Blueprint):
             auth_client,
             expected_scopes=scopes,
             client_factory=self.config.client_factory,
+            cache_policy=self.config.cache_policy,
+            cache_backend=self.config.cache_backend,
+            cache_backends=self.config.cache_backends,
+            token_validator=self.config.token_validator,
+            prefetch_groups=self._authorization_uses_groups(),
+        )
+
+    def _authorization_uses_groups(self) -> bool:
+        """
+        Whether the provider's access lists include groups, in which case callers'
+        groups are fetched as soon as their tokens are introspected.
+        """
+        return AuthState.group_in_principal_list(
+            [
+                *self.provider_description.runnable_by,
+                *self.provider_description.visible_to,
+            ]
         )
 
     def _action_introspect(self):
@@ -242,23 +263,15 @@ class ActionProviderBlueprint(Blueprint):
 
     def _action_run(self):
         self._register_route_type("run")
-        if not g.auth_state.check_authorization(
-            self.provider_description.runnable_by,
-            allow_all_authenticated_users=True,
-        ):
-            current_app.logger.info(
-                f"{g.auth_state.effective_identity} is unauthorized to run Action due to {g.auth_state.errors}"
-            )
-            raise UnauthorizedRequest
-
-        try:
-            json_input = request.get_json(force=True)
-        except WerkzeugBadRequest:
-            current_app.logger.info(
-                f"{g.auth_state.effective_identity} submitted input that could not "
-                f"be parsed as JSON: {str(request.data)}"
-            )
-            raise BadActionRequest("Invalid JSON")
+        # with lazy introspection, an unparseable body is rejected before the
+        # token is introspected; the input schema is still only checked once the
+        # caller is known to be authorized
+        if self.config.lazy_token_introspection:
+            json_input = self._parse_json_input()
+            self._authorize_run()
+        else:
+            self._authorize_run()
+            json_input = self._parse_json_input()
         try:
             action_request = validate_input(json_input, self.input_body_validator)
         except BadActionRequest as err:
@@ -283,6 +296,16 @@ class ActionProviderBlueprint(Blueprint):
             self._save_action(self.action_repo, status)
         return action_status_return_to_view_return(status, 202)
 
+    def _authorize_run(self) -> None:
+        if not g.auth_state.check_authorization(
+            self.provider_description.runnable_by,
+            allow_all_authenticated_users=True,
+        ):
+            current_app.logger.info(
+                f"{g.auth_state.effective_identity} is unauthorized to run Action due to {g.auth_state.errors}"
+            )
+            raise UnauthorizedRequest
+
     def action_run(self, func: ActionRunCallback):
         """
         Registers a function to run as the Action Provider's run endpoint.
@@ -497,6 +520,21 @@ class ActionProviderBlueprint(Blueprint):
         status = self.action_log_callback(action_id, g.auth_state)
         return jsonify(status), 200
 
+    def _parse_json_input(self) -> t.Any:
+        try:
+            return request.get_json(force=True)
+        except WerkzeugBadRequest:
+            # avoid introspecting a lazily-built AuthState just to log the caller
+            if g.auth_state.is_introspected:
+                caller = g.auth_state.effective_identity
+            else:
+                caller = "An unidentified caller"
+            current_app.logger.info(
+                f"{caller} submitted input that could not "
+                f"be parsed as JSON: {str(request.data)}"
+            )
+            raise BadActionRequest("Invalid JSON")
+
     def _register_route_type(self, route_type: str):
         if not hasattr(g, "route_type"):
             g.route_type = route_type
@@ -532,6 +570,30 @@ class ActionProviderBlueprint(Blueprint):
             raise ActionProviderError
         repo.store(action)
 
+    def _set_request_deadline(self) -> None:
+        """
+        Set the deadline of the request, from the blueprint's config and the
+        caller's deadline header, whichever is sooner.
+        """
+        seconds = self.config.request_deadline
+        header = self.config.request_deadline_header
+        if header is not None and header in request.headers:
+            try:
+                requested = max(float(request.headers[header]), 0.0)
+            except ValueError:
+                current_app.logger.warning(
+                    f"Ignoring invalid {header} header: {request.headers[header]!r}"
+                )
+            else:
+                seconds = requested if seconds is None else min(seconds, requested)
+        if seconds is not None:
+            g.deadline_token = set_deadline(seconds)
+
+    def _reset_request_deadline(self, exc: t.Optional[BaseException]) -> None:
+        token = g.pop("deadline_token", None)
+        if token is not None:
+            reset_deadline(token)
+
     def _check_token(self) -> None:
         """
         Parses a token from a request to generate an auth_state object which is
@@ -546,4 +608,6 @@ class ActionProviderBlueprint(Blueprint):
         ):
             return
 
-        g.auth_state = self.state_builder.build_from_request()
+        g.auth_state = self.state_builder.build_from_request(
+            lazy=self.config.lazy_token_introspection
+        )
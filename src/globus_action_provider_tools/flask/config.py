@@ -1,5 +1,11 @@
+from __future__ import annotations
+
 import dataclasses
+import typing as t
 
+from globus_action_provider_tools.authentication import TokenPreValidator
+from globus_action_provider_tools.cache_backends import CacheBackend
+from globus_action_provider_tools.cache_policy import AuthCachePolicy
 from globus_action_provider_tools.client_factory import ClientFactory
 
 
@@ -14,6 +20,30 @@ class ActionProviderConfig:
     # by default, the config provides a base ClientFactory as the constructor for
     # Auth and Groups clients, with default parameters
     client_factory: ClientFactory = ClientFactory()
+    # the size, TTL, and eviction settings for the AuthState caches owned by the
+    # blueprint's AuthStateBuilder
+    cache_policy: AuthCachePolicy = AuthCachePolicy()
+    # an optional shared backend for the AuthState caches, allowing cached Auth and
+    # Groups results to be shared between worker processes
+    cache_backend: CacheBackend | None = None
+    # backends for individual AuthState caches, by cache name, which take
+    # precedence over cache_backend; for example, a durable, encrypted store for
+    # dependent tokens
+    cache_backends: t.Mapping[str, CacheBackend | None] | None = None
+    # checks the syntax of Authorization headers, so that malformed tokens are
+    # rejected without calling Globus Auth
+    token_validator: TokenPreValidator = TokenPreValidator()
+    # when enabled, tokens are only introspected when a route first needs the
+    # caller's identity, so that requests which are rejected for other reasons
+    # (such as an unparseable body) do not call Globus Auth
+    lazy_token_introspection: bool = False
+    # the number of seconds in which each request must be handled; calls to Globus
+    # Auth and Groups made for a request are given no more than the time left, and
+    # are not made once it has passed
+    request_deadline: float | None = None
+    # the name of a request header by which callers may shorten the deadline of
+    # their request, with a value in seconds, such as "X-Request-Timeout"
+    request_deadline_header: str | None = None
 
 
 DEFAULT_CONFIG = ActionProviderConfig()
@@ -16,9 +16,11 @@ import typing as t
 from werkzeug.exceptions import (
     BadRequest,
     Conflict,
+    GatewayTimeout,
     HTTPException,
     InternalServerError,
     NotFound,
+    ServiceUnavailable,
     Unauthorized,
     UnprocessableEntity,
 )
@@ -71,3 +73,23 @@ class UnauthorizedRequest(ActionProviderToolsException, Unauthorized):
 
 class ActionProviderError(ActionProviderToolsException, InternalServerError):
     pass
+
+
+class ActionProviderUnavailable(ActionProviderToolsException, ServiceUnavailable):
+    description = (
+        "The service is temporarily unable to verify requests. "
+        "Please try again later."
+    )
+
+    def get_headers(self, *args):
+        headers = super().get_headers(*args)
+        if self.retry_after:
+            headers.append(("Retry-After", str(self.retry_after)))
+        return headers
+
+
+class ActionProviderTimeout(ActionProviderToolsException, GatewayTimeout):
+    description = (
+        "The request could not be handled before its deadline. "
+        "Please try again later."
+    )
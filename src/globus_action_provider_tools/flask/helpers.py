@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import inspect
 import json
+import math
 import typing as t
 from collections.abc import Iterable
 from enum import Enum
@@ -9,6 +10,7 @@ from functools import partial
 from typing import Any, Callable
 
 import flask
+import globus_sdk
 import jsonschema
 from flask import Request, current_app, jsonify
 from pydantic import BaseModel, ValidationError
@@ -18,6 +20,7 @@ from globus_action_provider_tools.authentication import (
     AuthStateBuilder,
     InactiveTokenError,
     InvalidTokenScopesError,
+    TokenPreValidator,
 )
 from globus_action_provider_tools.data_types import (
     ActionProviderDescription,
@@ -29,7 +32,9 @@ from globus_action_provider_tools.data_types import (
 )
 from globus_action_provider_tools.errors import (
     AuthenticationError,
-    UnverifiedAuthenticationError,
+    CircuitOpenError,
+    ConcurrencyLimitError,
+    DeadlineExceededError,
 )
 from globus_action_provider_tools.flask.config import (
     DEFAULT_CONFIG,
@@ -37,7 +42,9 @@ from globus_action_provider_tools.flask.config import (
 )
 from globus_action_provider_tools.flask.exceptions import (
     ActionProviderError,
+    ActionProviderTimeout,
     ActionProviderToolsException,
+    ActionProviderUnavailable,
     RequestValidationError,
     UnauthorizedRequest,
 )
@@ -58,28 +65,43 @@ class FlaskAuthStateBuilder(AuthStateBuilder):
     """
     A customized AuthStateBuilder which can handle a flask.Request object
     as its input.
+
+    The ``Authorization`` header is checked by a ``TokenPreValidator`` before the
+    token is introspected, so that malformed tokens are rejected without a call to
+    Globus Auth.
     """
 
-    def build_from_request(self, *, request: Request | None = None) -> AuthState:
+    def __init__(
+        self,
+        auth_client: globus_sdk.ConfidentialAppAuthClient,
+        expected_scopes: Iterable[str],
+        *,
+        token_validator: TokenPreValidator | None = None,
+        **kwargs: t.Any,
+    ) -> None:
+        super().__init__(auth_client, expected_scopes, **kwargs)
+        self.token_validator = token_validator or TokenPreValidator()
+
+    def build_from_request(
+        self, *, request: Request | None = None, lazy: bool = False
+    ) -> AuthState:
         """
         Build the ``AuthState`` from the ``Authorization`` header provided.
 
         :param request: The flask request object to process. Defaults to the request
             object found in the current app context.
+        :param lazy: If ``True``, defer introspecting the token until the
+            ``AuthState`` is first used. Errors raised at that point are converted
+            to ``401 Unauthorized`` responses by ``blueprint_error_handler``.
         """
         if request is None:
             request = flask.request
-        access_token = request.headers.get("Authorization")
-        if access_token is None:
-            raise UnverifiedAuthenticationError("No Authorization header received")
-        if not access_token.startswith("Bearer "):
-            raise UnverifiedAuthenticationError(
-                "No Bearer token in Authorization header"
-            )
-        access_token = access_token[len("Bearer ") :].strip()
+        access_token = self.token_validator.validate_authorization_header(
+            request.headers.get("Authorization")
+        )
 
         try:
-            return super().build(access_token)
+            return super().build(access_token, lazy=lazy)
         except InvalidTokenScopesError as err:
             raise AuthenticationError("Token has invalid scopes") from err
         except InactiveTokenError as err:
@@ -152,7 +174,9 @@ def action_status_return_to_view_return(
     return jsonify(status), status_code
 
 
-def blueprint_error_handler(exc: Exception) -> ViewReturn:
+def blueprint_error_handler(
+    exc: Exception,
+) -> ViewReturn | ActionProviderToolsException:
     # ActionProviderToolsException is the base class for HTTP-based exceptions,
     # return those directly
     if isinstance(exc, ActionProviderToolsException):
@@ -160,9 +184,24 @@ def blueprint_error_handler(exc: Exception) -> ViewReturn:
 
     # If a component in the toolkit throw's an unhandled AuthenticationError,
     # replace it with a Flask-based response
-    if isinstance(exc, AuthenticationError):
+    # (a lazily-built AuthState raises token errors when it is first used)
+    if isinstance(
+        exc, (AuthenticationError, InactiveTokenError, InvalidTokenScopesError)
+    ):
         return UnauthorizedRequest()
 
+    # Globus Auth or Groups is failing or overloaded, and there was no cached
+    # result to use
+    if isinstance(exc, (CircuitOpenError, ConcurrencyLimitError)):
+        retry_after = None
+        if isinstance(exc, CircuitOpenError):
+            retry_after = math.ceil(exc.retry_after) or 1
+        return ActionProviderUnavailable(retry_after=retry_after)
+
+    # the request's deadline passed while calling Globus Auth or Groups
+    if isinstance(exc, DeadlineExceededError):
+        return ActionProviderTimeout()
+
     current_app.logger.exception("Handling unexpected exception", exc_info=True)
     # Handle unexpected Exceptions in a somewhat predictable way
     resp = {
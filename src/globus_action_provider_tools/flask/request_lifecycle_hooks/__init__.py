@@ -1,5 +1,7 @@
+from .cache_metrics import CacheMetricsReporter
 from .cloudwatch_metrics import CloudWatchMetricEMFLogger
 
 __all__ = [
+    "CacheMetricsReporter",
     "CloudWatchMetricEMFLogger",
 ]
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import typing as t
+
+from flask import Response, current_app, request
+
+from globus_action_provider_tools.circuit_breaker import CircuitBreakerStats
+from globus_action_provider_tools.concurrency_limiter import ConcurrencyLimiterStats
+from globus_action_provider_tools.utils import CacheStats
+
+log = logging.getLogger(__name__)
+
+CacheStatsSink = t.Callable[[t.Mapping[str, CacheStats]], None]
+CircuitBreakerStatsSink = t.Callable[[t.Mapping[str, CircuitBreakerStats]], None]
+ConcurrencyStatsSink = t.Callable[[t.Mapping[str, ConcurrencyLimiterStats]], None]
+
+
+class CacheMetricsReporter:
+    """
+    Flask RequestLifecycleHooks to periodically report the statistics of an
+      Action Provider's authentication caches.
+
+    At most once per ``interval`` seconds, after a request is handled, the stats of
+      each of the blueprint's caches are passed to ``sink``, by cache name. The
+      counters in each ``CacheStats`` are those accumulated since the previous
+      report, while ``size`` and ``maxsize`` are current.
+
+    ``CloudWatchMetricEMFLogger.emit_cache_metrics`` is a suitable sink:
+
+        emf_logger = CloudWatchMetricEMFLogger("ActionProviders", "MyProvider")
+        hooks = [emf_logger, CacheMetricsReporter(emf_logger.emit_cache_metrics)]
+
+    If the blueprint's caches have circuit breakers, their stats are passed to
+      ``circuit_breaker_sink`` in the same way, by endpoint name.
+      ``CloudWatchMetricEMFLogger.emit_circuit_breaker_metrics`` is a suitable
+      sink. Likewise, the stats of the concurrency limiters of the blueprint's
+      ``ClientFactory`` are passed to ``concurrency_sink``, by service name, and
+      ``CloudWatchMetricEMFLogger.emit_concurrency_metrics`` is a suitable sink.
+    """
+
+    def __init__(
+        self,
+        sink: CacheStatsSink,
+        interval: float = 60.0,
+        *,
+        timer: t.Callable[[], float] = time.monotonic,
+        circuit_breaker_sink: CircuitBreakerStatsSink | None = None,
+        concurrency_sink: ConcurrencyStatsSink | None = None,
+    ) -> None:
+        """
+        :param sink: Called with the stats of each cache, by cache name
+        :param interval: The minimum time between reports, in seconds
+        :param timer: The clock used to schedule reports
+        :param circuit_breaker_sink: Called with the stats of each circuit
+            breaker, by endpoint name
+        :param concurrency_sink: Called with the stats of each concurrency limiter,
+            by service name
+        """
+        self._sink = sink
+        self._circuit_breaker_sink = circuit_breaker_sink
+        self._concurrency_sink = concurrency_sink
+        self._interval = interval
+        self._timer = timer
+        self._lock = threading.Lock()
+        # the time and stats of the last report, by blueprint name
+        self._reported_at: dict[str, float] = {}
+        self._reported_stats: dict[str, dict[str, CacheStats]] = {}
+        self._reported_breaker_stats: dict[str, dict[str, CircuitBreakerStats]] = {}
+        self._reported_concurrency_stats: dict[
+            str, dict[str, ConcurrencyLimiterStats]
+        ] = {}
+
+    def after_request(self, response: Response):
+        blueprint_name = request.blueprint
+        if blueprint_name is None:
+            return response
+        state_builder = getattr(
+            current_app.blueprints.get(blueprint_name), "state_builder", None
+        )
+        if state_builder is None:
+            return response
+
+        now = self._timer()
+        with self._lock:
+            reported_at = self._reported_at.setdefault(blueprint_name, now)
+            if now - reported_at < self._interval:
+                return response
+            self._reported_at[blueprint_name] = now
+            stats = state_builder.caches.stats()
+            previous = self._reported_stats.get(blueprint_name, {})
+            self._reported_stats[blueprint_name] = stats
+            breaker_stats = state_builder.caches.circuit_breaker_stats()
+            previous_breakers = self._reported_breaker_stats.get(blueprint_name, {})
+            self._reported_breaker_stats[blueprint_name] = breaker_stats
+            concurrency_stats = state_builder.client_factory.concurrency_stats()
+            previous_concurrency = self._reported_concurrency_stats.get(
+                blueprint_name, {}
+            )
+            self._reported_concurrency_stats[blueprint_name] = concurrency_stats
+
+        try:
+            self._sink(_since(stats, previous))
+            if self._circuit_breaker_sink is not None and breaker_stats:
+                self._circuit_breaker_sink(_since(breaker_stats, previous_breakers))
+            if self._concurrency_sink is not None and concurrency_stats:
+                self._concurrency_sink(_since(concurrency_stats, previous_concurrency))
+        except Exception:
+            # a failing sink must not fail the request
+            log.exception("Failed to report cache metrics")
+        return response
+
+
+StatsT = t.TypeVar("StatsT", CacheStats, CircuitBreakerStats, ConcurrencyLimiterStats)
+
+
+def _since(
+    stats: t.Mapping[str, StatsT], previous: t.Mapping[str, StatsT]
+) -> dict[str, StatsT]:
+    return {
+        name: current.since(previous[name]) if name in previous else current
+        for name, current in stats.items()
+    }
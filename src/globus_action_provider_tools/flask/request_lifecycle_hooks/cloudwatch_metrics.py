@@ -8,6 +8,10 @@ from datetime import datetime
 
 from flask import Response, g
 
+from globus_action_provider_tools.circuit_breaker import CircuitBreakerStats
+from globus_action_provider_tools.concurrency_limiter import ConcurrencyLimiterStats
+from globus_action_provider_tools.utils import CacheStats
+
 log = logging.getLogger("globus_action_provider_tools.cloudwatch_metric_emf_logger")
 
 
@@ -40,6 +44,20 @@ class CloudWatchMetricEMFLogger:
      * 5XXs - The number of server-side errors captured in a given period.
      * RequestLatency - The number of milliseconds between the request being received
         and the response being sent.
+
+    Cache-Specific
+    --------------
+      Emitted by ``emit_cache_metrics``, for use with a ``CacheMetricsReporter``.
+      Namespace: {supplied_namespace}
+      Dimensions:
+        ActionProvider: {supplied_action_provider_name}
+        Cache: "introspect" | "dependent_tokens" | "group_membership" | ...
+
+    Included Metrics:
+     * CacheHits, CacheMisses, CacheBackendHits, CacheExpirations, CacheEvictions,
+        CacheLoads - Counts accumulated in the reporting period.
+     * CacheLoadLatency - The mean number of milliseconds taken to load a value.
+     * CacheSize - The number of entries in the cache.
     """
 
     def __init__(
@@ -110,6 +128,97 @@ class CloudWatchMetricEMFLogger:
             ],
         )
 
+        self._emit(emf_obj)
+
+    def emit_cache_metrics(self, stats: t.Mapping[str, CacheStats]):
+        """
+        Emit the statistics of authentication caches, by cache name, such as those
+          reported by a ``CacheMetricsReporter``.
+
+        Each cache's metrics are emitted with the dimensions
+          ``ActionProvider: {supplied_action_provider_name}`` and
+          ``Cache: "introspect" | "dependent_tokens" | ...``
+        """
+        for cache_name, cache_stats in stats.items():
+            emf_obj = _to_emf(
+                namespace=self._namespace,
+                dimension_sets=[
+                    {"ActionProvider": self._action_provider_name, "Cache": cache_name}
+                ],
+                metrics=[
+                    ("CacheHits", cache_stats.hits, "Count"),
+                    ("CacheMisses", cache_stats.misses, "Count"),
+                    ("CacheBackendHits", cache_stats.backend_hits, "Count"),
+                    ("CacheStaleHits", cache_stats.stale_hits, "Count"),
+                    ("CacheExpirations", cache_stats.expirations, "Count"),
+                    ("CacheEvictions", cache_stats.evictions, "Count"),
+                    ("CacheLoads", cache_stats.loads, "Count"),
+                    (
+                        "CacheLoadLatency",
+                        cache_stats.mean_load_time * 1000,
+                        "Milliseconds",
+                    ),
+                    ("CacheSize", cache_stats.size, "Count"),
+                ],
+            )
+            self._emit(emf_obj)
+
+    def emit_circuit_breaker_metrics(self, stats: t.Mapping[str, CircuitBreakerStats]):
+        """
+        Emit the statistics of circuit breakers, by endpoint name, such as those
+          reported by a ``CacheMetricsReporter``.
+
+        Each breaker's metrics are emitted with the dimensions
+          ``ActionProvider: {supplied_action_provider_name}`` and
+          ``Endpoint: "introspect" | "dependent_tokens" | "groups"``.
+          ``CircuitOpen`` is 1 while the breaker is open or probing, and 0 otherwise.
+        """
+        for endpoint, breaker_stats in stats.items():
+            emf_obj = _to_emf(
+                namespace=self._namespace,
+                dimension_sets=[
+                    {"ActionProvider": self._action_provider_name, "Endpoint": endpoint}
+                ],
+                metrics=[
+                    ("CircuitOpen", int(breaker_stats.state != "closed"), "Count"),
+                    ("CircuitCalls", breaker_stats.calls, "Count"),
+                    ("CircuitFailures", breaker_stats.failures, "Count"),
+                    ("CircuitSlowCalls", breaker_stats.slow_calls, "Count"),
+                    ("CircuitRejected", breaker_stats.rejected, "Count"),
+                    ("CircuitOpened", breaker_stats.opened, "Count"),
+                    ("CircuitHalfOpened", breaker_stats.half_opened, "Count"),
+                    ("CircuitClosed", breaker_stats.closed, "Count"),
+                ],
+            )
+            self._emit(emf_obj)
+
+    def emit_concurrency_metrics(self, stats: t.Mapping[str, ConcurrencyLimiterStats]):
+        """
+        Emit the statistics of concurrency limiters, by service name, such as those
+          reported by a ``CacheMetricsReporter``.
+
+        Each limiter's metrics are emitted with the dimensions
+          ``ActionProvider: {supplied_action_provider_name}`` and
+          ``Service: "auth" | "groups"``
+        """
+        for service, limiter_stats in stats.items():
+            emf_obj = _to_emf(
+                namespace=self._namespace,
+                dimension_sets=[
+                    {"ActionProvider": self._action_provider_name, "Service": service}
+                ],
+                metrics=[
+                    ("ConcurrencyLimit", limiter_stats.limit, "Count"),
+                    ("ConcurrencyInFlight", limiter_stats.in_flight, "Count"),
+                    ("ConcurrencyQueued", limiter_stats.queued, "Count"),
+                    ("ConcurrencyCalls", limiter_stats.calls, "Count"),
+                    ("ConcurrencyDropped", limiter_stats.dropped, "Count"),
+                    ("ConcurrencyRejected", limiter_stats.rejected, "Count"),
+                ],
+            )
+            self._emit(emf_obj)
+
+    def _emit(self, emf_obj: dict[str, t.Any]):
         serialized_emf = json.dumps(emf_obj)
         if not self._log_level:
             print(serialized_emf)
@@ -1,39 +1,776 @@
 from __future__ import annotations
 
+import concurrent.futures
+import dataclasses
 import datetime
+import heapq
+import logging
+import math
+import pickle
+import random
+import struct
+import threading
+import time
 import typing as t
 
 import cachetools
 
+from .cache_eviction import WTinyLFUCache
+from .cache_policy import CacheSettings, EvictionPolicy
+from .deadline import remaining_time
+from .errors import DeadlineExceededError
+
+if t.TYPE_CHECKING:
+    from .cache_backends import CacheBackend
+
+log = logging.getLogger(__name__)
+
 T = t.TypeVar("T")
 
 
+class CacheSerializer(t.Generic[T]):
+    """
+    Converts cached values to and from ``bytes`` for storage in a ``CacheBackend``.
+
+    The default implementation uses ``pickle``, so it must only be used with a
+    backend which is writable by trusted processes alone: loading a pickle can
+    run arbitrary code. Subclasses may override ``dumps`` and ``loads`` for
+    values which cannot (or should not) be pickled.
+    """
+
+    def dumps(self, value: T) -> bytes:
+        return pickle.dumps(value)
+
+    def loads(self, data: bytes) -> T:
+        return pickle.loads(data)  # type: ignore[no-any-return]
+
+
+class _Entry(t.Generic[T]):
+    __slots__ = ("value", "expires_at", "lifetime", "delta", "tenant")
+
+    def __init__(
+        self,
+        value: T,
+        expires_at: float,
+        lifetime: float,
+        delta: float = 0.0,
+        tenant: str | None = None,
+    ) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.lifetime = lifetime
+        # how long the value took to compute, if known
+        self.delta = delta
+        # the tenant to which the value belongs, for per-tenant quotas
+        self.tenant = tenant
+
+
+def _entry_tenant(entry: _Entry[t.Any]) -> str | None:
+    return entry.tenant
+
+
+class _Shard:
+    __slots__ = (
+        "lock",
+        "entries",
+        "hits",
+        "misses",
+        "backend_hits",
+        "stale_hits",
+        "expirations",
+        "evictions",
+        "loads",
+        "load_time",
+        "expiry_queue",
+    )
+
+    def __init__(self, entries: cachetools.Cache) -> None:
+        self.lock = threading.Lock()
+        self.entries = entries
+        # (removable_at, id(entry), key, entry) for the entries stored, in a heap;
+        # items for entries which were since replaced or removed are skipped
+        self.expiry_queue: list[tuple[float, int, str, _Entry[t.Any]]] = []
+        # statistics, updated under the shard's lock
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+        self.stale_hits = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.loads = 0
+        self.load_time = 0.0
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheStats:
+    """
+    Counters describing the use of a ``TypedTTLCache``, since it was created.
+
+    :param hits: Lookups served by the in-process cache
+    :param misses: Lookups not served by the in-process cache
+    :param backend_hits: Of the ``misses``, those served by the shared backend
+    :param stale_hits: Expired values served by ``get_stale``
+    :param expirations: Entries which were found to have expired, and removed
+    :param evictions: Entries which were evicted, or not admitted, to make room
+        for others
+    :param loads: Values which were computed or fetched and stored
+    :param load_time: The total time spent computing or fetching values whose
+        load time is known, in seconds
+    :param size: The number of entries in the in-process cache
+    :param maxsize: The maximum number of entries in the in-process cache
+    """
+
+    hits: int = 0
+    misses: int = 0
+    backend_hits: int = 0
+    stale_hits: int = 0
+    expirations: int = 0
+    evictions: int = 0
+    loads: int = 0
+    load_time: float = 0.0
+    size: int = 0
+    maxsize: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of lookups served by the in-process cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def mean_load_time(self) -> float:
+        """The mean time spent loading a value, in seconds."""
+        return self.load_time / self.loads if self.loads else 0.0
+
+    def since(self, earlier: CacheStats) -> CacheStats:
+        """
+        The counters accumulated since ``earlier`` stats were taken from the same
+        cache. ``size`` and ``maxsize`` are those of these stats.
+        """
+        return dataclasses.replace(
+            self,
+            hits=self.hits - earlier.hits,
+            misses=self.misses - earlier.misses,
+            backend_hits=self.backend_hits - earlier.backend_hits,
+            stale_hits=self.stale_hits - earlier.stale_hits,
+            expirations=self.expirations - earlier.expirations,
+            evictions=self.evictions - earlier.evictions,
+            loads=self.loads - earlier.loads,
+            load_time=self.load_time - earlier.load_time,
+        )
+
+
+_EXPIRATION_HEADER = struct.Struct("!d")
+
+_EVICTION_CACHE_CLASSES: dict[str, type[cachetools.Cache]] = {
+    "lru": cachetools.LRUCache,
+    "lfu": cachetools.LFUCache,
+    "fifo": cachetools.FIFOCache,
+    "tinylfu": WTinyLFUCache,
+}
+
+
 class TypedTTLCache(t.Generic[T]):
     """
-    A tiny wrapper class which provides a type-checked layer on top of TTLCache.
+    A tiny wrapper class which provides a type-checked layer on top of a cachetools
+    cache, with entries that expire after ``ttl`` seconds.
     This allows us to know and enforce the types of cached objects.
+
+    The cache is safe to use from multiple threads. Entries are split by key
+    across ``shards`` independently locked segments, each holding an equal part
+    of ``maxsize``, so that threads working with different keys rarely wait on
+    one another. Eviction applies within each shard, and expired entries are
+    removed before any live entry is evicted.
+
+    If a ``backend`` is given, the in-process cache acts as a near-cache in front
+    of the shared backend. Writes go to both tiers, and a miss in the in-process
+    cache falls through to the backend.
+
+    :param maxsize: The maximum number of entries in the in-process cache
+    :param ttl: The lifetime of entries, in seconds
+    :param eviction: How to choose an entry to evict when the cache is full.
+        One of ``"lru"``, ``"lfu"``, ``"fifo"``, or ``"tinylfu"``.
+    :param backend: An optional shared ``CacheBackend``
+    :param namespace: A prefix applied to keys written to the backend, so that
+        several caches may share one backend
+    :param serializer: Converts values to and from bytes for the backend.
+        Defaults to a pickle-based serializer.
+    :param jitter: The fraction, between 0 and 1, by which the lifetime of each
+        entry may be randomly shortened, so that entries stored at the same time
+        do not all expire at the same time
+    :param early_expiration: The ``beta`` parameter of probabilistic early
+        expiration for ``get_or_compute``. ``0`` (the default) disables early
+        expiration; ``1`` is a good starting value, and larger values recompute
+        entries earlier.
+    :param shards: The number of independently locked segments
+    :param tenant_quota: The fraction of each shard which may be held by the
+        entries of any one tenant. Requires ``"tinylfu"`` eviction.
+    :param stale_if_error: For how many seconds expired entries are kept, so that
+        ``get_stale`` may return them if a new value cannot be fetched
+    :param timer: The clock used to expire entries
+    :param rand: A source of random numbers in ``[0, 1)``
     """
 
-    def __init__(self, *, maxsize: int, ttl: int) -> None:
-        self._cache: cachetools.TTLCache = cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl: int,
+        eviction: EvictionPolicy = "lru",
+        backend: CacheBackend | None = None,
+        namespace: str = "",
+        serializer: CacheSerializer[T] | None = None,
+        jitter: float = 0.0,
+        early_expiration: float = 0.0,
+        shards: int = 1,
+        tenant_quota: float | None = None,
+        stale_if_error: float = 0.0,
+        timer: t.Callable[[], float] = time.monotonic,
+        rand: t.Callable[[], float] = random.random,
+    ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be at least 0 and less than 1")
+        if early_expiration < 0:
+            raise ValueError("early_expiration must not be negative")
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if stale_if_error < 0:
+            raise ValueError("stale_if_error must not be negative")
+        try:
+            cache_class = _EVICTION_CACHE_CLASSES[eviction]
+        except KeyError:
+            raise ValueError(f"Unsupported eviction policy: {eviction!r}") from None
+        store_kwargs: dict[str, t.Any] = {}
+        if tenant_quota is not None:
+            if cache_class is not WTinyLFUCache:
+                raise ValueError("tenant_quota requires 'tinylfu' eviction")
+            store_kwargs.update(tenant_quota=tenant_quota, get_tenant=_entry_tenant)
+        shard_maxsize = -(-maxsize // shards)
+        self._shards = tuple(
+            _Shard(cache_class(maxsize=shard_maxsize, **store_kwargs))
+            for _ in range(shards)
+        )
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.eviction = eviction
+        self.tenant_quota = tenant_quota
+        self.backend = backend
+        self.namespace = namespace
+        self.serializer: CacheSerializer[T] = serializer or CacheSerializer()
+        self.jitter = jitter
+        self.early_expiration = early_expiration
+        self.stale_if_error = stale_if_error
+        self.timer = timer
+        self.rand = rand
+
+    @classmethod
+    def from_settings(
+        cls, settings: CacheSettings, **kwargs: t.Any
+    ) -> TypedTTLCache[T]:
+        """
+        Create a cache sized and tuned according to ``settings``.
+        Keyword arguments are passed through to the constructor.
+        """
+        return cls(
+            maxsize=settings.maxsize,
+            ttl=settings.ttl,
+            eviction=settings.eviction,
+            jitter=settings.jitter,
+            early_expiration=settings.early_expiration,
+            shards=settings.shards,
+            tenant_quota=settings.tenant_quota,
+            stale_if_error=settings.stale_if_error,
+            **kwargs,
+        )
+
+    @property
+    def shards(self) -> int:
+        return len(self._shards)
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def _shard(self, key: str) -> _Shard:
+        shards = self._shards
+        if len(shards) == 1:
+            return shards[0]
+        return shards[hash(key) % len(shards)]
+
+    def _local_entry(
+        self, key: str, now: float, *, lookup: bool = False
+    ) -> _Entry[T] | None:
+        """
+        Return the unexpired in-process entry for ``key``, removing it if expired.
+        If ``lookup`` is true, the result counts as a hit or a miss.
+        """
+        shard = self._shard(key)
+        with shard.lock:
+            entry: _Entry[T] | None = shard.entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                # expired entries are kept for stale_if_error seconds
+                if entry.expires_at + self.stale_if_error <= now:
+                    del shard.entries[key]
+                    shard.expirations += 1
+                entry = None
+            if lookup:
+                if entry is None:
+                    shard.misses += 1
+                else:
+                    shard.hits += 1
+        return entry
+
+    def _local_set(self, key: str, entry: _Entry[T]) -> None:
+        shard = self._shard(key)
+        now = self.timer()
+        removable_at = entry.expires_at + self.stale_if_error
+        with shard.lock:
+            entries = shard.entries
+            # remove expired entries first, so that the eviction policy does not
+            # choose a live entry while expired ones hold slots
+            self._expire(shard, now)
+            if key in entries:
+                entries[key] = entry
+            else:
+                size = len(entries)
+                entries[key] = entry
+                # entries evicted to make room, or the new entry if not admitted
+                shard.evictions += size + 1 - len(entries)
+            queue = shard.expiry_queue
+            heapq.heappush(queue, (removable_at, id(entry), key, entry))
+            if len(queue) > 2 * entries.maxsize + 16:
+                self._compact(shard)
+
+    def _expire(self, shard: _Shard, now: float) -> None:
+        # called with the shard's lock held; removes the entries which have been
+        # expired for stale_if_error seconds, in the order in which they expired
+        queue = shard.expiry_queue
+        entries = shard.entries
+        while queue and queue[0][0] <= now:
+            _, _, key, entry = heapq.heappop(queue)
+            # read without counting as a use by the eviction policy
+            if key in entries and cachetools.Cache.__getitem__(entries, key) is entry:
+                del entries[key]
+                shard.expirations += 1
+
+    def _compact(self, shard: _Shard) -> None:
+        # called with the shard's lock held; drops the queued items of entries
+        # which were replaced, evicted or deleted
+        entries = shard.entries
+        shard.expiry_queue = [
+            item
+            for item in shard.expiry_queue
+            if item[2] in entries
+            and cachetools.Cache.__getitem__(entries, item[2]) is item[3]
+        ]
+        heapq.heapify(shard.expiry_queue)
+
+    def _local_delete(self, key: str) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries.pop(key, None)
+
+    def _backend_key(self, key: str) -> str:
+        return f"{self.namespace}{key}"
+
+    def _backend_get(self, key: str) -> T | None:
+        if self.backend is None:
+            return None
+        data = self.backend.get(self._backend_key(key))
+        if data is None:
+            return None
+        # backend values are prefixed with their (wall clock) expiration time, so
+        # that the in-process copy expires along with the shared copy
+        (expires_at,) = _EXPIRATION_HEADER.unpack_from(data)
+        remaining = min(expires_at - time.time(), self.ttl)
+        if remaining <= 0:
+            return None
+        value = self.serializer.loads(data[_EXPIRATION_HEADER.size :])
+        self._local_set(key, _Entry(value, self.timer() + remaining, remaining))
+        shard = self._shard(key)
+        with shard.lock:
+            shard.backend_hits += 1
+        return value
+
+    def _local_get(self, key: str) -> T | None:
+        entry = self._local_entry(key, self.timer())
+        if entry is None:
+            return None
+        return entry.value
 
     def get(self, key: str) -> T | None:
-        return self._cache.get(key)
+        entry = self._local_entry(key, self.timer(), lookup=True)
+        if entry is not None:
+            return entry.value
+        return self._backend_get(key)
+
+    def peek(self, key: str) -> T | None:
+        """
+        Return the unexpired in-process value for ``key``, if any, without
+        counting a lookup or reading the backend.
+        """
+        entry = self._local_entry(key, self.timer())
+        return entry.value if entry is not None else None
+
+    def get_stale(self, key: str) -> T | None:
+        """
+        Return the in-process value for ``key``, even if it expired, as long as it
+        expired no more than ``stale_if_error`` seconds ago. Use this as a fallback
+        when a new value cannot be fetched.
+        """
+        now = self.timer()
+        shard = self._shard(key)
+        with shard.lock:
+            entry: _Entry[T] | None = shard.entries.get(key)
+            if entry is None or entry.expires_at + self.stale_if_error <= now:
+                return None
+            if entry.expires_at <= now:
+                shard.stale_hits += 1
+        return entry.value
+
+    def stats(self) -> CacheStats:
+        """Return the statistics of the cache, summed across its shards."""
+        totals = dict.fromkeys(
+            (
+                "hits",
+                "misses",
+                "backend_hits",
+                "stale_hits",
+                "expirations",
+                "evictions",
+                "loads",
+            ),
+            0,
+        )
+        load_time = 0.0
+        size = 0
+        for shard in self._shards:
+            with shard.lock:
+                for name in totals:
+                    totals[name] += getattr(shard, name)
+                load_time += shard.load_time
+                size += len(shard.entries)
+        return CacheStats(
+            **totals, load_time=load_time, size=size, maxsize=self.maxsize
+        )
+
+    def remaining_fraction(self, key: str) -> float | None:
+        """
+        Return the fraction of the lifetime of the in-process entry for ``key``
+        which has not yet elapsed, or ``None`` if there is no such entry.
+        """
+        now = self.timer()
+        entry = self._local_entry(key, now)
+        if entry is None:
+            return None
+        return (entry.expires_at - now) / entry.lifetime
 
     def __setitem__(self, key: str, value: T) -> None:
-        self._cache[key] = value
+        self.set(key, value)
+
+    def set(
+        self,
+        key: str,
+        value: T,
+        *,
+        ttl: float | None = None,
+        tenant: str | None = None,
+        load_time: float | None = None,
+    ) -> None:
+        """
+        Store a value in the cache.
+
+        :param key: The key to store
+        :param value: The value to store
+        :param ttl: A lifetime for this entry, in seconds. The lifetime is capped at
+            the cache's ``ttl``, and shortened by up to ``jitter``. If the lifetime is
+            not positive, the value is not cached and any existing entry for ``key``
+            is removed.
+        :param tenant: The tenant to which the value belongs, if ``tenant_quota`` is
+            in use
+        :param load_time: How long the value took to fetch, in seconds. If given,
+            the value counts as a load in the cache's ``stats``.
+        """
+        if load_time is not None:
+            self._record_load(key, load_time)
+        self._set(key, value, ttl, load_time or 0.0, tenant)
+
+    def _record_load(self, key: str, load_time: float) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.loads += 1
+            shard.load_time += load_time
+
+    def _set(
+        self,
+        key: str,
+        value: T,
+        ttl: float | None,
+        delta: float = 0.0,
+        tenant: str | None = None,
+    ) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.jitter:
+            ttl *= 1 - self.jitter * self.rand()
+        if ttl <= 0:
+            self._local_delete(key)
+            if self.backend is not None:
+                self.backend.delete(self._backend_key(key))
+            return
+
+        self._local_set(key, _Entry(value, self.timer() + ttl, ttl, delta, tenant))
+        if self.backend is not None:
+            data = _EXPIRATION_HEADER.pack(time.time() + ttl)
+            data += self.serializer.dumps(value)
+            self.backend.set(self._backend_key(key), data, ttl)
+
+    def get_or_compute(
+        self,
+        key: str,
+        fn: t.Callable[[], T],
+        *,
+        ttl: float | t.Callable[[T], float | None] | None = None,
+        tenant: str | t.Callable[[T], str | None] | None = None,
+        inflight: SingleFlight | None = None,
+    ) -> T:
+        """
+        Return the cached value for ``key``, or call ``fn`` to compute and store it.
+
+        If ``early_expiration`` is enabled, a cached value may be recomputed before
+        it expires, with a probability which rises as its expiration time
+        approaches and which is higher for values which are slow to compute
+        ("XFetch"). This spreads recomputations out over time, rather than
+        having every caller miss at once when an entry expires.
+
+        :param key: The key to look up
+        :param fn: Computes the value on a miss
+        :param ttl: The lifetime of a computed value, as for ``set``, or a callable
+            which computes the lifetime from the value
+        :param tenant: The tenant of a computed value, as for ``set``, or a callable
+            which determines the tenant from the value
+        :param inflight: If given, concurrent misses for ``key`` share one call to
+            ``fn``, and only the caller which made it stores the value
+        """
+        now = self.timer()
+        entry = self._local_entry(key, now, lookup=True)
+        if entry is not None:
+            if not self._expires_early(entry, now):
+                return entry.value
+        else:
+            value = self._backend_get(key)
+            if value is not None:
+                return value
+
+        def load() -> T:
+            value = fn()
+            delta = self.timer() - now
+            self._record_load(key, delta)
+            self._set(
+                key,
+                value,
+                ttl(value) if callable(ttl) else ttl,
+                delta,
+                tenant(value) if callable(tenant) else tenant,
+            )
+            return value
+
+        if inflight is None:
+            return load()
+        return inflight.do(f"{self.namespace}{key}", load)
+
+    def _expires_early(self, entry: _Entry[T], now: float) -> bool:
+        if not self.early_expiration or not entry.delta:
+            return False
+        # -log(u) for uniform u in (0, 1] is exponentially distributed
+        gap = -entry.delta * self.early_expiration * math.log(1 - self.rand())
+        return now + gap >= entry.expires_at
 
     def __delitem__(self, key: str) -> None:
-        del self._cache[key]
+        found = self._local_get(key) is not None
+        self._local_delete(key)
+        if self.backend is not None:
+            found = found or self.backend.get(self._backend_key(key)) is not None
+            self.backend.delete(self._backend_key(key))
+        if not found:
+            raise KeyError(key)
 
     def __getitem__(self, key: str) -> T:
-        return self._cache[key]  # type: ignore[no-any-return]
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
 
     def __contains__(self, key: str) -> bool:
-        return key in self._cache
+        return self.get(key) is not None
 
     def clear(self) -> None:
-        self._cache.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.expiry_queue.clear()
+        if self.backend is not None:
+            self.backend.clear(self.namespace)
+
+
+class _Call(t.Generic[T]):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls which share a key.
+
+    While a call for a key is in flight, other callers for the same key wait for it
+    to finish and receive its result (or its exception), rather than making the
+    same call again. Waiting callers give up at their own request deadline, if
+    any, rather than the deadline of the caller making the call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call[t.Any]] = {}
+
+    def do(self, key: str, fn: t.Callable[[], T]) -> T:
+        """
+        Call ``fn`` and return its result, unless a call for ``key`` is already in
+        flight, in which case wait for that call and return its result.
+
+        :raises DeadlineExceededError: if the request deadline passed while waiting
+            for the call in flight
+        :raises: any exception raised by the call for ``key``
+        """
+        with self._lock:
+            call: _Call[T] | None = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            remaining = remaining_time()
+            timeout = None if remaining is None else max(remaining, 0)
+            if not call.done.wait(timeout):
+                raise DeadlineExceededError(f"the call for {key!r} finished")
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class Prefetcher:
+    """
+    Run calls on a bounded thread pool, ahead of the time their results are
+    needed. Calls are expected to store their results, for example in a cache;
+    if one fails, the failure is logged.
+
+    :param max_workers: The number of threads used to run calls
+    :param max_pending: The maximum number of calls which may be queued or
+        running. Further calls are skipped until the queue drains.
+    """
+
+    thread_name_prefix = "globus-apt-prefetch"
+
+    def __init__(self, *, max_workers: int = 4, max_pending: int = 100) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+
+    def submit(self, key: str, fn: t.Callable[[], t.Any]) -> bool:
+        """
+        Submit ``fn`` to run in the background, unless a call for ``key`` is
+        already pending or the queue is full. Returns ``True`` if it was submitted.
+        """
+        with self._lock:
+            if key in self._pending or len(self._pending) >= self.max_pending:
+                return False
+            self._pending.add(key)
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.thread_name_prefix,
+                )
+            executor = self._executor
+        executor.submit(self._run, key, fn)
+        return True
+
+    def _run(self, key: str, fn: t.Callable[[], t.Any]) -> None:
+        try:
+            fn()
+        except Exception:
+            self._log_failure(key)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _log_failure(self, key: str) -> None:
+        log.warning(f"Failed to prefetch {key}", exc_info=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the threads, optionally waiting for running calls."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class CacheRefresher(Prefetcher):
+    """
+    Refresh cache entries in the background shortly before they expire.
+
+    When an entry which is still being read is within ``threshold`` of the end of
+    its lifetime, a refresh is submitted to a bounded thread pool. The refresh
+    is expected to store a new value in the cache. If it fails, the failure is
+    logged and the current value is left in place until it expires.
+
+    :param threshold: The fraction of an entry's lifetime, between 0 and 1, which
+        may remain before the entry is refreshed
+    :param max_workers: The number of threads used to run refreshes
+    :param max_pending: The maximum number of refreshes which may be queued or
+        running. Further refreshes are skipped until the queue drains.
+    """
+
+    thread_name_prefix = "globus-apt-refresh"
+
+    def __init__(
+        self, threshold: float, *, max_workers: int = 4, max_pending: int = 100
+    ) -> None:
+        if not 0 < threshold < 1:
+            raise ValueError("threshold must be between 0 and 1")
+        super().__init__(max_workers=max_workers, max_pending=max_pending)
+        self.threshold = threshold
+
+    def maybe_refresh(
+        self, cache: TypedTTLCache[t.Any], key: str, fn: t.Callable[[], t.Any]
+    ) -> bool:
+        """
+        Submit ``fn`` to refresh the entry for ``key`` if it is close to expiring.
+        Returns ``True`` if a refresh was submitted.
+        """
+        remaining = cache.remaining_fraction(key)
+        if remaining is None or remaining > self.threshold:
+            return False
+        return self.submit(f"{cache.namespace}{key}", fn)
+
+    def _log_failure(self, key: str) -> None:
+        log.warning(
+            f"Failed to refresh cache entry {key}; keeping the current value",
+            exc_info=True,
+        )
 
 
 def now_isoformat():
@@ -87,6 +87,7 @@ def _clear_auth_state_cache():
     AuthState.dependent_tokens_cache.clear()
     AuthState.group_membership_cache.clear()
     AuthState.introspect_cache.clear()
+    AuthState.rejected_tokens_cache.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+
+from flask import Flask
+
+from globus_action_provider_tools.authentication import AuthStateCaches
+from globus_action_provider_tools.cache_policy import (
+    AuthCachePolicy,
+    CircuitBreakerSettings,
+    ConcurrencyLimitSettings,
+)
+from globus_action_provider_tools.cache_records import IntrospectRecord
+from globus_action_provider_tools.client_factory import ClientFactory
+from globus_action_provider_tools.flask import ActionProviderBlueprint
+from globus_action_provider_tools.flask.helpers import assign_json_provider
+from globus_action_provider_tools.flask.request_lifecycle_hooks import (
+    CacheMetricsReporter,
+    CloudWatchMetricEMFLogger,
+)
+from tests.flask.app_utils import ap_description, mock_action_run_func
+
+
+class LimitedClientFactory(ClientFactory):
+    CONCURRENCY_LIMIT_SETTINGS = ConcurrencyLimitSettings()
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_app(apt_blueprint_noauth, hooks, policy=AuthCachePolicy()):
+    app = Flask(__name__)
+    assign_json_provider(app)
+    aptb = ActionProviderBlueprint(
+        name="TrackedActionProvider",
+        import_name=__name__,
+        url_prefix="/tracked",
+        provider_description=ap_description,
+        request_lifecycle_hooks=hooks,
+    )
+    aptb.action_run(mock_action_run_func)
+    apt_blueprint_noauth(aptb)
+    aptb.state_builder.caches = AuthStateCaches.from_policy(policy, None)
+    aptb.state_builder.client_factory = ClientFactory()
+    app.register_blueprint(aptb)
+    return app, aptb.state_builder.caches
+
+
+def test_cache_metrics_are_reported_once_per_interval(apt_blueprint_noauth):
+    reports = []
+    timer = FakeTimer()
+    app, caches = create_app(
+        apt_blueprint_noauth,
+        [CacheMetricsReporter(reports.append, interval=60, timer=timer)],
+    )
+    client = app.test_client()
+
+    caches.introspect.get("token-hash")
+    client.get("/tracked/")
+    timer.now = 30
+    client.get("/tracked/")
+    assert reports == []
+
+    timer.now = 60
+    client.get("/tracked/")
+    timer.now = 90
+    caches.introspect["token-hash"] = IntrospectRecord(active=True)
+    caches.introspect.get("token-hash")
+    client.get("/tracked/")
+    timer.now = 120
+    client.get("/tracked/")
+
+    assert len(reports) == 2
+    assert set(reports[0]) == {
+        "introspect",
+        "dependent_tokens",
+        "group_membership",
+        "rejected_tokens",
+    }
+    # each report holds the counters accumulated since the previous report
+    assert (reports[0]["introspect"].hits, reports[0]["introspect"].misses) == (0, 1)
+    assert (reports[1]["introspect"].hits, reports[1]["introspect"].misses) == (1, 0)
+    assert reports[1]["introspect"].size == 1
+
+
+def test_cache_metrics_are_emitted_as_emf(apt_blueprint_noauth, capsys):
+    timer = FakeTimer()
+    emf_logger = CloudWatchMetricEMFLogger(
+        namespace="ActionProviders", action_provider_name="TrackedActionProvider"
+    )
+    app, caches = create_app(
+        apt_blueprint_noauth,
+        [CacheMetricsReporter(emf_logger.emit_cache_metrics, timer=timer)],
+    )
+    caches.group_membership.get("identity-id")
+    app.test_client().get("/tracked/")
+    timer.now = 60
+    app.test_client().get("/tracked/")
+
+    out, _ = capsys.readouterr()
+    emf_logs = {
+        emf_log["Cache"]: emf_log for emf_log in map(json.loads, out.splitlines())
+    }
+    assert len(emf_logs) == 4
+    emf_log = emf_logs["group_membership"]
+    assert emf_log["ActionProvider"] == "TrackedActionProvider"
+    assert emf_log["CacheMisses"] == 1
+    assert emf_log["CacheHits"] == 0
+    assert emf_log["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [
+        ["ActionProvider", "Cache"]
+    ]
+
+
+def test_circuit_breaker_metrics_are_emitted_as_emf(apt_blueprint_noauth, capsys):
+    timer = FakeTimer()
+    emf_logger = CloudWatchMetricEMFLogger(
+        namespace="ActionProviders", action_provider_name="TrackedActionProvider"
+    )
+    reporter = CacheMetricsReporter(
+        lambda stats: None,
+        timer=timer,
+        circuit_breaker_sink=emf_logger.emit_circuit_breaker_metrics,
+    )
+    app, caches = create_app(
+        apt_blueprint_noauth,
+        [reporter],
+        AuthCachePolicy(circuit_breaker=CircuitBreakerSettings()),
+    )
+    caches.circuit_breakers["groups"].call(lambda: None)
+    app.test_client().get("/tracked/")
+    timer.now = 60
+    app.test_client().get("/tracked/")
+
+    out, _ = capsys.readouterr()
+    emf_logs = {
+        emf_log["Endpoint"]: emf_log for emf_log in map(json.loads, out.splitlines())
+    }
+    assert set(emf_logs) == {"introspect", "dependent_tokens", "groups"}
+    assert emf_logs["groups"]["CircuitCalls"] == 1
+    assert emf_logs["groups"]["CircuitOpen"] == 0
+    assert emf_logs["introspect"]["CircuitCalls"] == 0
+
+
+def test_concurrency_metrics_are_reported(apt_blueprint_noauth):
+    reports = []
+    timer = FakeTimer()
+    reporter = CacheMetricsReporter(
+        lambda stats: None, timer=timer, concurrency_sink=reports.append
+    )
+    app, _ = create_app(apt_blueprint_noauth, [reporter])
+    client_factory = LimitedClientFactory()
+    app.blueprints["TrackedActionProvider"].state_builder.client_factory = (
+        client_factory
+    )
+    limiter = client_factory.concurrency_limiters["auth"]
+    limiter.release(limiter.acquire())
+    limiter.acquire()
+    app.test_client().get("/tracked/")
+    timer.now = 60
+    app.test_client().get("/tracked/")
+
+    assert len(reports) == 1
+    assert set(reports[0]) == {"auth", "groups"}
+    assert (reports[0]["auth"].calls, reports[0]["auth"].in_flight) == (2, 1)
+    assert reports[0]["auth"].limit == limiter.limit
+
+
+def test_failing_sink_does_not_fail_requests(apt_blueprint_noauth, caplog):
+    def failing_sink(stats):
+        raise RuntimeError("sink is down")
+
+    app, _ = create_app(
+        apt_blueprint_noauth, [CacheMetricsReporter(failing_sink, interval=0)]
+    )
+    response = app.test_client().get("/tracked/")
+    assert response.status_code == 200
+    assert "Failed to report cache metrics" in caplog.text
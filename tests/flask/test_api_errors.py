@@ -5,6 +5,7 @@ import pytest
 from pydantic import BaseModel
 
 from globus_action_provider_tools.authentication import InactiveTokenError
+from globus_action_provider_tools.errors import CircuitOpenError, ConcurrencyLimitError
 from globus_action_provider_tools.flask import (
     ActionProviderBlueprint,
     ActionProviderConfig,
@@ -116,10 +117,10 @@ def test_invalid_token_results_in_401_unauthorized(create_app_from_blueprint):
     # (`create_app_from_blueprint` mocks over this)
     #
     # instead, inject an error when an AuthState is being constructed
-    # narrowly, this just needs to be during the init-time call to introspect_token
+    # narrowly, this just needs to be during the init-time introspection
     blueprint.state_builder = FlaskAuthStateBuilder(mock.Mock(), ("foo-scope",))
     with mock.patch(
-        "globus_action_provider_tools.authentication.AuthState.introspect_token",
+        "globus_action_provider_tools.authentication.AuthState._validated_introspect_record",
         side_effect=InactiveTokenError("token wuz bad"),
     ):
         resp = client.run(
@@ -132,3 +133,105 @@ def test_invalid_token_results_in_401_unauthorized(create_app_from_blueprint):
         "The server could not verify that you are authorized "
         "to access the URL requested."
     )
+
+
+def test_lazy_introspection_rejects_invalid_json_without_introspecting(
+    create_app_from_blueprint,
+):
+    blueprint = ActionProviderBlueprint(
+        name="TestBlueprint",
+        import_name=__name__,
+        url_prefix="/my_cool_ap",
+        provider_description=ap_description,
+        config=ActionProviderConfig(lazy_token_introspection=True),
+    )
+    app = create_app_from_blueprint(blueprint)
+    client = ActionProviderClient(app.test_client(), blueprint.url_prefix)
+
+    auth_client = mock.Mock()
+    blueprint.state_builder = FlaskAuthStateBuilder(auth_client, ("foo-scope",))
+    resp = client.post("/run", assert_status=400, data="{not json")
+
+    assert resp.json["description"] == "Invalid JSON"
+    auth_client.oauth2_token_introspect.assert_not_called()
+
+
+def test_lazy_introspection_of_an_invalid_token_results_in_401_unauthorized(
+    create_app_from_blueprint,
+):
+    blueprint = ActionProviderBlueprint(
+        name="TestBlueprint",
+        import_name=__name__,
+        url_prefix="/my_cool_ap",
+        provider_description=ap_description,
+        config=ActionProviderConfig(lazy_token_introspection=True),
+    )
+    app = create_app_from_blueprint(blueprint)
+    client = ActionProviderClient(app.test_client(), blueprint.url_prefix)
+
+    auth_client = mock.Mock()
+    auth_client.oauth2_token_introspect.return_value = {"active": False}
+    blueprint.state_builder = FlaskAuthStateBuilder(auth_client, ("foo-scope",))
+    resp = client.run(body={"echo_string": "hello lazily"}, assert_status=401)
+
+    assert resp.json["code"] == "UnauthorizedRequest"
+    auth_client.oauth2_token_introspect.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "error, retry_after",
+    (
+        (CircuitOpenError("introspect", 12.5), "13"),
+        (ConcurrencyLimitError("auth", 20, 5), None),
+    ),
+)
+def test_unavailable_auth_results_in_503_service_unavailable(
+    create_app_from_blueprint, error, retry_after
+):
+    blueprint = ActionProviderBlueprint(
+        name="TestBlueprint",
+        import_name=__name__,
+        url_prefix="/my_cool_ap",
+        provider_description=ap_description,
+        config=ActionProviderConfig(lazy_token_introspection=True),
+    )
+    app = create_app_from_blueprint(blueprint)
+    client = ActionProviderClient(app.test_client(), blueprint.url_prefix)
+
+    auth_client = mock.Mock()
+    auth_client.oauth2_token_introspect.side_effect = error
+    blueprint.state_builder = FlaskAuthStateBuilder(auth_client, ("foo-scope",))
+    resp = client.run(body={"echo_string": "hello lazily"}, assert_status=503)
+
+    assert resp.json["code"] == "ActionProviderUnavailable"
+    assert resp.headers.get("Retry-After") == retry_after
+
+
+def test_passed_request_deadline_results_in_504_gateway_timeout(
+    create_app_from_blueprint,
+):
+    blueprint = ActionProviderBlueprint(
+        name="TestBlueprint",
+        import_name=__name__,
+        url_prefix="/my_cool_ap",
+        provider_description=ap_description,
+        config=ActionProviderConfig(
+            request_deadline=30, request_deadline_header="X-Request-Timeout"
+        ),
+    )
+    app = create_app_from_blueprint(blueprint)
+    client = ActionProviderClient(app.test_client(), blueprint.url_prefix)
+
+    auth_client = mock.Mock()
+    blueprint.state_builder = FlaskAuthStateBuilder(auth_client, ("foo-scope",))
+    resp = client.run(
+        body={"echo_string": "hello"},
+        headers=[
+            ("Authorization", "Bearer fake-access-token"),
+            ("X-Request-Timeout", "0"),
+        ],
+        assert_status=504,
+    )
+
+    assert resp.json["code"] == "ActionProviderTimeout"
+    auth_client.oauth2_token_introspect.assert_not_called()
@@ -6,6 +6,7 @@ from globus_action_provider_tools.flask.exceptions import (
     ActionConflict,
     ActionNotFound,
     ActionProviderError,
+    ActionProviderUnavailable,
     BadActionRequest,
     RequestValidationError,
     UnauthorizedRequest,
@@ -18,6 +19,7 @@ from globus_action_provider_tools.flask.exceptions import (
         ActionConflict,
         ActionNotFound,
         ActionProviderError,
+        ActionProviderUnavailable,
         BadActionRequest,
         RequestValidationError,
         UnauthorizedRequest,
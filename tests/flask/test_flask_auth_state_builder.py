@@ -1,16 +1,20 @@
 from unittest import mock
 
+import flask
 import pytest
 
 from globus_action_provider_tools.authentication import (
     InactiveTokenError,
     InvalidTokenScopesError,
+    TokenPreValidator,
 )
 from globus_action_provider_tools.errors import (
     AuthenticationError,
     UnverifiedAuthenticationError,
 )
+from globus_action_provider_tools.flask import ActionProviderBlueprint
 from globus_action_provider_tools.flask.helpers import FlaskAuthStateBuilder
+from tests.flask.app_utils import ap_description
 
 
 @pytest.mark.parametrize(
@@ -20,6 +24,10 @@ from globus_action_provider_tools.flask.helpers import FlaskAuthStateBuilder
         pytest.param("", id="blank header value"),
         pytest.param("  ", id="whitespace header value"),
         pytest.param("A" * 100, id="no 'Bearer ' prefix"),
+        pytest.param("Bearer ", id="empty token"),
+        pytest.param("Bearer abc", id="short token"),
+        pytest.param("Bearer " + "A" * 5000, id="oversized header"),
+        pytest.param("Bearer AbcDef<script>Ghi", id="invalid characters"),
     ),
 )
 def test_bogus_authorization_headers_are_rejected_without_io(authorization_header):
@@ -68,3 +76,72 @@ def test_invalid_token_data_results_in_authn_errors(underlying_error, expect_mes
     ):
         with pytest.raises(AuthenticationError, match=expect_message):
             builder.build_from_request(request=mock_request_object)
+
+
+def test_known_bad_tokens_are_rejected_without_io():
+    auth_client = mock.Mock()
+    auth_client.oauth2_token_introspect.return_value = {"active": False}
+    builder = FlaskAuthStateBuilder(auth_client, [])
+
+    mock_request_object = mock.Mock()
+    mock_request_object.headers = {"Authorization": "Bearer AbcDefGhiJklmnop"}
+
+    for _ in range(3):
+        with pytest.raises(AuthenticationError, match="Token is invalid"):
+            builder.build_from_request(request=mock_request_object)
+
+    assert auth_client.oauth2_token_introspect.call_count == 1
+    assert builder.caches.rejected_tokens.hits == 2
+
+
+def test_pre_validation_rejections_are_counted():
+    builder = FlaskAuthStateBuilder(mock.Mock(), [])
+
+    for header in ({}, {"Authorization": "Basic Zm9vOmJhcg=="}, {}):
+        mock_request_object = mock.Mock()
+        mock_request_object.headers = header
+        with pytest.raises(UnverifiedAuthenticationError):
+            builder.build_from_request(request=mock_request_object)
+
+    assert builder.token_validator.rejections == {
+        "missing_header": 2,
+        "not_bearer": 1,
+    }
+    assert builder.token_validator.rejected_total == 3
+
+
+def test_token_validator_is_configurable():
+    validator = TokenPreValidator(min_token_length=3, token_pattern="[a-z]+")
+    builder = FlaskAuthStateBuilder(mock.Mock(), [], token_validator=validator)
+
+    mock_request_object = mock.Mock()
+    mock_request_object.headers = {"Authorization": "Bearer ABCDEFGHIJKLMNOP"}
+    with pytest.raises(UnverifiedAuthenticationError, match="invalid characters"):
+        builder.build_from_request(request=mock_request_object)
+
+    assert validator.validate_token("abc") == "abc"
+
+
+@pytest.mark.parametrize(
+    "runnable_by, expect_prefetch",
+    (
+        (["all_authenticated_users"], False),
+        (["urn:globus:groups:id:606dbaa9-3d57-44b8-a33e-422a9de0c712"], True),
+    ),
+)
+def test_blueprints_prefetch_groups_when_authorization_uses_groups(
+    runnable_by, expect_prefetch
+):
+    description = ap_description.copy()
+    description.runnable_by = runnable_by
+    blueprint = ActionProviderBlueprint(
+        name="TestBlueprint",
+        import_name=__name__,
+        url_prefix="/my_cool_ap",
+        provider_description=description,
+    )
+    app = flask.Flask(__name__)
+    app.config.update(CLIENT_ID="bogus", CLIENT_SECRET="bogus")
+    app.register_blueprint(blueprint)
+
+    assert (blueprint.state_builder.prefetcher is not None) is expect_prefetch
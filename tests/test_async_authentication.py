@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import json
+import threading
+import time
+import typing as t
+import urllib.parse
+
+import globus_sdk
+import pytest
+
+pytest.importorskip("httpx")
+
+import httpx  # noqa: E402
+
+from globus_action_provider_tools.async_authentication import (  # noqa: E402
+    AsyncAuthStateBuilder,
+    AsyncSingleFlight,
+)
+from globus_action_provider_tools.authentication import (  # noqa: E402
+    InactiveTokenError,
+    InvalidTokenScopesError,
+    group_principal,
+    identity_principal,
+)
+from globus_action_provider_tools.cache_backends import SQLiteCacheBackend  # noqa: E402
+from globus_action_provider_tools.cache_policy import (  # noqa: E402
+    AuthCachePolicy,
+    CacheSettings,
+    CircuitBreakerSettings,
+    ConcurrencyLimitSettings,
+)
+from globus_action_provider_tools.client_factory import ClientFactory  # noqa: E402
+from globus_action_provider_tools.deadline import deadline  # noqa: E402
+from globus_action_provider_tools.errors import (  # noqa: E402
+    CircuitOpenError,
+    DeadlineExceededError,
+)
+
+IDENTITY_ID = "f7e81526-1610-47e2-a7c5-b071db77ca47"
+GROUP_ID = "606dbaa9-3d57-44b8-a33e-422a9de0c712"
+GROUPS_SCOPE = globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+
+
+class StandInGlobusServices:
+    """A local stand-in for the Globus Auth and Groups APIs."""
+
+    def __init__(
+        self,
+        *,
+        active: bool = True,
+        introspect_status: int = 200,
+        groups_status: int = 200,
+    ) -> None:
+        self.active = active
+        self.introspect_status = introspect_status
+        self.groups_status = groups_status
+        self.calls: collections.Counter[str] = collections.Counter()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        # yield to the event loop, as a real network call would
+        await asyncio.sleep(0.01)
+        path = request.url.path
+        self.calls[path] += 1
+        if path == "/v2/oauth2/token/introspect":
+            assert request.headers["Authorization"].startswith("Basic ")
+            form = urllib.parse.parse_qs(request.content.decode())
+            assert form["include"] == ["identity_set"]
+            if self.introspect_status != 200:
+                return httpx.Response(
+                    self.introspect_status, json={"error": "invalid_client"}
+                )
+            if not self.active:
+                return httpx.Response(200, json={"active": False})
+            return httpx.Response(
+                200,
+                json={
+                    "active": True,
+                    "scope": "expected-scope bonus-scope",
+                    "sub": IDENTITY_ID,
+                    "identity_set": [IDENTITY_ID],
+                    "exp": int(time.time()) + 3600,
+                },
+            )
+        if path == "/v2/oauth2/token":
+            form = urllib.parse.parse_qs(request.content.decode())
+            assert form["grant_type"] == ["urn:globus:auth:grant_type:dependent_token"]
+            return httpx.Response(
+                200,
+                json=[
+                    {
+                        "access_token": "groups-access-token",
+                        "resource_server": "groups.api.globus.org",
+                        "scope": GROUPS_SCOPE,
+                        "expires_in": 3600,
+                        "token_type": "bearer",
+                    }
+                ],
+            )
+        if path == "/v2/groups/my_groups":
+            assert request.headers["Authorization"] == "Bearer groups-access-token"
+            if self.groups_status != 200:
+                return httpx.Response(self.groups_status, json={"code": "unavailable"})
+            return httpx.Response(200, content=json.dumps([{"id": GROUP_ID}]))
+        return httpx.Response(404)
+
+
+def make_builder(
+    services: StandInGlobusServices, **kwargs: t.Any
+) -> AsyncAuthStateBuilder:
+    return AsyncAuthStateBuilder(
+        globus_sdk.ConfidentialAppAuthClient("client-id", "client-secret"),
+        ["expected-scope"],
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(services)),
+        **kwargs,
+    )
+
+
+def test_async_auth_state_identities_and_groups():
+    services = StandInGlobusServices()
+    builder = make_builder(services)
+
+    async def main():
+        auth_state = await builder.build("access-token")
+        assert auth_state.effective_identity == identity_principal(IDENTITY_ID)
+        assert await auth_state.get_groups() == {group_principal(GROUP_ID)}
+        assert await auth_state.check_authorization([group_principal(GROUP_ID)])
+        assert not await auth_state.check_authorization(["urn:globus:groups:id:x"])
+
+        # a second request is served entirely from the cache
+        second = await builder.build("access-token")
+        assert await second.get_principals() == {
+            identity_principal(IDENTITY_ID),
+            group_principal(GROUP_ID),
+        }
+        await builder.aclose()
+
+    asyncio.run(main())
+    assert services.calls == {
+        "/v2/oauth2/token/introspect": 1,
+        "/v2/oauth2/token": 1,
+        "/v2/groups/my_groups": 1,
+    }
+
+
+def test_concurrent_async_requests_share_calls():
+    services = StandInGlobusServices()
+    builder = make_builder(services)
+
+    async def request():
+        auth_state = await builder.build("access-token")
+        return await auth_state.get_groups()
+
+    async def main():
+        return await asyncio.gather(*(request() for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert all(result == {group_principal(GROUP_ID)} for result in results)
+    assert set(services.calls.values()) == {1}
+
+
+def test_async_auth_state_rejects_invalid_tokens():
+    services = StandInGlobusServices(active=False)
+    builder = make_builder(services)
+
+    with pytest.raises(InactiveTokenError):
+        asyncio.run(builder.build("access-token"))
+    with pytest.raises(InactiveTokenError):
+        asyncio.run(builder.build("access-token"))
+    assert services.calls["/v2/oauth2/token/introspect"] == 1
+
+
+def test_async_auth_state_rejects_missing_scopes():
+    builder = make_builder(StandInGlobusServices())
+    with pytest.raises(InvalidTokenScopesError):
+        asyncio.run(builder.build("access-token", expected_scopes=["other-scope"]))
+
+
+def test_async_auth_state_raises_sdk_errors():
+    builder = make_builder(StandInGlobusServices(introspect_status=401))
+    with pytest.raises(globus_sdk.AuthAPIError) as excinfo:
+        asyncio.run(builder.build("access-token"))
+    assert excinfo.value.http_status == 401
+
+
+def test_open_circuit_fails_async_calls_fast():
+    services = StandInGlobusServices(introspect_status=500)
+    builder = make_builder(
+        services,
+        cache_policy=AuthCachePolicy(
+            circuit_breaker=CircuitBreakerSettings(minimum_calls=1, failure_rate=0.5)
+        ),
+    )
+
+    with pytest.raises(globus_sdk.AuthAPIError):
+        asyncio.run(builder.build("access-token"))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(builder.build("access-token"))
+    assert services.calls["/v2/oauth2/token/introspect"] == 1
+
+
+def test_async_stale_values_are_used_while_services_are_failing():
+    services = StandInGlobusServices()
+    builder = make_builder(
+        services,
+        cache_policy=AuthCachePolicy(
+            introspect=CacheSettings(maxsize=10, ttl=30, stale_if_error=300),
+            group_membership=CacheSettings(maxsize=10, ttl=30, stale_if_error=300),
+            circuit_breaker=CircuitBreakerSettings(minimum_calls=1, failure_rate=0.5),
+        ),
+    )
+
+    async def principals():
+        auth_state = await builder.build("access-token")
+        return await auth_state.get_principals()
+
+    expected = asyncio.run(principals())
+    assert group_principal(GROUP_ID) in expected
+    for cache in (builder.caches.introspect, builder.caches.group_membership):
+        cache.timer = lambda: time.monotonic() + 60
+    services.introspect_status = 500
+    services.groups_status = 503
+
+    # the first outage opens each breaker, and the second is not sent
+    assert asyncio.run(principals()) == expected
+    assert asyncio.run(principals()) == expected
+    breakers = builder.caches.circuit_breakers
+    assert (breakers["introspect"].state, breakers["groups"].state) == ("open", "open")
+    assert services.calls["/v2/oauth2/token/introspect"] == 2
+    assert services.calls["/v2/groups/my_groups"] == 2
+    assert builder.caches.introspect.stats().stale_hits == 2
+    assert builder.caches.group_membership.stats().stale_hits == 2
+
+
+def test_async_calls_are_not_made_after_the_deadline():
+    services = StandInGlobusServices()
+    builder = make_builder(services)
+
+    with deadline(0):
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(builder.build("access-token"))
+    assert not services.calls
+
+
+def test_async_followers_wait_until_their_own_deadline():
+    single_flight = AsyncSingleFlight()
+
+    async def slow_call():
+        await asyncio.sleep(0.5)
+        return "result"
+
+    async def main():
+        # the leader has no deadline
+        leader = asyncio.ensure_future(single_flight.do("key", slow_call))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        with deadline(0.1):
+            with pytest.raises(DeadlineExceededError):
+                await single_flight.do("key", slow_call)
+        assert time.monotonic() - started < 0.4
+        return await leader
+
+    assert asyncio.run(main()) == "result"
+
+
+def test_async_calls_wait_for_a_turn_without_blocking_the_loop():
+    class LimitedClientFactory(ClientFactory):
+        CONCURRENCY_LIMIT_SETTINGS = ConcurrencyLimitSettings(
+            initial_limit=1, min_limit=1, max_limit=1
+        )
+
+    services = StandInGlobusServices()
+    client_factory = LimitedClientFactory()
+    builder = make_builder(services, client_factory=client_factory)
+
+    async def main():
+        # each token is introspected while the others wait for a turn
+        return await asyncio.gather(
+            *(builder.build(f"access-token-{i}") for i in range(5))
+        )
+
+    asyncio.run(main())
+    stats = client_factory.concurrency_stats()["auth"]
+    assert (stats.calls, stats.in_flight, stats.rejected) == (5, 0, 0)
+
+
+def test_async_backend_io_runs_off_the_event_loop(tmp_path):
+    class RecordingBackend(SQLiteCacheBackend):
+        threads: set[int] = set()
+
+        def get(self, key):
+            self.threads.add(threading.get_ident())
+            return super().get(key)
+
+        def set(self, key, value, ttl):
+            self.threads.add(threading.get_ident())
+            super().set(key, value, ttl)
+
+    builder = make_builder(
+        StandInGlobusServices(), cache_backend=RecordingBackend(tmp_path / "cache.db")
+    )
+
+    async def main():
+        auth_state = await builder.build("access-token")
+        await auth_state.get_groups()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert RecordingBackend.threads
+    assert loop_thread not in RecordingBackend.threads
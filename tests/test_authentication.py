@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import concurrent.futures
+import json
+import pickle
 import time
+import uuid
 from unittest import mock
 
 import globus_sdk
@@ -8,10 +12,33 @@ import pytest
 from globus_sdk._testing import RegisteredResponse, get_response_set
 
 from globus_action_provider_tools.authentication import (
+    AuthState,
+    AuthStateBuilder,
+    GroupMembership,
+    InactiveTokenError,
     InvalidTokenScopesError,
+    _RecordSerializer,
+    group_principal,
     identity_principal,
 )
+from globus_action_provider_tools.cache_backends import (
+    EncryptedCacheBackend,
+    SQLiteCacheBackend,
+)
+from globus_action_provider_tools.cache_policy import (
+    AuthCachePolicy,
+    CacheSettings,
+    CircuitBreakerSettings,
+)
+from globus_action_provider_tools.cache_records import (
+    DependentTokensRecord,
+    IntrospectRecord,
+)
 from globus_action_provider_tools.client_factory import ClientFactory
+from globus_action_provider_tools.deadline import deadline
+from globus_action_provider_tools.errors import CircuitOpenError, DeadlineExceededError
+
+from .conftest import NoRetryClientFactory
 
 
 class FastRetryClientFactory(ClientFactory):
@@ -46,6 +73,9 @@ def test_caching_identities(auth_state, introspect_success_response, mocked_resp
         )
 
     assert len(mocked_responses.calls) == 1
+    assert isinstance(
+        auth_state.introspect_cache[auth_state._token_hash], IntrospectRecord
+    )
 
 
 def test_caching_groups(auth_state, mocked_responses, groups_success_response):
@@ -83,6 +113,32 @@ def test_auth_state_caching_across_instances(
     assert len(mocked_responses.calls) == 1
 
 
+def test_public_methods_return_sdk_responses(auth_state, mocked_responses):
+    introspect_response = auth_state.introspect_token()
+    assert isinstance(introspect_response, globus_sdk.GlobusHTTPResponse)
+    assert introspect_response["username"] == "willy@wonka.com@accounts.google.com"
+    assert isinstance(
+        auth_state.introspect_cache[auth_state._token_hash], IntrospectRecord
+    )
+
+    with pytest.warns(DeprecationWarning):
+        granted = auth_state.get_dependent_tokens()
+    with pytest.warns(DeprecationWarning):
+        cached = auth_state.get_dependent_tokens()
+
+    # the cached response has the same type and tokens, refresh tokens included
+    assert len(mocked_responses.calls) == 2
+    assert isinstance(cached, globus_sdk.OAuthDependentTokenResponse)
+    assert cached.by_resource_server.keys() == granted.by_resource_server.keys()
+    for resource_server, token in granted.by_resource_server.items():
+        cached_token = cached.by_resource_server[resource_server]
+        assert cached_token["access_token"] == token["access_token"]
+        assert cached_token["refresh_token"] == token["refresh_token"]
+        assert (
+            abs(cached_token["expires_at_seconds"] - token["expires_at_seconds"]) <= 1
+        )
+
+
 def test_invalid_grant_exception(auth_state, introspect_success_response):
     get_response_set("token").lookup("invalid-grant").replace()
     with pytest.raises(globus_sdk.GlobusAPIError):
@@ -150,17 +206,18 @@ def test_dependent_token_callout_success_fixes_bad_cache(auth_state):
     Populate the cache "incorrectly" and then "fix it" by asking for an authorizer
     and expecting the dependent token logic to appropriately redrive.
     """
-    # the mock by_scopes value is a dict -- similar enough since it just needs to be
-    # a mapping type -- which we populate for "foo"
-    mock_response = mock.Mock()
-    mock_response.by_scopes = {
-        "foo_scope": {
-            "expires_at_seconds": time.time() + 100,
-            "access_token": "foo_AT",
-        }
-    }
+    # populate the cache with a token for "foo" only
     auth_state.dependent_tokens_cache[auth_state._dependent_token_cache_key] = (
-        mock_response
+        DependentTokensRecord.from_data(
+            [
+                {
+                    "resource_server": "foo",
+                    "scope": "foo_scope",
+                    "access_token": "foo_AT",
+                    "expires_at_seconds": int(time.time()) + 100,
+                }
+            ]
+        )
     )
 
     # register a response for a different resource server -- 'bar'
@@ -172,7 +229,7 @@ def test_dependent_token_callout_success_fixes_bad_cache(auth_state):
             {
                 "resource_server": "bar",
                 "scope": "bar_scope",
-                "expires_at_seconds": time.time() + 100,
+                "expires_in": 100,
                 "access_token": "bar_AT",
             }
         ],
@@ -185,7 +242,7 @@ def test_dependent_token_callout_success_fixes_bad_cache(auth_state):
     cache_value = auth_state.dependent_tokens_cache[
         auth_state._dependent_token_cache_key
     ]
-    assert isinstance(cache_value, globus_sdk.OAuthDependentTokenResponse)
+    assert isinstance(cache_value, DependentTokensRecord)
     assert "foo_scope" not in cache_value.by_scopes
     assert "bar_scope" in cache_value.by_scopes
 
@@ -221,7 +278,9 @@ def test_no_groups_client_is_constructed_when_cache_is_warm(auth_state):
     auth_state._get_groups_client = mock.Mock()
 
     # write a value directly into the cache
-    auth_state.group_membership_cache[auth_state._token_hash] = frozenset()
+    auth_state.group_membership_cache[auth_state._group_membership_cache_key] = (
+        GroupMembership(auth_state._identity_set_digest, [])
+    )
 
     # now, fetch the groups property -- it should populate properly with an empty set
     # even though there would be an error if we called out to groups
@@ -230,3 +289,650 @@ def test_no_groups_client_is_constructed_when_cache_is_warm(auth_state):
     # finally, confirm via our mock that there was no attempt to instantiate a
     # groups client
     auth_state._get_groups_client.assert_not_called()
+
+
+def test_builders_share_cached_results_through_backend(
+    tmp_path,
+    mocked_responses,
+    introspect_success_response,
+    dependent_token_success_response,
+    groups_success_response,
+):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    client_factory = NoRetryClientFactory()
+
+    # two builders with separate in-process caches simulate two worker processes
+    builders = [
+        AuthStateBuilder(
+            client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+            ["expected-scope"],
+            client_factory=client_factory,
+            cache_backend=backend,
+        )
+        for _ in range(2)
+    ]
+
+    first = builders[0].build("bogus")
+    assert len(first.groups) == len(groups_success_response.metadata["group-ids"])
+    # introspect, dependent token grant, and groups
+    assert len(mocked_responses.calls) == 3
+
+    second = builders[1].build("bogus")
+    assert second.identities == first.identities
+    assert second.groups == first.groups
+    authorizer = second.get_authorizer_for_scope(
+        globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+    )
+    assert isinstance(authorizer, globus_sdk.AccessTokenAuthorizer)
+    assert len(mocked_responses.calls) == 3
+
+
+def test_dependent_tokens_survive_a_restart_in_a_durable_store(
+    tmp_path,
+    mocked_responses,
+    introspect_success_response,
+    dependent_token_success_response,
+):
+    key = EncryptedCacheBackend.generate_key()
+    client_factory = NoRetryClientFactory()
+    scope = globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+
+    def start_worker():
+        store = EncryptedCacheBackend(
+            SQLiteCacheBackend(tmp_path / "tokens.sqlite"), key
+        )
+        return AuthStateBuilder(
+            client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+            ["expected-scope"],
+            client_factory=client_factory,
+            cache_backends={"dependent_tokens": store},
+        )
+
+    start_worker().build("bogus").get_authorizer_for_scope(scope)
+    # introspect and dependent token grant
+    assert len(mocked_responses.calls) == 2
+
+    # a restarted worker introspects the token again, but loads its dependent
+    # tokens from the store
+    restarted = start_worker()
+    assert restarted.caches.introspect.backend is None
+    restarted.build("bogus").get_authorizer_for_scope(scope)
+    assert len(mocked_responses.calls) == 3
+    assert mocked_responses.calls[2].request.url.endswith("/introspect")
+
+
+def test_builder_caches_report_stats(
+    mocked_responses,
+    introspect_success_response,
+    dependent_token_success_response,
+    groups_success_response,
+):
+    client_factory = NoRetryClientFactory()
+    builder = AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+        client_factory=client_factory,
+    )
+    for _ in range(3):
+        builder.build("bogus").groups
+
+    stats = builder.caches.stats()
+    # AuthStates are not reused by default
+    assert "auth_states" not in stats
+    assert (stats["introspect"].hits, stats["introspect"].loads) == (2, 1)
+    assert stats["dependent_tokens"].loads == 1
+    assert (stats["group_membership"].hits, stats["group_membership"].loads) == (2, 1)
+    assert stats["rejected_tokens"].misses == 3
+
+
+def test_cache_backends_must_name_known_caches():
+    with pytest.raises(ValueError, match="dependent_token"):
+        AuthStateBuilder(
+            mock.Mock(),
+            [],
+            cache_backends={"dependent_token": mock.Mock()},
+        )
+
+
+def test_cache_backend_values_are_stored_as_json(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    group_id = "606dbaa9-3d57-44b8-a33e-422a9de0c712"
+    writer = AuthStateBuilder(mock.Mock(), [], cache_backend=backend).caches
+    writer.group_membership["identity"] = GroupMembership("digest", [group_id])
+    writer.rejected_tokens.record(
+        "token-hash", InvalidTokenScopesError(frozenset({"a"}), frozenset({"b"}))
+    )
+
+    # values follow an 8-byte expiration time, and are not pickled
+    for key in ("group_membership:identity", "rejected_tokens:token-hash"):
+        json.loads(backend.get(key)[8:])
+
+    reader = AuthStateBuilder(mock.Mock(), [], cache_backend=backend).caches
+    membership = reader.group_membership["identity"]
+    assert (membership.identity_set_digest, membership.group_ids) == (
+        "digest",
+        [group_id],
+    )
+    with pytest.raises(InvalidTokenScopesError):
+        reader.rejected_tokens.check("token-hash", frozenset({"a"}))
+
+
+def test_dependent_tokens_loaded_from_backend_keep_their_expiration(auth_state):
+    auth_state.get_authorizer_for_scope(
+        globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+    )
+    response = auth_state.dependent_tokens_cache[auth_state._dependent_token_cache_key]
+    serializer = _RecordSerializer(DependentTokensRecord)
+
+    data = serializer.dumps(response)
+    with mock.patch("time.time", return_value=time.time() + 600):
+        loaded = serializer.loads(data)
+
+    scope = globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+    original_expiration = response.by_scopes[scope]["expires_at_seconds"]
+    assert abs(loaded.by_scopes[scope]["expires_at_seconds"] - original_expiration) <= 1
+
+
+def test_introspect_cache_lifetime_is_capped_by_token_expiration(
+    get_auth_state_instance, introspect_success_response, mocked_responses
+):
+    auth_state = get_auth_state_instance(["expected-scope"])
+    ttl = auth_state._introspect_result_ttl({"exp": time.time() + 100})
+    assert 100 - auth_state.expiry_skew - 1 < ttl <= 100 - auth_state.expiry_skew
+
+    # a token which is about to expire is not cached at all
+    about_to_expire = {**introspect_success_response.json, "exp": int(time.time())}
+    RegisteredResponse(
+        service="auth",
+        path="/v2/oauth2/token/introspect",
+        method="POST",
+        json=about_to_expire,
+    ).replace()
+    AuthState.introspect_cache.clear()
+    get_auth_state_instance(["expected-scope"])
+    get_auth_state_instance(["expected-scope"])
+    assert len(mocked_responses.calls) == 3
+
+
+def test_expiring_dependent_tokens_are_not_cached(auth_state, mocked_responses):
+    RegisteredResponse(
+        service="auth",
+        path="/v2/oauth2/token",
+        method="POST",
+        json=[
+            {
+                "resource_server": "bar",
+                "scope": "bar_scope",
+                "expires_in": auth_state.expiry_skew - 1,
+                "access_token": "bar_AT",
+            }
+        ],
+    ).replace()
+    auth_state.get_authorizer_for_scope("bar_scope")
+    assert (
+        auth_state._dependent_token_cache_key not in auth_state.dependent_tokens_cache
+    )
+
+
+def test_concurrent_requests_share_one_introspect_call(
+    introspect_success_response,
+):
+    auth_client = mock.Mock()
+    calls = []
+
+    def slow_introspect(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.1)
+        return introspect_success_response.json
+
+    auth_client.oauth2_token_introspect.side_effect = slow_introspect
+    builder = AuthStateBuilder(auth_client, ["expected-scope"])
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        auth_states = list(executor.map(builder.build, ["same-token"] * 10))
+
+    assert len(calls) == 1
+    assert all(state.identities == auth_states[0].identities for state in auth_states)
+    assert builder.caches.introspect.stats().loads == 1
+
+
+def test_inactive_tokens_are_rejected_from_the_negative_cache(
+    get_auth_state_instance, mocked_responses
+):
+    RegisteredResponse(
+        service="auth",
+        path="/v2/oauth2/token/introspect",
+        method="POST",
+        json={"active": False},
+    ).add()
+
+    for _ in range(3):
+        with pytest.raises(InactiveTokenError):
+            get_auth_state_instance(["expected-scope"])
+
+    assert len(mocked_responses.calls) == 1
+    assert AuthState.rejected_tokens_cache.hits == 2
+
+
+def test_scope_rejections_only_apply_to_missing_scopes(
+    get_auth_state_instance, introspect_success_response, mocked_responses
+):
+    with pytest.raises(InvalidTokenScopesError):
+        get_auth_state_instance(["bad-scope"])
+    with pytest.raises(InvalidTokenScopesError) as excinfo:
+        get_auth_state_instance(["bad-scope"])
+    assert excinfo.value.actual_scopes == {"expected-scope", "bonus-scope"}
+    assert AuthState.rejected_tokens_cache.hits == 1
+
+    # the same token is acceptable where its scopes are sufficient
+    get_auth_state_instance(["bonus-scope"])
+    assert AuthState.rejected_tokens_cache.hits == 1
+    assert len(mocked_responses.calls) == 1
+
+
+def test_lazy_auth_states_introspect_on_first_use(
+    introspect_success_response, mocked_responses
+):
+    client_factory = NoRetryClientFactory()
+    builder = AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+        client_factory=client_factory,
+    )
+
+    auth_state = builder.build("bogus", lazy=True)
+    assert not auth_state.is_introspected
+    assert len(mocked_responses.calls) == 0
+
+    assert auth_state.effective_identity == identity_principal(
+        introspect_success_response.metadata["effective-id"]
+    )
+    assert auth_state.is_introspected
+    assert len(mocked_responses.calls) == 1
+
+
+@pytest.mark.parametrize(
+    "expected_scopes, introspect_response, error_class",
+    (
+        (["expected-scope"], {"active": False}, InactiveTokenError),
+        (
+            ["bad-scope"],
+            {"active": True, "scope": "expected-scope"},
+            InvalidTokenScopesError,
+        ),
+    ),
+)
+def test_lazy_auth_states_raise_errors_on_first_use(
+    expected_scopes, introspect_response, error_class, mocked_responses
+):
+    RegisteredResponse(
+        service="auth",
+        path="/v2/oauth2/token/introspect",
+        method="POST",
+        json=introspect_response,
+    ).add()
+    client_factory = NoRetryClientFactory()
+    builder = AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        expected_scopes,
+        client_factory=client_factory,
+    )
+
+    auth_state = builder.build("bogus", lazy=True)
+    with pytest.raises(error_class):
+        auth_state.check_authorization(["all_authenticated_users"])
+    with pytest.raises(error_class):
+        auth_state.get_authorizer_for_scope("foo_scope")
+    assert not auth_state.is_introspected
+
+
+def _reusing_builder():
+    client_factory = NoRetryClientFactory()
+    return AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+        client_factory=client_factory,
+        cache_policy=AuthCachePolicy(auth_states=CacheSettings(maxsize=100, ttl=10)),
+    )
+
+
+def test_builders_reuse_auth_states_for_repeat_callers(
+    introspect_success_response,
+    dependent_token_success_response,
+    groups_success_response,
+    mocked_responses,
+):
+    builder = _reusing_builder()
+
+    auth_state = builder.build("bogus")
+    principals = auth_state.principals
+    assert builder.build("bogus") is auth_state
+    assert auth_state.principals is principals
+    assert builder.build("bogus", ["bonus-scope"]) is not auth_state
+    assert builder.build("other-token") is not auth_state
+
+    # the groups of a reused state still follow the group membership cache
+    builder.invalidate_groups(introspect_success_response.metadata["effective-id"])
+    builder.caches.group_membership.set(
+        auth_state._group_membership_cache_key,
+        GroupMembership(auth_state._identity_set_digest, []),
+    )
+    assert auth_state.principals == auth_state.identities
+
+
+def test_auth_state_reuse_is_disabled_by_default(introspect_success_response):
+    builder = AuthStateBuilder(
+        NoRetryClientFactory().make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+    )
+
+    assert builder.caches.auth_states is None
+    assert builder.build("bogus") is not builder.build("bogus")
+
+
+def test_lazy_auth_states_are_not_reused_before_introspection(
+    mocked_responses, introspect_success_response
+):
+    builder = _reusing_builder()
+
+    lazy_state = builder.build("bogus", lazy=True)
+    assert len(builder.caches.auth_states) == 0
+    assert builder.build("bogus", lazy=True) is not lazy_state
+
+    auth_state = builder.build("bogus")
+    assert auth_state.is_introspected
+    assert builder.build("bogus", lazy=True) is auth_state
+
+
+def test_builders_may_prefetch_groups(
+    introspect_success_response,
+    dependent_token_success_response,
+    groups_success_response,
+    mocked_responses,
+):
+    client_factory = NoRetryClientFactory()
+    builder = AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+        client_factory=client_factory,
+        prefetch_groups=True,
+    )
+
+    auth_state = builder.build("bogus")
+    builder.prefetcher.shutdown()
+    # introspect, dependent token grant, and groups
+    assert len(mocked_responses.calls) == 3
+
+    assert len(auth_state.groups) == len(groups_success_response.metadata["group-ids"])
+    assert len(mocked_responses.calls) == 3
+
+
+def test_lazy_auth_states_prefetch_groups_once_introspected(
+    introspect_success_response,
+    dependent_token_success_response,
+    groups_success_response,
+    mocked_responses,
+):
+    client_factory = NoRetryClientFactory()
+    builder = AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+        client_factory=client_factory,
+        prefetch_groups=True,
+    )
+
+    auth_state = builder.build("bogus", lazy=True)
+    builder.prefetcher.shutdown()
+    assert len(mocked_responses.calls) == 0
+
+    # introspecting the token starts the prefetch
+    assert auth_state.identities
+    builder.prefetcher.shutdown()
+    assert len(mocked_responses.calls) == 3
+
+    assert len(auth_state.groups) == len(groups_success_response.metadata["group-ids"])
+    assert len(mocked_responses.calls) == 3
+
+
+def test_build_many_returns_results_in_input_order():
+    def introspect(token, include):
+        if token.startswith("bad"):
+            return {"active": False}
+        return {
+            "active": True,
+            "scope": "expected-scope",
+            "sub": "f7e81526-1610-47e2-a7c5-b071db77ca47",
+            "identity_set": ["f7e81526-1610-47e2-a7c5-b071db77ca47"],
+        }
+
+    auth_client = mock.Mock()
+    auth_client.oauth2_token_introspect.side_effect = introspect
+    builder = AuthStateBuilder(auth_client, ["expected-scope"])
+    builder.build("cached-token")
+
+    tokens = ["token-a", "bad-token", "token-a", "cached-token", "token-b"]
+    results = builder.build_many(tokens, max_concurrency=2)
+
+    assert [type(result) for result in results] == [
+        AuthState,
+        InactiveTokenError,
+        AuthState,
+        AuthState,
+        AuthState,
+    ]
+    assert results[0] is results[2]
+    assert [
+        result.bearer_token for result in results if isinstance(result, AuthState)
+    ] == [
+        "token-a",
+        "token-a",
+        "cached-token",
+        "token-b",
+    ]
+    # each distinct token is introspected once, including the earlier build
+    assert auth_client.oauth2_token_introspect.call_count == 4
+
+    # rejections are served from the cache, too
+    assert isinstance(builder.build_many(["bad-token"])[0], InactiveTokenError)
+    assert auth_client.oauth2_token_introspect.call_count == 4
+
+
+def test_build_many_counts_one_lookup_per_cached_token(tmp_path):
+    auth_client = mock.Mock()
+    auth_client.oauth2_token_introspect.return_value = {
+        "active": True,
+        "scope": "expected-scope",
+        "sub": "f7e81526-1610-47e2-a7c5-b071db77ca47",
+        "identity_set": ["f7e81526-1610-47e2-a7c5-b071db77ca47"],
+    }
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    builder = AuthStateBuilder(auth_client, ["expected-scope"], cache_backend=backend)
+    builder.build_many(["token-a", "token-b"])
+    earlier = builder.caches.stats()["introspect"]
+
+    with mock.patch.object(backend, "get", wraps=backend.get) as backend_get:
+        builder.build_many(["token-a", "token-b"])
+
+    stats = builder.caches.stats()["introspect"].since(earlier)
+    assert (stats.hits, stats.misses) == (2, 0)
+    # in-process hits do not read the backend
+    read_keys = [call.args[0] for call in backend_get.call_args_list]
+    assert not [key for key in read_keys if key.startswith("introspect:")]
+
+
+def test_snapshots_act_for_the_caller_without_calls(auth_state, mocked_responses):
+    groups_scope = globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+    groups = auth_state.groups
+    snapshot = pickle.loads(pickle.dumps(auth_state.snapshot()))
+    calls = len(mocked_responses.calls)
+
+    assert snapshot == auth_state.snapshot()
+    assert snapshot.effective_identity == auth_state.effective_identity
+    assert snapshot.identities == auth_state.identities
+    assert snapshot.groups == groups
+    assert snapshot.principals == auth_state.principals
+    assert "expected-scope" in snapshot.scopes
+    assert snapshot.expiry_skew == auth_state.expiry_skew
+    assert not hasattr(snapshot, "bearer_token")
+
+    group = next(iter(groups))
+    assert snapshot.check_authorization([group])
+    assert not snapshot.check_authorization(["urn:globus:groups:id:not-a-member"])
+    authorizer = snapshot.get_authorizer_for_scope(groups_scope)
+    assert isinstance(authorizer, globus_sdk.AccessTokenAuthorizer)
+    with pytest.raises(ValueError):
+        snapshot.get_authorizer_for_scope("other-scope")
+    assert len(mocked_responses.calls) == calls
+
+
+def test_snapshots_only_include_resolved_groups(auth_state, mocked_responses):
+    snapshot = auth_state.snapshot()
+    assert snapshot.groups is None
+    assert snapshot.dependent_tokens == ()
+    assert snapshot.principals == auth_state.identities
+    assert len(mocked_responses.calls) == 1
+
+    assert auth_state.snapshot(resolve_groups=True).groups == auth_state.groups
+
+
+def test_group_membership_is_stored_compactly():
+    group_ids = [
+        "606dbaa9-3d57-44b8-a33e-422a9de0c712",
+        "2a54b7f2-2ea0-11ee-8a20-0242ac110002",
+    ]
+    membership = GroupMembership("digest", group_ids)
+    assert len(membership) == 2
+    assert membership.group_ids == group_ids
+    assert membership.principals == {group_principal(id_) for id_ in group_ids}
+
+    many_group_ids = [str(uuid.uuid4()) for _ in range(500)]
+    large_membership = GroupMembership("digest", many_group_ids)
+    principals = frozenset(group_principal(id_) for id_ in many_group_ids)
+    assert len(pickle.dumps(large_membership)) < len(pickle.dumps(principals)) / 3
+
+    loaded = pickle.loads(pickle.dumps(membership))
+    assert loaded.identity_set_digest == "digest"
+    assert loaded.group_ids == group_ids
+
+
+def test_new_tokens_for_an_identity_share_cached_groups(
+    mocked_responses,
+    introspect_success_response,
+    dependent_token_success_response,
+    groups_success_response,
+):
+    client_factory = NoRetryClientFactory()
+    builder = AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+        client_factory=client_factory,
+    )
+    groups = builder.build("first-token").groups
+    # introspect, dependent token grant, and groups
+    assert len(mocked_responses.calls) == 3
+
+    # a new token for the same identity is introspected, but needs no dependent
+    # token grant or groups lookup
+    assert builder.build("second-token").groups == groups
+    assert len(mocked_responses.calls) == 4
+
+    effective_id = introspect_success_response.metadata["effective-id"]
+    builder.invalidate_groups(effective_id)
+    assert builder.build("second-token").groups == groups
+    # dependent token grant and groups
+    assert len(mocked_responses.calls) == 6
+
+
+def test_cached_groups_only_apply_to_the_same_identity_set(
+    auth_state, mocked_responses, groups_success_response
+):
+    auth_state.group_membership_cache[auth_state._group_membership_cache_key] = (
+        GroupMembership("a-different-identity-set", [])
+    )
+    assert len(auth_state.groups) == len(groups_success_response.metadata["group-ids"])
+
+
+def _introspect_outage():
+    RegisteredResponse(
+        service="auth",
+        path="/v2/oauth2/token/introspect",
+        method="POST",
+        status=500,
+        json={},
+    ).add()
+
+
+def _auth_outage_builder():
+    client_factory = NoRetryClientFactory()
+    policy = AuthCachePolicy(
+        introspect=CacheSettings(maxsize=10, ttl=30, stale_if_error=300),
+        auth_states=None,
+        circuit_breaker=CircuitBreakerSettings(minimum_calls=1, failure_rate=0.5),
+    )
+    return AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+        client_factory=client_factory,
+        cache_policy=policy,
+    )
+
+
+def test_stale_introspect_results_are_used_while_auth_is_failing(
+    mocked_responses, introspect_success_response
+):
+    builder = _auth_outage_builder()
+    identity = builder.build("bogus").effective_identity
+    introspect_cache = builder.caches.introspect
+    introspect_cache.timer = lambda: time.monotonic() + 60
+    _introspect_outage()
+
+    assert builder.build("bogus").effective_identity == identity
+    assert builder.caches.circuit_breakers["introspect"].state == "open"
+    # while the breaker is open, Globus Auth is not called
+    calls = len(mocked_responses.calls)
+    assert builder.build("bogus").effective_identity == identity
+    assert len(mocked_responses.calls) == calls
+    assert introspect_cache.stats().stale_hits == 2
+
+    stats = builder.caches.circuit_breaker_stats()
+    assert (stats["introspect"].failures, stats["introspect"].rejected) == (1, 1)
+
+
+def test_open_circuit_fails_fast_without_a_stale_result(mocked_responses):
+    builder = _auth_outage_builder()
+    _introspect_outage()
+
+    with pytest.raises(globus_sdk.GlobusAPIError):
+        builder.build("bogus")
+    with pytest.raises(CircuitOpenError):
+        builder.build("bogus")
+    assert len(mocked_responses.calls) == 1
+
+
+def test_open_groups_circuit_is_raised_without_stale_groups(
+    mocked_responses, introspect_success_response, dependent_token_success_response
+):
+    builder = _auth_outage_builder()
+    RegisteredResponse(
+        service="groups",
+        path="/v2/groups/my_groups",
+        status=500,
+        json={},
+    ).add()
+
+    # a failing Groups call is still treated as having no groups
+    assert builder.build("bogus").groups == frozenset()
+    assert builder.caches.circuit_breakers["groups"].state == "open"
+    calls = len(mocked_responses.calls)
+    with pytest.raises(CircuitOpenError):
+        builder.build("bogus").groups
+    assert len(mocked_responses.calls) == calls
+
+
+def test_auth_states_fail_fast_after_the_deadline(
+    mocked_responses, get_auth_state_instance
+):
+    with deadline(0):
+        with pytest.raises(DeadlineExceededError):
+            get_auth_state_instance(["expected-scope"])
+    assert len(mocked_responses.calls) == 0
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import stat
+import time
+
+import pytest
+
+from globus_action_provider_tools.cache_backends import (
+    EncryptedCacheBackend,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+)
+from globus_action_provider_tools.utils import TypedTTLCache
+
+
+class FakeRedis:
+    """A local stand-in for a Redis client, implementing the subset used here."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, tuple[bytes, float]] = {}
+
+    def get(self, name):
+        value, expires_at = self.data.get(name, (None, 0.0))
+        if expires_at <= time.time():
+            return None
+        return value
+
+    def set(self, name, value, ex=None):
+        self.data[name] = (value, time.time() + ex)
+        return True
+
+    def delete(self, *names):
+        for name in names:
+            self.data.pop(name, None)
+
+    def scan_iter(self, match=None):
+        return [k for k in list(self.data) if fnmatch.fnmatchcase(k, match or "*")]
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    return RedisCacheBackend(FakeRedis())
+
+
+def test_backend_get_set_delete(backend):
+    assert backend.get("foo") is None
+    backend.set("foo", b"bar", 30)
+    assert backend.get("foo") == b"bar"
+    backend.delete("foo")
+    assert backend.get("foo") is None
+    # deleting a missing key is not an error
+    backend.delete("foo")
+
+
+def test_backend_clear_by_prefix(backend):
+    backend.set("a:1", b"1", 30)
+    backend.set("a:2", b"2", 30)
+    backend.set("b:1", b"3", 30)
+    backend.clear("a:")
+    assert backend.get("a:1") is None
+    assert backend.get("a:2") is None
+    assert backend.get("b:1") == b"3"
+
+
+def test_sqlite_backend_expires_values(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    backend.set("foo", b"bar", -1)
+    assert backend.get("foo") is None
+
+
+def test_sqlite_backend_purges_expired_values_once_per_interval(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite", purge_interval=3600)
+
+    def stored_keys():
+        rows = backend._connection.execute("SELECT key FROM cache").fetchall()
+        return {row[0] for row in rows}
+
+    backend.set("other", b"2", 30)
+    backend.set("expired", b"1", -1)
+    # the first write purged expired values, and the next purge is due in an hour
+    assert stored_keys() == {"expired", "other"}
+    assert backend.get("expired") is None
+
+    backend.purge_expired()
+    assert stored_keys() == {"other"}
+
+    index = backend._connection.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM cache WHERE expires_at <= 0"
+    ).fetchall()
+    assert "cache_expires_at" in str(index)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_sqlite_backend_creates_a_private_database_file(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    backend.set("foo", b"bar", 30)
+    mode = stat.S_IMODE(os.stat(tmp_path / "cache.sqlite").st_mode)
+    assert mode == 0o600
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    writer = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    reader = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    writer.set("foo", b"bar", 30)
+    assert reader.get("foo") == b"bar"
+
+
+def test_two_tier_cache_falls_through_to_backend(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    first: TypedTTLCache[frozenset[str]] = TypedTTLCache(
+        maxsize=10, ttl=30, backend=backend, namespace="groups:"
+    )
+    second: TypedTTLCache[frozenset[str]] = TypedTTLCache(
+        maxsize=10, ttl=30, backend=backend, namespace="groups:"
+    )
+
+    first["key"] = frozenset({"a", "b"})
+    assert second.get("key") == frozenset({"a", "b"})
+    assert "key" in second
+
+    del second["key"]
+    assert backend.get("groups:key") is None
+    with pytest.raises(KeyError):
+        del second["key"]
+
+
+def test_encrypted_backend_encrypts_values(tmp_path):
+    sqlite_backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    backend = EncryptedCacheBackend(
+        sqlite_backend, EncryptedCacheBackend.generate_key()
+    )
+
+    backend.set("foo", b"secret-access-token", 30)
+    assert backend.get("foo") == b"secret-access-token"
+    stored = sqlite_backend.get("foo")
+    assert stored is not None
+    assert b"secret-access-token" not in stored
+
+    backend.delete("foo")
+    assert backend.get("foo") is None
+
+
+def test_encrypted_backend_ignores_values_it_cannot_decrypt(tmp_path):
+    sqlite_backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    old_key, new_key = (EncryptedCacheBackend.generate_key() for _ in range(2))
+    EncryptedCacheBackend(sqlite_backend, old_key).set("foo", b"bar", 30)
+
+    assert EncryptedCacheBackend(sqlite_backend, new_key).get("foo") is None
+    # during a key rotation, values written with the old key remain readable
+    assert (
+        EncryptedCacheBackend(sqlite_backend, [new_key, old_key]).get("foo") == b"bar"
+    )
+
+
+def test_encrypted_backend_requires_a_key():
+    with pytest.raises(ValueError):
+        EncryptedCacheBackend(RedisCacheBackend(FakeRedis()), [])
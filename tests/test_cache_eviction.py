@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pytest
+
+from globus_action_provider_tools.cache_eviction import CountMinSketch, WTinyLFUCache
+from globus_action_provider_tools.utils import TypedTTLCache
+
+
+def test_count_min_sketch_estimates_and_ages_counts():
+    sketch = CountMinSketch(4096, sample_size=100)
+    for _ in range(5):
+        sketch.increment("frequent")
+    sketch.increment("once")
+
+    # the first access to each key is held by the doorkeeper
+    assert sketch.estimate("frequent") == 5
+    assert sketch.estimate("once") == 1
+    assert sketch.estimate("never") == 0
+
+    for i in range(94):
+        sketch.increment(f"filler-{i}")
+    # counts are halved, and the doorkeeper is reset
+    assert sketch.estimate("frequent") == 2
+    assert sketch.estimate("once") == 0
+
+
+@pytest.mark.parametrize("eviction, expect_retained", (("lru", 0), ("tinylfu", 75)))
+def test_tinylfu_resists_scans(eviction, expect_retained):
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=100, ttl=100, eviction=eviction)
+    hot_keys = [f"hot-{i}" for i in range(80)]
+    for _ in range(3):
+        for key in hot_keys:
+            if cache.get(key) is None:
+                cache[key] = 1
+
+    # a scan of keys which are each seen only once
+    for i in range(5000):
+        cache[f"scan-{i}"] = 1
+
+    retained = sum(key in cache for key in hot_keys)
+    assert retained >= expect_retained
+    if eviction == "lru":
+        assert retained == 0
+
+
+def test_tinylfu_tenant_quota_limits_one_tenant():
+    cache: TypedTTLCache[int] = TypedTTLCache(
+        maxsize=100, ttl=100, eviction="tinylfu", tenant_quota=0.5
+    )
+    for i in range(50):
+        cache.set(f"steady-{i}", i, tenant="steady-client")
+    for i in range(1000):
+        cache.set(f"noisy-{i}", i, tenant="noisy-client")
+
+    assert sum(f"noisy-{i}" in cache for i in range(1000)) <= 50
+    assert all(f"steady-{i}" in cache for i in range(50))
+    # the noisy tenant keeps its most recent entries
+    assert "noisy-999" in cache
+
+
+def test_tenant_quota_requires_tinylfu():
+    with pytest.raises(ValueError, match="tinylfu"):
+        TypedTTLCache(maxsize=10, ttl=10, eviction="lru", tenant_quota=0.5)
+
+
+def test_tinylfu_cache_stays_consistent():
+    cache = WTinyLFUCache(20, tenant_quota=0.5, get_tenant=lambda value: value)
+    for i in range(200):
+        cache[f"key-{i % 37}"] = f"tenant-{i % 3}"
+        if i % 7 == 0:
+            cache.pop(f"key-{i % 11}", None)
+        cache.get(f"key-{i % 5}")
+
+    assert len(cache) <= 20
+    keys = set(cache)
+    popped = set()
+    while cache:
+        popped.add(cache.popitem()[0])
+    assert popped == keys
+    assert not cache._key_tenants
+    assert not cache._tenant_keys
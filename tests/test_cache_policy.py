@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from globus_action_provider_tools.authentication import AuthStateBuilder
+from globus_action_provider_tools.cache_policy import AuthCachePolicy, CacheSettings
+
+from .conftest import NoRetryClientFactory
+
+
+def test_builders_own_separately_sized_caches():
+    small_policy = AuthCachePolicy(
+        introspect=CacheSettings(maxsize=10, ttl=5, eviction="fifo")
+    )
+    small = AuthStateBuilder(mock.Mock(), [], cache_policy=small_policy)
+    default = AuthStateBuilder(mock.Mock(), [])
+
+    assert small.caches.introspect is not default.caches.introspect
+    assert small.caches.introspect.maxsize == 10
+    assert small.caches.introspect.ttl == 5
+    assert small.caches.introspect.eviction == "fifo"
+    assert default.caches.introspect.maxsize == AuthCachePolicy().introspect.maxsize
+
+    small.caches.group_membership["key"] = frozenset()
+    assert "key" not in default.caches.group_membership
+
+
+def test_refresh_ahead_is_disabled_by_default():
+    assert AuthStateBuilder(mock.Mock(), []).caches.refresher is None
+
+
+def test_refresh_ahead_refreshes_groups_in_the_background(
+    introspect_success_response,
+    dependent_token_success_response,
+    groups_success_response,
+    mocked_responses,
+):
+    client_factory = NoRetryClientFactory()
+    builder = AuthStateBuilder(
+        client_factory.make_confidential_app_auth_client("bogus", "bogus"),
+        ["expected-scope"],
+        client_factory=client_factory,
+        cache_policy=AuthCachePolicy(refresh_ahead=0.2),
+    )
+    now = [0.0]
+    builder.caches.group_membership.timer = lambda: now[0]
+
+    groups = builder.build("token").groups
+    assert len(mocked_responses.calls) == 3
+
+    # with less than 20% of its lifetime remaining, the cached value is returned
+    # and a refresh is made in the background
+    now[0] = builder.cache_policy.group_membership.ttl * 0.9
+    assert builder.build("token").groups == groups
+    builder.caches.refresher.shutdown()
+    assert len(mocked_responses.calls) == 4
+    assert (
+        builder.caches.group_membership.remaining_fraction(
+            builder.build("token")._group_membership_cache_key
+        )
+        == 1.0
+    )
+
+
+def test_introspect_cache_quota_is_applied_per_client():
+    def introspect(token, include):
+        return {
+            "active": True,
+            "scope": "expected-scope",
+            "client_id": "noisy-client" if token.startswith("noisy") else token,
+            "sub": "f7e81526-1610-47e2-a7c5-b071db77ca47",
+            "identity_set": ["f7e81526-1610-47e2-a7c5-b071db77ca47"],
+        }
+
+    auth_client = mock.Mock()
+    auth_client.oauth2_token_introspect.side_effect = introspect
+    builder = AuthStateBuilder(
+        auth_client,
+        ["expected-scope"],
+        cache_policy=AuthCachePolicy(
+            introspect=CacheSettings(
+                maxsize=10, ttl=30, eviction="tinylfu", tenant_quota=0.2
+            )
+        ),
+    )
+
+    builder.build("steady-token")
+    for i in range(100):
+        builder.build(f"noisy-token-{i}")
+
+    assert len(builder.caches.introspect) == 3
+    auth_client.oauth2_token_introspect.reset_mock()
+    builder.build("steady-token")
+    auth_client.oauth2_token_introspect.assert_not_called()
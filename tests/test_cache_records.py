@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import pickle
+import sys
+import time
+
+import globus_sdk
+import pytest
+
+from globus_action_provider_tools.cache_records import (
+    DependentTokensRecord,
+    IntrospectRecord,
+)
+
+_INTROSPECT_DATA = {
+    "active": True,
+    "scope": "expected-scope bonus-scope",
+    "sub": "f7e81526-1610-47e2-a7c5-b071db77ca47",
+    "identity_set": [
+        "f7e81526-1610-47e2-a7c5-b071db77ca47",
+        "9d437146-f150-42c2-be88-9d625d9e7cf9",
+    ],
+    "exp": 1700000000,
+    "client_id": "0c8a6e7b-5e8c-4b6e-a3b8-6f1b0d0a3f9e",
+    "email": "user@example.org",
+}
+
+
+def test_introspect_records_keep_the_response_fields():
+    record = IntrospectRecord.from_data(_INTROSPECT_DATA)
+
+    assert record.active is True
+    assert record.scopes == {"expected-scope", "bonus-scope"}
+    assert record["sub"] == _INTROSPECT_DATA["sub"]
+    assert record["identity_set"] == _INTROSPECT_DATA["identity_set"]
+    assert record.get("exp") == 1700000000
+    assert record["scope"] == "bonus-scope expected-scope"
+    assert record.get("email") == "user@example.org"
+    assert record.get("username") is None
+    assert record.data == _INTROSPECT_DATA | {"scope": "bonus-scope expected-scope"}
+    assert not hasattr(record, "__dict__")
+
+    # strings shared between many records are interned
+    assert record.sub is sys.intern("f7e81526-1610-47e2-a7c5-b071db77ca47")
+
+
+def test_inactive_introspect_records_have_no_identities():
+    record = IntrospectRecord.from_data({"active": False})
+
+    assert record.active is False
+    assert record.scopes == frozenset()
+    with pytest.raises(KeyError):
+        record["sub"]
+    assert record.data == {"active": False}
+
+
+def test_introspect_records_round_trip():
+    record = IntrospectRecord.from_data(_INTROSPECT_DATA)
+
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert IntrospectRecord.from_data(record.data) == record
+
+
+def test_dependent_tokens_records_look_up_tokens_by_scope():
+    record = DependentTokensRecord.from_data(
+        [
+            {
+                "resource_server": "groups.api.globus.org",
+                "scope": "groups-scope other-groups-scope",
+                "access_token": "groups-token",
+                "expires_at_seconds": 2000,
+                "refresh_token": "groups-refresh-token",
+                "token_type": "Bearer",
+            },
+            {
+                "resource_server": "transfer.api.globus.org",
+                "scope": "transfer-scope",
+                "access_token": "transfer-token",
+                "expires_at_seconds": 1000,
+            },
+        ]
+    )
+
+    assert record.access_token("other-groups-scope") == "groups-token"
+    assert record.access_token("transfer-scope") == "transfer-token"
+    assert record.access_token("groups") is None
+    assert record.expires_at == 1000
+    assert record.expires_at_for("groups-scope") == 2000
+    assert record.expires_at_for("groups") is None
+    assert record.by_scopes["groups-scope"]["access_token"] == "groups-token"
+    groups_token = record.by_resource_server["groups.api.globus.org"]
+    assert groups_token["refresh_token"] == "groups-refresh-token"
+    assert groups_token["token_type"] == "Bearer"
+    assert record.by_resource_server["transfer.api.globus.org"]["refresh_token"] is None
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert DependentTokensRecord.from_data(record.data) == record
+
+
+def test_records_convert_to_sdk_responses():
+    client = globus_sdk.AuthClient()
+    record = IntrospectRecord.from_data(_INTROSPECT_DATA)
+    introspect_response = record.to_response(client)
+
+    assert isinstance(introspect_response, globus_sdk.GlobusHTTPResponse)
+    assert introspect_response.http_status == 200
+    assert introspect_response["email"] == "user@example.org"
+    assert introspect_response["identity_set"] == _INTROSPECT_DATA["identity_set"]
+
+    expires_at = int(time.time()) + 1000
+    dependent_tokens_response = DependentTokensRecord.from_data(
+        [
+            {
+                "resource_server": "groups.api.globus.org",
+                "scope": "groups-scope",
+                "access_token": "groups-token",
+                "refresh_token": "groups-refresh-token",
+                "token_type": "Bearer",
+                "expires_at_seconds": expires_at,
+            }
+        ]
+    ).to_response(client)
+
+    assert isinstance(dependent_tokens_response, globus_sdk.OAuthDependentTokenResponse)
+    token = dependent_tokens_response.by_scopes["groups-scope"]
+    assert token["access_token"] == "groups-token"
+    assert token["refresh_token"] == "groups-refresh-token"
+    assert abs(token["expires_at_seconds"] - expires_at) <= 1
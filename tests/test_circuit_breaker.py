@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import globus_sdk
+import pytest
+
+from globus_action_provider_tools.cache_policy import CircuitBreakerSettings
+from globus_action_provider_tools.circuit_breaker import CircuitBreaker, is_outage
+from globus_action_provider_tools.errors import CircuitOpenError
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Outage(globus_sdk.NetworkError):
+    def __init__(self) -> None:
+        super().__init__("connection refused", ConnectionError())
+
+
+def fail():
+    raise Outage()
+
+
+def succeed():
+    return "ok"
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+@pytest.fixture
+def breaker(timer):
+    settings = CircuitBreakerSettings(
+        failure_rate=0.5, window=4, minimum_calls=4, open_duration=30
+    )
+    return CircuitBreaker("introspect", settings, timer=timer)
+
+
+def test_breaker_opens_when_the_failure_rate_is_reached(breaker):
+    for fn in (succeed, fail, succeed):
+        try:
+            breaker.call(fn)
+        except Outage:
+            pass
+    assert breaker.state == "closed"
+
+    with pytest.raises(Outage):
+        breaker.call(fail)
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.call(succeed)
+    assert excinfo.value.endpoint == "introspect"
+    assert excinfo.value.retry_after == 30
+    stats = breaker.stats()
+    assert (stats.calls, stats.failures, stats.rejected, stats.opened) == (4, 2, 1, 1)
+
+
+def test_errors_which_are_not_outages_do_not_count_as_failures(breaker):
+    def reject():
+        raise ValueError("bad token")
+
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            breaker.call(reject)
+    assert breaker.state == "closed"
+    assert breaker.stats().failures == 0
+
+
+def test_slow_calls_count_as_failures(timer):
+    breaker = CircuitBreaker(
+        "groups",
+        CircuitBreakerSettings(minimum_calls=2, slow_call_duration=5),
+        timer=timer,
+    )
+
+    def slow():
+        timer.now += 5
+        return "ok"
+
+    assert breaker.call(slow) == "ok"
+    assert breaker.call(slow) == "ok"
+    assert breaker.state == "open"
+    assert breaker.stats().slow_calls == 2
+
+
+def test_half_open_probe_closes_the_breaker(breaker, timer):
+    for _ in range(4):
+        with pytest.raises(Outage):
+            breaker.call(fail)
+    timer.now = 30
+
+    assert breaker.call(succeed) == "ok"
+    assert breaker.state == "closed"
+    stats = breaker.stats()
+    assert (stats.opened, stats.half_opened, stats.closed) == (1, 1, 1)
+
+
+def test_failed_half_open_probe_reopens_the_breaker(breaker, timer):
+    for _ in range(4):
+        with pytest.raises(Outage):
+            breaker.call(fail)
+    timer.now = 30
+
+    with pytest.raises(Outage):
+        breaker.call(fail)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.call(succeed)
+    assert breaker.stats().opened == 2
+
+
+def test_only_half_open_calls_probe_at_once(breaker, timer):
+    for _ in range(4):
+        with pytest.raises(Outage):
+            breaker.call(fail)
+    timer.now = 30
+
+    def probe():
+        # another call, made while this probe is in flight, is rejected
+        with pytest.raises(CircuitOpenError):
+            breaker.call(succeed)
+        return "ok"
+
+    assert breaker.call(probe) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_client_errors_are_not_outages():
+    assert is_outage(Outage())
+    assert is_outage(CircuitOpenError("groups", 1))
+    assert not is_outage(ValueError())
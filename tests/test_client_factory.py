@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import http.server
+import json
+import threading
+import time
+
+import globus_sdk
+import pytest
+
+from globus_action_provider_tools.authentication import AuthSnapshot
+from globus_action_provider_tools.cache_policy import ConcurrencyLimitSettings
+from globus_action_provider_tools.client_factory import ClientFactory
+from globus_action_provider_tools.deadline import deadline
+from globus_action_provider_tools.errors import DeadlineExceededError
+
+GROUPS_SCOPE = globus_sdk.GroupsClient.scopes.view_my_groups_and_memberships
+
+
+class GroupsStandIn(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    status = 200
+    delay = 0.0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = json.dumps([]).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def groups_url(mocked_responses, monkeypatch):
+    GroupsStandIn.connections = 0
+    GroupsStandIn.status = 200
+    GroupsStandIn.delay = 0.0
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), GroupsStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    mocked_responses.add_passthru(url)
+    monkeypatch.setenv("GLOBUS_SDK_SERVICE_URL_GROUPS", url)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def test_clients_share_pooled_connections(groups_url):
+    factory = ClientFactory()
+    for token in ("token-1", "token-2", "token-3"):
+        groups_client = factory.make_groups_client(
+            globus_sdk.AccessTokenAuthorizer(token)
+        )
+        groups_client.get_my_groups()
+
+    assert GroupsStandIn.connections == 1
+    stats = factory.connection_stats()
+    assert (stats.requests, stats.connections, stats.reused) == (3, 1, 2)
+
+
+def test_closing_a_client_keeps_the_shared_pool_open(groups_url):
+    factory = ClientFactory()
+    groups_client = factory.make_groups_client(None)
+    groups_client.get_my_groups()
+    groups_client.transport.close()
+    factory.make_groups_client(None).get_my_groups()
+
+    assert GroupsStandIn.connections == 1
+
+
+def test_keep_alive_and_pool_settings_are_transport_params(groups_url):
+    class NoKeepAliveClientFactory(ClientFactory):
+        DEFAULT_GROUPS_TRANSPORT_PARAMS = (
+            ("max_retries", 0),
+            ("pool_maxsize", 2),
+            ("keep_alive", False),
+        )
+
+    factory = NoKeepAliveClientFactory()
+    groups_client = factory.make_groups_client(None)
+    groups_client.get_my_groups()
+    groups_client.get_my_groups()
+
+    assert groups_client.transport.max_retries == 0
+    assert GroupsStandIn.connections == 2
+    assert factory.connection_stats().reuse_ratio == 0
+    adapter = groups_client.transport.session.get_adapter(groups_url)
+    assert adapter._pool_maxsize == 2
+
+
+def test_calls_to_groups_are_concurrency_limited(groups_url):
+    class LimitedClientFactory(ClientFactory):
+        DEFAULT_GROUPS_TRANSPORT_PARAMS = (("max_retries", 0),)
+        CONCURRENCY_LIMIT_SETTINGS = ConcurrencyLimitSettings(
+            initial_limit=4, backoff_ratio=0.5
+        )
+
+    factory = LimitedClientFactory()
+    groups_client = factory.make_groups_client(None)
+    groups_client.get_my_groups()
+    GroupsStandIn.status = 503
+    with pytest.raises(globus_sdk.GlobusAPIError):
+        groups_client.get_my_groups()
+
+    stats = factory.concurrency_stats()
+    assert set(stats) == {"auth", "groups"}
+    assert (stats["groups"].calls, stats["groups"].dropped) == (2, 1)
+    assert stats["groups"].limit == 2
+    assert stats["auth"].calls == 0
+
+
+def test_concurrency_limits_are_disabled_by_default(groups_url):
+    factory = ClientFactory()
+    factory.make_groups_client(None).get_my_groups()
+    assert factory.concurrency_stats() == {}
+    assert factory.connection_stats().requests == 1
+
+
+def test_retries_do_not_wait_for_another_turn(groups_url):
+    class LimitedRetryingClientFactory(ClientFactory):
+        DEFAULT_GROUPS_TRANSPORT_PARAMS = (("max_retries", 2), ("max_sleep", 0))
+        CONCURRENCY_LIMIT_SETTINGS = ConcurrencyLimitSettings(
+            initial_limit=1, min_limit=1
+        )
+
+    GroupsStandIn.status = 503
+    factory = LimitedRetryingClientFactory()
+    with pytest.raises(globus_sdk.GlobusAPIError):
+        factory.make_groups_client(None).get_my_groups()
+
+    # one turn is held for the call and both of its retries
+    assert factory.connection_stats().requests == 3
+    stats = factory.concurrency_stats()["groups"]
+    assert (stats.calls, stats.dropped, stats.in_flight) == (1, 1, 0)
+
+
+def test_requests_are_not_sent_after_the_deadline(groups_url):
+    factory = ClientFactory()
+    with deadline(0):
+        with pytest.raises(DeadlineExceededError):
+            factory.make_groups_client(None).get_my_groups()
+    assert factory.connection_stats().requests == 0
+
+
+def test_request_timeouts_are_shortened_to_the_deadline(groups_url):
+    GroupsStandIn.delay = 1
+    factory = ClientFactory()
+    start = time.monotonic()
+    with deadline(0.1):
+        with pytest.raises(globus_sdk.GlobusTimeoutError):
+            factory.make_groups_client(None).get_my_groups()
+    assert time.monotonic() - start < 1
+
+
+def test_requests_are_not_retried_past_the_deadline(groups_url):
+    class RetryingClientFactory(ClientFactory):
+        DEFAULT_GROUPS_TRANSPORT_PARAMS = (("max_retries", 3),)
+
+    GroupsStandIn.status = 503
+    factory = RetryingClientFactory()
+    with deadline(0.2):
+        with pytest.raises(globus_sdk.GlobusAPIError):
+            factory.make_groups_client(None).get_my_groups()
+    # the first retry would sleep for at least 0.25 seconds
+    assert factory.connection_stats().requests == 1
+
+
+def test_clients_for_scope_are_cached_by_dependent_token(auth_state):
+    factory = ClientFactory()
+    groups_client = factory.get_client_for_scope(
+        auth_state, GROUPS_SCOPE, globus_sdk.GroupsClient
+    )
+    assert isinstance(groups_client, globus_sdk.GroupsClient)
+    assert groups_client.authorizer.access_token.startswith("7ZdPhhvija1MUDw6")
+    assert (
+        factory.get_client_for_scope(auth_state, GROUPS_SCOPE, globus_sdk.GroupsClient)
+        is groups_client
+    )
+
+    # clients of another class get their own entry, with the same token
+    search_client = factory.get_client_for_scope(
+        auth_state, GROUPS_SCOPE, globus_sdk.SearchClient
+    )
+    assert isinstance(search_client, globus_sdk.SearchClient)
+    assert search_client.authorizer.access_token == (
+        groups_client.authorizer.access_token
+    )
+    assert len(factory.scoped_clients) == 2
+
+
+def test_clients_for_scope_expire_with_their_dependent_token():
+    factory = ClientFactory()
+
+    def snapshot(access_token, expires_in, expiry_skew=30):
+        return AuthSnapshot(
+            effective_identity="identity",
+            identities=frozenset(),
+            scopes=frozenset(),
+            expected_scopes=frozenset(),
+            dependent_tokens=(
+                (GROUPS_SCOPE, access_token, int(time.time()) + expires_in),
+            ),
+            expiry_skew=expiry_skew,
+        )
+
+    expiring = factory.get_client_for_scope(
+        snapshot("expiring-token", 10), GROUPS_SCOPE, globus_sdk.GroupsClient
+    )
+    lasting = factory.get_client_for_scope(
+        snapshot("lasting-token", 3600), GROUPS_SCOPE, globus_sdk.GroupsClient
+    )
+    assert expiring is not lasting
+    # a client is not cached past the expiration of its token, less a skew
+    assert len(factory.scoped_clients) == 1
+    assert (
+        factory.get_client_for_scope(
+            snapshot("lasting-token", 3600), GROUPS_SCOPE, globus_sdk.GroupsClient
+        )
+        is lasting
+    )
+
+    # the skew is the one configured for the caller
+    factory.get_client_for_scope(
+        snapshot("skewed-token", 600, expiry_skew=900),
+        GROUPS_SCOPE,
+        globus_sdk.GroupsClient,
+    )
+    assert len(factory.scoped_clients) == 1
+
+
+def test_subclasses_need_not_call_client_factory_init(auth_state):
+    class CustomClientFactory(ClientFactory):
+        CONCURRENCY_LIMIT_SETTINGS = ConcurrencyLimitSettings()
+
+        def __init__(self, label):
+            self.label = label
+
+    factory = CustomClientFactory("custom")
+    groups_client = factory.get_client_for_scope(
+        auth_state, GROUPS_SCOPE, globus_sdk.GroupsClient
+    )
+    assert isinstance(groups_client, globus_sdk.GroupsClient)
+    assert len(factory.scoped_clients) == 1
+    assert set(factory.concurrency_stats()) == {"auth", "groups"}
+    assert factory.connection_stats().requests == 0
+
+
+def test_auth_state_groups_client_is_shared_by_auth_states(
+    auth_state, get_auth_state_instance
+):
+    other_auth_state = get_auth_state_instance(["expected-scope"])
+    assert auth_state._groups_client is other_auth_state._groups_client
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from globus_action_provider_tools.cache_policy import ConcurrencyLimitSettings
+from globus_action_provider_tools.concurrency_limiter import ConcurrencyLimiter
+from globus_action_provider_tools.errors import ConcurrencyLimitError
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_fast_calls_raise_the_limit_additively():
+    limiter = ConcurrencyLimiter(
+        "auth", ConcurrencyLimitSettings(initial_limit=2), timer=FakeTimer()
+    )
+    for _ in range(4):
+        limiter.release(limiter.acquire())
+    # each call adds 1 / limit
+    assert limiter.limit == 3
+    assert limiter.stats().calls == 4
+
+
+def test_failed_and_slow_calls_lower_the_limit_multiplicatively():
+    timer = FakeTimer()
+    limiter = ConcurrencyLimiter(
+        "auth",
+        ConcurrencyLimitSettings(
+            initial_limit=10, min_limit=4, backoff_ratio=0.5, slow_call_duration=2
+        ),
+        timer=timer,
+    )
+    limiter.release(limiter.acquire(), failed=True)
+    assert limiter.limit == 5
+
+    started_at = limiter.acquire()
+    timer.now += 2
+    limiter.release(started_at)
+    # the limit does not fall below min_limit
+    assert limiter.limit == 4
+    assert limiter.stats().dropped == 2
+
+
+def test_callers_over_the_limit_wait_for_a_call_to_finish():
+    limiter = ConcurrencyLimiter(
+        "groups", ConcurrencyLimitSettings(initial_limit=1, queue_timeout=5)
+    )
+    started_at = limiter.acquire()
+    acquired = threading.Event()
+
+    def waiter():
+        limiter.release(limiter.acquire())
+        acquired.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    while limiter.stats().queued == 0:
+        pass
+    assert not acquired.is_set()
+
+    limiter.release(started_at)
+    thread.join()
+    assert acquired.is_set()
+    assert limiter.stats().in_flight == 0
+
+
+def test_callers_are_rejected_after_the_queue_timeout():
+    limiter = ConcurrencyLimiter(
+        "groups", ConcurrencyLimitSettings(initial_limit=1, queue_timeout=0.01)
+    )
+    limiter.acquire()
+    with pytest.raises(ConcurrencyLimitError) as excinfo:
+        limiter.acquire()
+    assert (excinfo.value.service, excinfo.value.limit) == ("groups", 1)
+
+    stats = limiter.stats()
+    assert (stats.in_flight, stats.queued, stats.rejected) == (1, 0, 1)
+
+
+def test_async_callers_wait_on_the_event_loop():
+    limiter = ConcurrencyLimiter(
+        "auth", ConcurrencyLimitSettings(initial_limit=1, max_limit=1, queue_timeout=5)
+    )
+    threads = threading.active_count()
+
+    async def call():
+        started_at = await limiter.acquire_async()
+        # waiting callers do not tie up threads
+        assert threading.active_count() == threads
+        await asyncio.sleep(0.001)
+        limiter.release(started_at)
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(20)))
+
+    asyncio.run(main())
+    stats = limiter.stats()
+    assert (stats.calls, stats.in_flight, stats.queued) == (20, 0, 0)
+
+
+def test_async_callers_are_rejected_after_the_queue_timeout():
+    limiter = ConcurrencyLimiter(
+        "auth",
+        ConcurrencyLimitSettings(initial_limit=1, max_limit=1, queue_timeout=0.5),
+    )
+    waits = []
+
+    async def call():
+        started = time.monotonic()
+        try:
+            started_at = await limiter.acquire_async()
+        except ConcurrencyLimitError:
+            return
+        finally:
+            waits.append(time.monotonic() - started)
+        await asyncio.sleep(0.05)
+        limiter.release(started_at)
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(200)))
+
+    asyncio.run(main())
+    stats = limiter.stats()
+    # the queue timeout starts when each caller starts waiting
+    assert stats.rejected > 150
+    assert max(waits) < 1
+    assert (stats.in_flight, stats.queued) == (0, 0)
+
+
+def test_cancelled_async_callers_pass_on_their_turn():
+    limiter = ConcurrencyLimiter(
+        "auth", ConcurrencyLimitSettings(initial_limit=1, max_limit=1, queue_timeout=5)
+    )
+
+    async def main():
+        started_at = await limiter.acquire_async()
+        cancelled = asyncio.ensure_future(limiter.acquire_async())
+        waiting = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        # the first waiter is woken by the release, but is cancelled
+        limiter.release(started_at)
+        cancelled.cancel()
+        # on some Python versions, a waiter woken before its cancellation is
+        # delivered keeps the turn, which its caller then releases
+        try:
+            limiter.release(await cancelled)
+        except asyncio.CancelledError:
+            pass
+        limiter.release(await asyncio.wait_for(waiting, 1))
+
+    asyncio.run(main())
+    stats = limiter.stats()
+    assert (stats.in_flight, stats.queued) == (0, 0)
+
+
+@pytest.mark.parametrize(
+    "settings",
+    (
+        ConcurrencyLimitSettings(min_limit=0),
+        ConcurrencyLimitSettings(initial_limit=300),
+        ConcurrencyLimitSettings(backoff_ratio=1),
+    ),
+)
+def test_invalid_settings_are_rejected(settings):
+    with pytest.raises(ValueError):
+        ConcurrencyLimiter("auth", settings)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+
+from globus_action_provider_tools.deadline import (
+    check_deadline,
+    deadline,
+    remaining_time,
+)
+from globus_action_provider_tools.errors import DeadlineExceededError
+
+
+def test_there_is_no_deadline_by_default():
+    assert remaining_time() is None
+    assert check_deadline("calling 'introspect'") is None
+
+
+def test_nested_deadlines_can_only_shorten_the_budget():
+    with deadline(10):
+        assert 9 < remaining_time() <= 10
+        with deadline(60):
+            assert remaining_time() <= 10
+        with deadline(1):
+            assert remaining_time() <= 1
+        with deadline(None):
+            assert 9 < remaining_time() <= 10
+        assert 9 < remaining_time() <= 10
+    assert remaining_time() is None
+
+
+def test_passed_deadlines_fail_fast():
+    with deadline(0):
+        with pytest.raises(DeadlineExceededError) as excinfo:
+            check_deadline("calling 'introspect'")
+    assert excinfo.value.operation == "calling 'introspect'"
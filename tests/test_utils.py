@@ -0,0 +1,534 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from globus_action_provider_tools.cache_backends import SQLiteCacheBackend
+from globus_action_provider_tools.deadline import deadline
+from globus_action_provider_tools.errors import DeadlineExceededError
+from globus_action_provider_tools.utils import (
+    CacheRefresher,
+    CacheStats,
+    Prefetcher,
+    SingleFlight,
+    TypedTTLCache,
+)
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize(
+    "eviction, expect_evicted",
+    (
+        ("lru", "b"),
+        ("fifo", "a"),
+        ("lfu", "b"),
+    ),
+)
+def test_eviction_policies(eviction, expect_evicted):
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30, eviction=eviction)
+    cache["a"] = 1
+    cache["b"] = 2
+    # touch "a" so that it is both recently and frequently used
+    assert cache.get("a") == 1
+    cache["c"] = 3
+
+    assert expect_evicted not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_unknown_eviction_policy_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported eviction policy"):
+        TypedTTLCache(maxsize=2, ttl=30, eviction="mru")
+
+
+def test_entries_expire_after_ttl():
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30, timer=timer)
+    cache["a"] = 1
+    timer.now = 29.9
+    assert cache.get("a") == 1
+    timer.now = 30
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_expired_entries_are_kept_for_stale_if_error():
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(
+        maxsize=2, ttl=30, stale_if_error=60, timer=timer
+    )
+    cache["a"] = 1
+    assert cache.get_stale("a") == 1
+    timer.now = 30
+    assert cache.get("a") is None
+    assert cache.get_stale("a") == 1
+    timer.now = 90
+    assert cache.get_stale("a") is None
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+    stats = cache.stats()
+    assert (stats.stale_hits, stats.expirations) == (1, 1)
+
+
+@pytest.mark.parametrize("eviction", ("lru", "lfu", "fifo", "tinylfu"))
+def test_expired_entries_are_removed_ahead_of_live_ones(eviction):
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(
+        maxsize=3, ttl=10, eviction=eviction, timer=timer
+    )
+    for key in ("a", "b", "c"):
+        cache[key] = 1
+        for _ in range(5):
+            cache.get(key)
+    timer.now = 100
+    cache["d"] = 2
+    cache["e"] = 3
+
+    assert (cache.get("d"), cache.get("e")) == (2, 3)
+    assert len(cache) == 2
+    stats = cache.stats()
+    assert (stats.expirations, stats.evictions) == (3, 0)
+
+
+def test_steady_expiration_does_not_slow_down_writes():
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=10_000, ttl=30, timer=timer)
+    # a steady write rate, at which entries expire as fast as they are stored
+    writes = 50_000
+    started = time.perf_counter()
+    for i in range(writes):
+        timer.now = i * 30 / 9_000
+        cache[f"key-{i}"] = i
+    elapsed = time.perf_counter() - started
+
+    stats = cache.stats()
+    assert stats.evictions == 0
+    assert stats.expirations == writes - len(cache)
+    # expiring costs the number of expired entries, not a scan of the shard
+    assert elapsed / writes < 100e-6
+
+
+def test_entry_ttl_may_be_shorter_than_cache_ttl():
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30, timer=timer)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=3600)
+    timer.now = 5
+    assert cache.get("short") is None
+    # entry lifetimes are capped at the cache TTL
+    timer.now = 30
+    assert cache.get("long") is None
+
+
+def test_non_positive_entry_ttl_is_not_cached():
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30)
+    cache["a"] = 1
+    cache.set("a", 2, ttl=0)
+    assert "a" not in cache
+
+
+def test_entry_ttl_is_preserved_through_backend(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    writer: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30, backend=backend)
+    timer = FakeTimer()
+    reader: TypedTTLCache[int] = TypedTTLCache(
+        maxsize=2, ttl=30, backend=backend, timer=timer
+    )
+
+    writer.set("a", 1, ttl=5)
+    assert reader.get("a") == 1
+    # the in-process copy expires with the shared entry, not after the cache TTL
+    backend.delete("a")
+    timer.now = 4.9
+    assert reader.get("a") == 1
+    timer.now = 5
+    assert reader.get("a") is None
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "result"
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(single_flight.do, "key", slow_call) for _ in range(8)
+        ]
+        # give every thread a chance to join the in-flight call
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == ["result"] * 8
+    assert len(calls) == 1
+
+
+def test_single_flight_shares_exceptions():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def failing_call():
+        release.wait(timeout=5)
+        raise ValueError("nope")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(single_flight.do, "key", failing_call) for _ in range(4)
+        ]
+        time.sleep(0.1)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="nope"):
+                future.result()
+
+    # once a call completes, a new call is made
+    assert single_flight.do("key", lambda: "again") == "again"
+
+
+def test_single_flight_followers_wait_until_their_own_deadline():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def slow_call():
+        release.wait(timeout=5)
+        return "result"
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        # the leader has no deadline
+        leader = executor.submit(single_flight.do, "key", slow_call)
+        time.sleep(0.05)
+        started = time.monotonic()
+        with deadline(0.1):
+            with pytest.raises(DeadlineExceededError):
+                single_flight.do("key", slow_call)
+        assert time.monotonic() - started < 1
+        release.set()
+        assert leader.result() == "result"
+
+
+def test_remaining_fraction_tracks_entry_lifetime():
+    timer = FakeTimer()
+    cache: TypedTTLCache[str] = TypedTTLCache(maxsize=10, ttl=100, timer=timer)
+    assert cache.remaining_fraction("key") is None
+
+    cache.set("key", "value", ttl=50)
+    timer.now = 40
+    assert cache.remaining_fraction("key") == pytest.approx(0.2)
+    timer.now = 50
+    assert cache.remaining_fraction("key") is None
+
+
+def test_cache_refresher_refreshes_entries_near_expiry():
+    timer = FakeTimer()
+    cache: TypedTTLCache[str] = TypedTTLCache(maxsize=10, ttl=100, timer=timer)
+    refresher = CacheRefresher(0.2)
+    cache["key"] = "old"
+
+    def refresh():
+        cache["key"] = "new"
+
+    timer.now = 70
+    assert not refresher.maybe_refresh(cache, "key", refresh)
+    timer.now = 85
+    assert refresher.maybe_refresh(cache, "key", refresh)
+    refresher.shutdown()
+    assert cache.get("key") == "new"
+    assert cache.remaining_fraction("key") == 1.0
+
+
+def test_cache_refresher_keeps_value_when_refresh_fails():
+    timer = FakeTimer()
+    cache: TypedTTLCache[str] = TypedTTLCache(maxsize=10, ttl=100, timer=timer)
+    refresher = CacheRefresher(0.2)
+    cache["key"] = "old"
+
+    def failing_refresh():
+        raise ValueError("nope")
+
+    timer.now = 85
+    assert refresher.maybe_refresh(cache, "key", failing_refresh)
+    refresher.shutdown()
+    assert cache.get("key") == "old"
+
+
+def test_prefetcher_logs_failures_and_allows_retries(caplog):
+    prefetcher = Prefetcher(max_workers=1)
+
+    def failing_call():
+        raise ValueError("nope")
+
+    assert prefetcher.submit("key", failing_call)
+    prefetcher.shutdown()
+    assert "Failed to prefetch key" in caplog.text
+
+    results = []
+    assert prefetcher.submit("key", lambda: results.append("done"))
+    prefetcher.shutdown()
+    assert results == ["done"]
+
+
+def test_cache_refresher_submits_one_refresh_per_key():
+    timer = FakeTimer()
+    cache: TypedTTLCache[str] = TypedTTLCache(maxsize=10, ttl=100, timer=timer)
+    refresher = CacheRefresher(0.2, max_pending=2)
+    release = threading.Event()
+    for key in ("a", "b", "c"):
+        cache[key] = "old"
+    timer.now = 90
+
+    assert refresher.maybe_refresh(cache, "a", release.wait)
+    assert not refresher.maybe_refresh(cache, "a", release.wait)
+    assert refresher.maybe_refresh(cache, "b", release.wait)
+    # the queue of pending refreshes is full
+    assert not refresher.maybe_refresh(cache, "c", release.wait)
+
+    release.set()
+    refresher.shutdown()
+    assert refresher.maybe_refresh(cache, "c", lambda: None)
+    refresher.shutdown()
+
+
+def test_jitter_shortens_entry_lifetimes():
+    timer = FakeTimer()
+    cache: TypedTTLCache[str] = TypedTTLCache(
+        maxsize=10, ttl=100, jitter=0.2, timer=timer, rand=lambda: 0.5
+    )
+    cache["key"] = "value"
+    timer.now = 89
+    assert cache.get("key") == "value"
+    timer.now = 90
+    assert cache.get("key") is None
+
+
+@pytest.mark.parametrize("jitter", (-0.1, 1.0))
+def test_jitter_must_be_a_fraction(jitter):
+    with pytest.raises(ValueError):
+        TypedTTLCache(maxsize=10, ttl=100, jitter=jitter)
+
+
+def test_get_or_compute_caches_computed_values():
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=10, ttl=100, timer=timer)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("key", compute) == 1
+    assert cache.get_or_compute("key", compute) == 1
+    timer.now = 100
+    assert cache.get_or_compute("key", compute) == 2
+    # the lifetime may be computed from the value, and a lifetime which is not
+    # positive means the value is not cached
+    assert cache.get_or_compute("other", compute, ttl=lambda value: 0) == 3
+    assert "other" not in cache
+
+
+def test_get_or_compute_with_single_flight_loads_once():
+    cache: TypedTTLCache[str] = TypedTTLCache(maxsize=10, ttl=100)
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "result"
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(
+                cache.get_or_compute, "key", slow_compute, inflight=single_flight
+            )
+            for _ in range(8)
+        ]
+        # give every thread a chance to join the in-flight call
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == ["result"] * 8
+    assert len(calls) == 1
+    # only the caller which made the call stored its result
+    assert cache.stats().loads == 1
+
+
+def test_get_or_compute_expires_slow_values_early():
+    timer = FakeTimer()
+    random_values = [0.0]
+    cache: TypedTTLCache[int] = TypedTTLCache(
+        maxsize=10,
+        ttl=100,
+        early_expiration=1.0,
+        timer=timer,
+        rand=lambda: random_values[0],
+    )
+    calls = []
+
+    def slow_compute():
+        calls.append(1)
+        timer.now += 5
+        return len(calls)
+
+    assert cache.get_or_compute("key", slow_compute) == 1
+    # the entry was stored after 5 seconds of computation, and expires at 105
+    timer.now = 99
+    assert cache.get_or_compute("key", slow_compute) == 1
+
+    # with u = 0.9, the entry is recomputed within -5 * ln(0.1) ~= 11.5s of expiring
+    random_values[0] = 0.9
+    timer.now = 90
+    assert cache.get_or_compute("key", slow_compute) == 1
+    timer.now = 94
+    assert cache.get_or_compute("key", slow_compute) == 2
+    assert len(calls) == 2
+
+
+def test_early_expiration_is_disabled_by_default():
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(
+        maxsize=10, ttl=100, timer=timer, rand=lambda: 0.999999
+    )
+
+    def slow_compute():
+        timer.now += 50
+        return 1
+
+    cache.get_or_compute("key", slow_compute)
+    timer.now = 149
+    assert cache.get_or_compute("key", lambda: 2) == 1
+
+
+def test_sharded_cache_splits_maxsize_across_shards():
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=10, ttl=100, shards=4)
+    assert cache.shards == 4
+    for i in range(100):
+        cache[f"key-{i}"] = i
+    # each of the four shards holds at most three entries
+    assert len(cache) <= 12
+    assert all(cache.get(f"key-{i}") in (i, None) for i in range(100))
+
+
+@pytest.mark.parametrize("eviction", ("lru", "lfu", "fifo"))
+@pytest.mark.parametrize("shards", (1, 4))
+def test_cache_is_consistent_under_concurrent_use(eviction, shards):
+    cache: TypedTTLCache[int] = TypedTTLCache(
+        maxsize=50, ttl=100, eviction=eviction, shards=shards
+    )
+    keys = [f"key-{i}" for i in range(100)]
+
+    def worker(seed):
+        for i in range(2000):
+            key = keys[(seed * 7 + i * 13) % len(keys)]
+            if i % 5 == 0:
+                cache[key] = i
+            elif i % 17 == 0:
+                try:
+                    del cache[key]
+                except KeyError:
+                    pass
+            else:
+                cache.get(key)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(worker, seed) for seed in range(8)]:
+            future.result()
+
+    assert len(cache) <= 52
+    for shard in cache._shards:
+        cached_keys = set(shard.entries)
+        evicted = set()
+        while shard.entries:
+            evicted.add(shard.entries.popitem()[0])
+        assert evicted == cached_keys
+
+
+def test_cache_stats_count_hits_misses_expirations_and_evictions():
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30, timer=timer)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["a"] = 3
+    cache["c"] = 4
+    assert cache.get("c") == 4
+    assert cache.get("b") is None
+    timer.now = 30
+    assert cache.get("c") is None
+
+    assert cache.stats() == CacheStats(
+        hits=1, misses=2, expirations=1, evictions=1, size=1, maxsize=2
+    )
+    assert cache.stats().hit_ratio == pytest.approx(1 / 3)
+
+
+def test_cache_stats_record_load_time():
+    timer = FakeTimer()
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30, timer=timer)
+
+    def slow_compute():
+        timer.now += 2
+        return 1
+
+    cache.get_or_compute("a", slow_compute)
+    cache.get_or_compute("a", slow_compute)
+    cache.set("b", 2, load_time=1)
+    cache.set("c", 3)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+    assert (stats.loads, stats.load_time) == (2, 3)
+    assert stats.mean_load_time == 1.5
+
+
+def test_cache_stats_count_backend_hits(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite")
+    writer: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30, backend=backend)
+    reader: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30, backend=backend)
+    writer["a"] = 1
+
+    assert reader.get("a") == 1
+    assert reader.get("a") == 1
+    assert reader.get("b") is None
+    stats = reader.stats()
+    assert (stats.hits, stats.misses, stats.backend_hits) == (1, 2, 1)
+
+
+def test_peek_does_not_count_a_lookup():
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=2, ttl=30)
+    cache["a"] = 1
+    assert cache.peek("a") == 1
+    assert cache.peek("b") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (0, 0)
+
+
+def test_cache_stats_since_subtracts_counters():
+    cache: TypedTTLCache[int] = TypedTTLCache(maxsize=10, ttl=30, shards=4)
+    cache["a"] = 1
+    cache.get("a")
+    earlier = cache.stats()
+    cache["b"] = 2
+    cache.get("a")
+    cache.get("b")
+    cache.get("c")
+
+    delta = cache.stats().since(earlier)
+    assert (delta.hits, delta.misses, delta.size, delta.maxsize) == (2, 1, 2, 10)